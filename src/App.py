@@ -8,8 +8,11 @@ import pygame
 
 from algorithms.MazeGenerator import MazeGenerator
 from algorithms.MazeSolver import MazeSolver
+from algorithms.TerrainGenerator import TerrainGenerator
 from grid.Grid import Grid
+from grid.MazeRasterizer import MazeRasterizer
 from grid.Renderer import Renderer
+from utils.MazeCache import MazeCache
 from utils.Profiler import Profiler
 
 
@@ -20,7 +23,9 @@ class App:
   generator_map = {
     "random_dfs": MazeGenerator.recursive_backtracker,
     "prim": MazeGenerator.randomized_prim,
+    "prim_frontier": MazeGenerator.randomized_prim_frontier,
     "kruskal": MazeGenerator.randomized_kruskal,
+    "kruskal_batch": MazeGenerator.randomized_kruskal_batch,
   }
   solver_map = {
     "astar": MazeSolver.a_star,
@@ -28,6 +33,17 @@ class App:
     "dfs": MazeSolver.depth_first_search,
     "bfs": MazeSolver.breadth_first_search,
     "greedy": MazeSolver.greedy_best_first,
+    "bibfs": MazeSolver.bidirectional_breadth_first_search,
+    "biastar": MazeSolver.bidirectional_a_star,
+    "jps": MazeSolver.jump_point_search,
+    "tree": MazeSolver.tree_path,
+    "auto": MazeSolver.solve,
+    "dial": MazeSolver.dial,
+  }
+  terrain_map = {
+    "uniform": TerrainGenerator.uniform,
+    "random": TerrainGenerator.random_weights,
+    "noise": TerrainGenerator.noise_weights,
   }
 
   def __init__(self, args):
@@ -37,6 +53,9 @@ class App:
     self.imperfection_rate = args.imperfection_rate if args.imperfection_rate is not None else 0
     args.seed = args.seed if args.seed is not None else 42
     random.seed(args.seed)
+    self.seed = args.seed
+    self.terrain_fn = App.terrain_map[args.terrain]
+    self.max_weight = args.max_weight
 
     # Grid and solver
     GRID_LENGTH = args.n if args.n is not None else 30
@@ -55,18 +74,40 @@ class App:
     else:
       END_POS = (args.end[0], args.end[1])
 
+    # A maze loaded from a file brings its own size and start/end positions, and doesn't need generating
+    self.load_path = args.load
+    self.dump_path = args.dump
+
+    # A maze generated before with the same settings is loaded from the maze cache instead of being generated again.
+    # Animating the generation, or profiling it with --log, needs the generator to actually run, so those skip the cache.
+    self.maze_cache = None
+    self.cache_key = None
+    if not args.no_cache and not args.load and not args.log and not (args.render and args.animate_generation):
+      self.maze_cache = MazeCache(max_bytes=args.cache_size_mb * 1024 * 1024)
+      self.cache_key = MazeCache.make_key(
+        self.generator_fn.__name__, GRID_LENGTH, GRID_LENGTH, args.seed, self.imperfection_rate, START_POS, END_POS
+      )
+      self.load_path = self.maze_cache.get(self.cache_key)
+    maze_header = Grid.read_header(args.load) if args.load else None
+    NUM_ROWS = maze_header["num_rows"] if maze_header else GRID_LENGTH
+    NUM_COLS = maze_header["num_cols"] if maze_header else GRID_LENGTH
+
     # Rendering, logging, saving
     self.animate_generation = None # generation and animate solving have None as a default
     self.animate_solving = None
     self.logging_enabled = args.log 
     self.save_image_output = args.save
+    self.export_path = args.export
+    self.heatmap_path = args.heatmap
+    self.cell_size = CELL_SIZE
+    self.cell_wall_width = CELL_WALL_WIDTH
     self.screen = None
     self.clock = None
     self.renderer = None
     
     if args.render:
-      width = GRID_LENGTH * CELL_SIZE  # should be the same for now
-      height = GRID_LENGTH * CELL_SIZE
+      width = NUM_COLS * CELL_SIZE
+      height = NUM_ROWS * CELL_SIZE
       pygame.init()
       self.screen = pygame.display.set_mode((width, height))
       pygame.display.set_caption("MazeAI")
@@ -81,34 +122,63 @@ class App:
         # NOTE: This is due to the rendering process using is_visited to highlight cells, and our
         # maze generation algorithms using the same state to mark cells as visited for some algorithms.
         False,
+        args.steps_per_frame if args.steps_per_frame is not None else 1,
       )
 
+      # Rather than a fixed number of steps per frame, pace the animations to take about this many seconds each.
+      # Generators and solvers take roughly one step per cell, so that's what the pace is based on.
+      if args.animation_duration is not None:
+        self.renderer.set_target_duration(args.animation_duration, NUM_ROWS * NUM_COLS)
+
       # Animation can only happen when the maze is rendered on the screen in the first place
       self.animate_generation: bool = args.animate_generation 
       self.animate_solving: bool = args.animate_solving 
 
-    self.grid = Grid(self.renderer, GRID_LENGTH, GRID_LENGTH, START_POS, END_POS)
+    if self.load_path:
+      self.grid = Grid.load(self.load_path, self.renderer)
+    else:
+      self.grid = Grid(self.renderer, GRID_LENGTH, GRID_LENGTH, START_POS, END_POS)
 
   def generate_maze(self):
-    """Generates the maze using the specified algorithm from the command line arguments."""
+    """Generates the maze using the specified algorithm from the command line arguments. A maze loaded from a file
+    (--load, or the maze cache) is used as it is."""
 
     # Sets an animation function if we want to animate.
     animate_fn = None
     if self.animate_generation:
       animate_fn = self.renderer.update_display  
 
-    # If user wants to log the generator execution, we'll do it here; else just run the function
-    if self.logging_enabled:
-      self.profiler.profile_maze_generation(
-        self.generator_fn,
-        self.grid,
-        animate_fn        
-      )
-    else:
-      self.generator_fn(self.grid, animate_fn)
+    if not self.load_path:
+      # If user wants to log the generator execution, we'll do it here; else just run the function
+      if self.logging_enabled:
+        self.profiler.profile_maze_generation(
+          self.generator_fn,
+          self.grid,
+          animate_fn        
+        )
+      else:
+        self.generator_fn(self.grid, animate_fn)
+
+      # Maze has been generated, add imperfections if needed
+      MazeGenerator.add_imperfections(self.grid, self.imperfection_rate, animate_fn)
+
+      if self.maze_cache:
+        self.maze_cache.put(self.cache_key, self.grid)
 
-    # Maze has been generated, add imperfections if needed
-    MazeGenerator.add_imperfections(self.grid, self.imperfection_rate, animate_fn)
+    if self.dump_path:
+      self.grid.save(self.dump_path)
+
+    # Cell weights aren't part of a saved maze, so they're filled in the same way whether it was generated or loaded.
+    # Reseeding first makes the terrain the same either way, since loading doesn't use up random numbers like generating.
+    random.seed(self.seed)
+    self.terrain_fn(self.grid, self.max_weight)
+
+    # Walls won't change anymore, so index the maze once for the solvers
+    self.grid.freeze()
+
+    # Draw whatever is left of the last batch of animation steps
+    if self.renderer:
+      self.renderer.flush()
 
   def solve_maze(self):
     """Solves the maze using the specified solver from the command line arguments."""
@@ -116,6 +186,10 @@ class App:
     animate_fn = None
     if self.animate_solving:
       animate_fn = self.renderer.update_display
+
+    # A maze loaded with --load can have loops even though --imperfection_rate is 0
+    if self.solving_fn is MazeSolver.tree_path and not self.grid.is_perfect:
+      sys.exit("error: --solver tree only solves perfect mazes; use --solver auto to fall back to astar on this one")
     
     if self.logging_enabled:
       self.profiler.profile_maze_solver(
@@ -128,6 +202,9 @@ class App:
         self.grid,
         update_callback=animate_fn
       )
+
+    if self.renderer:
+      self.renderer.flush()
       
   def run(self):
     """Function involved in the main program loop"""
@@ -137,9 +214,13 @@ class App:
     self.generate_maze()
     if self.renderer:
       self.renderer.highlight_cells = True
-      self.renderer.update_display()
     self.solve_maze()
 
+    # Headless image of the solved maze; this doesn't need a window, so it works without --render
+    if self.export_path:
+      MazeRasterizer(self.cell_size, self.cell_wall_width).save_png(self.grid, self.export_path)
+    if self.heatmap_path:
+      MazeRasterizer(self.cell_size, self.cell_wall_width).save_heatmap_png(self.grid, self.heatmap_path)
     
     # If rendering is enabled, have a loop opened to render teh winodw
     if self.renderer:
@@ -148,8 +229,7 @@ class App:
         for e in pygame.event.get():
           if e.type == pygame.QUIT:
             running = False
-        self.renderer.update_display()
-        pygame.display.update()
+        self.renderer.flush()
         self.clock.tick(60)
 
       # If the user wants to save the image
@@ -178,15 +258,39 @@ def parse_args():
   
   parser.add_argument("--imperfection_rate", type=float, default=0.0, choices=[i / 10 for i in range(11)])
 
+  # Cost of moving into each cell; weighted solvers (dijkstra, astar, dial, biastar) find the cheapest path over it
+  parser.add_argument("--terrain", choices=list(App.terrain_map.keys()), default="uniform")
+  parser.add_argument("--max_weight", type=int, default=9)
+
   # Whether the program is going to show the screen at all; this is needed to also have things animate
   parser.add_argument("--render", action="store_true")
   parser.add_argument("--animate_generation", action="store_true")
   parser.add_argument("--animate_solving", action="store_true")
 
+  # How fast animations play: either a fixed number of algorithm steps per frame, or a target length in seconds
+  animation_speed = parser.add_mutually_exclusive_group()
+  animation_speed.add_argument("--steps_per_frame", type=int)
+  animation_speed.add_argument("--animation_duration", type=float)
+
   parser.add_argument("--log", action="store_true")
   parser.add_argument("--save", action="store_true")
+  parser.add_argument("--export", type=str)
+  parser.add_argument("--heatmap", type=str)
+
+  # Save the generated maze to a binary file, or skip generation and solve a maze saved earlier
+  parser.add_argument("--dump", type=str)
+  parser.add_argument("--load", type=str)
+
+  # Generated mazes are cached on disk (in ./maze_cache) and reused when the same maze is asked for again
+  parser.add_argument("--no_cache", action="store_true")
+  parser.add_argument("--cache_size_mb", type=int, default=1024)
   parser.add_argument("--seed", type=int)
-  return parser.parse_args()
+  args = parser.parse_args()
+
+  # The tree index only exists for perfect mazes, so catch this before spending time on generating the maze
+  if args.solver == "tree" and args.imperfection_rate > 0:
+    parser.error("--solver tree only solves perfect mazes (an --imperfection_rate of 0); use --solver auto instead")
+  return args
 
 def main():
   args = parse_args()
@@ -0,0 +1,142 @@
+import numpy as np
+
+# Entries are packed ints, (priority << PRIORITY_SHIFT) | (push number << ITEM_BITS) | item, so ordering two entries
+# is a single int comparison. The push number gets 64 bits, which no search can use up, so it never runs into the
+# priority bits.
+ITEM_BITS = 32
+ITEM_MASK = (1 << ITEM_BITS) - 1
+PUSH_NUMBER_BITS = 64
+PRIORITY_SHIFT = ITEM_BITS + PUSH_NUMBER_BITS
+
+
+class IndexedHeap:
+  def __init__(self, size: int):
+    """Min-heap of items 0..size-1 (cell ids), where every item is in the heap at most once and its priority can be
+    lowered in place (decrease-key).
+
+    Args:
+        size (int): Number of possible items, i.e. the number of cells in the grid
+
+    Raises:
+        ValueError: If there are more items than fit in the item bits of an entry
+
+    NOTE: With heapq, finding a cheaper path to a cell means pushing a second entry for it and skipping the stale
+    one when it's popped, so the heap can hold many entries per cell. Here, the heap slot of every item is kept in
+    `positions`, a flat int array, so a cheaper path moves the item's existing entry up instead, and the heap never
+    holds more entries than there are cells.
+
+    Items with the same priority come out in the order they were pushed (or last had their priority lowered), the
+    same tie-break the solvers used with insertion indices.
+
+    NOTE: This is a binary heap sifted in Python, since heapq can't report where its entries move to. Pushes and pops
+    cost about 2-3x what heapq's do, the price of never queueing a cell twice.
+    """
+    if size > 1 << ITEM_BITS:
+      raise ValueError(f"IndexedHeap fits at most {1 << ITEM_BITS} items, got {size}")
+    self.entries: list[int] = []
+    self.num_pushes = 0
+
+    # Heap slot of every item, or -1 when it isn't in the heap. Read and written one element at a time, which
+    # memoryviews do much faster than numpy indexing.
+    self.positions = np.full(size, -1, dtype=np.int32 if size < 2**31 else np.int64)
+    self.positions_view = memoryview(self.positions)
+
+  def __len__(self) -> int:
+    return len(self.entries)
+
+  def __bool__(self) -> bool:
+    return bool(self.entries)
+
+  def contains(self, item: int) -> bool:
+    return self.positions_view[item] >= 0
+
+  def push(self, item: int, priority: int) -> bool:
+    """Adds an item with the given priority, or lowers its priority if it's already in the heap.
+
+    Args:
+        item (int): Item (cell id) being added
+        priority (int): Non-negative priority of the item; lower comes out first
+
+    Returns:
+        bool: True if the item was added, False if it was already in the heap (and its priority was lowered if the new
+        one is lower)
+    """
+    entries = self.entries
+    position = self.positions_view[item]
+    if position >= 0:
+      if priority >= entries[position] >> PRIORITY_SHIFT:
+        return False
+      added = False
+    else:
+      position = len(entries)
+      entries.append(0)
+      added = True
+    self.num_pushes += 1
+    entry = (priority << PRIORITY_SHIFT) | (self.num_pushes << ITEM_BITS) | item
+
+    # Sift up: move larger parents down into the gap until the entry's slot is found
+    positions = self.positions_view
+    while position > 0:
+      parent = (position - 1) >> 1
+      parent_entry = entries[parent]
+      if parent_entry <= entry:
+        break
+      entries[position] = parent_entry
+      positions[parent_entry & ITEM_MASK] = position
+      position = parent
+    entries[position] = entry
+    positions[item] = position
+    return added
+
+  def decrease_key(self, item: int, priority: int) -> None:
+    """Lowers the priority of an item that's in the heap"""
+    position = self.positions_view[item]
+    if position < 0:
+      raise KeyError(f"Item {item} isn't in the heap")
+    if priority > self.entries[position] >> PRIORITY_SHIFT:
+      raise ValueError("decrease_key can't raise the priority of an item")
+    self.push(item, priority)
+
+  def peek_priority(self) -> int:
+    """Returns the lowest priority in the heap, without popping it"""
+    return self.entries[0] >> PRIORITY_SHIFT
+
+  def pop(self) -> tuple[int, int]:
+    """Removes the item with the lowest priority.
+
+    Returns:
+        tuple[int, int]: The item, and its priority
+    """
+    entries, positions = self.entries, self.positions_view
+    top = entries[0]
+    positions[top & ITEM_MASK] = -1
+    entry = entries.pop()
+    size = len(entries)
+    if size:
+      # Sift the last entry down from the root the way heapq does: move the smaller child up into the gap all the way
+      # down to a leaf, then sift the entry up from there. The last entry usually belongs near the bottom, so this
+      # takes about half the comparisons of stopping at its slot on the way down.
+      position = 0
+      child = 1
+      while child < size:
+        child_entry = entries[child]
+        if child + 1 < size:
+          right_entry = entries[child + 1]
+          if right_entry < child_entry:
+            child += 1
+            child_entry = right_entry
+        entries[position] = child_entry
+        positions[child_entry & ITEM_MASK] = position
+        position = child
+        child = 2 * position + 1
+      while position > 0:
+        parent = (position - 1) >> 1
+        parent_entry = entries[parent]
+        if parent_entry <= entry:
+          break
+        entries[position] = parent_entry
+        positions[parent_entry & ITEM_MASK] = position
+        position = parent
+      entries[position] = entry
+      positions[entry & ITEM_MASK] = position
+    return top & ITEM_MASK, top >> PRIORITY_SHIFT
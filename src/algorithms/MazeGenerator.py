@@ -1,8 +1,11 @@
 import random
 
+import numpy as np
+
 from algorithms.UnionFind import UnionFind
 from grid.Cell import Cell
 from grid.Grid import Grid
+from utils.Direction import Direction
 
 
 class MazeGenerator:
@@ -28,7 +31,8 @@ class MazeGenerator:
         # From the number of possible walls we have; find the percentage to remove
         walls_to_remove = int(len(possible_walls) * imperfection_rate)
 
-        # Randomly remove walls; 
+        # Randomly remove walls; every removed wall adds a loop, so the maze stops being perfect (remove_wall clears 
+        # grid.is_perfect)
         random.shuffle(possible_walls)
         for _ in range(walls_to_remove):
             cell, neighbor, direction = possible_walls.pop()
@@ -64,6 +68,8 @@ class MazeGenerator:
       already visited would make those algorithms not work as expected.
     '''
     start_cell = grid.get_start_cell()
+    # Mark the start as visited too, or the walk could carve back into it and leave a loop in the maze
+    grid.set_is_visited(start_cell, True)
     stack: list[Cell] = [start_cell]
     while stack:
       current_cell = stack.pop()
@@ -87,6 +93,7 @@ class MazeGenerator:
     # all the cells are already visited, and that causes problems with the search algorithm to know which 
     # cells should be expanded or added to their respective data structures.
     grid.reset_visited_cells()    
+    grid.is_perfect = True
 
   @staticmethod
   def randomized_kruskal(grid: Grid, update_callback=None):
@@ -122,9 +129,59 @@ class MazeGenerator:
        neighbor_index = grid.get_list_index(wall[1])
        if not unionFind.connected(cell_index, neighbor_index):
           grid.remove_wall(wall[0], wall[1])
-          unionFind.unionByRank(cell_index, neighbor_index)
+          unionFind.unionBySize(cell_index, neighbor_index)
           if update_callback:
              update_callback()
+    grid.is_perfect = True
+
+  @staticmethod
+  def randomized_kruskal_batch(grid: Grid, update_callback=None) -> None:
+    """Runs randomized Kruskal's algorithm as a batch over integer arrays, which lets it generate very large mazes.
+
+    Args:
+        grid (Grid): Grid that the algorithm is being run on.
+        update_callback (Function, optional): Function that updates the grid display. Since every wall is removed in
+        one write, it's only called once at the end.
+    """
+    '''
+    Algorithm:
+    1. Build the list of every wall between two cells as a pair of numpy arrays (cell id, neighbor id). Walls to the 
+      right of a cell come first, then walls below a cell. Only walls that are still up are candidates.
+    2. Shuffle the walls with a single permutation. The permutation is drawn from a numpy generator seeded off 
+      Python's `random`, so the maze is reproducible from random.seed (and the --seed flag), just like the other generators.
+    3. Run the union-find pass over the shuffled integer ids, keeping the walls whose cells belong to distinct sets.
+    4. Remove all kept walls from the grid at once, one vectorized write per direction.
+
+    NOTE: A uniformly random wall order is exactly what randomized_kruskal draws with random.shuffle, so both produce 
+    the same distribution of mazes (though not the same maze for a given seed).
+    '''
+    num_rows, num_cols = grid.num_rows, grid.num_cols
+    cell_ids = np.arange(num_rows * num_cols, dtype=np.int64).reshape(num_rows, num_cols)
+    flags = grid.storage.flags
+
+    right_cells = cell_ids[:, :-1].ravel()
+    right_cells = right_cells[(flags[right_cells] & Cell.WALL_MASKS[Direction.RIGHT]) != 0]
+    down_cells = cell_ids[:-1, :].ravel()
+    down_cells = down_cells[(flags[down_cells] & Cell.WALL_MASKS[Direction.DOWN]) != 0]
+    if len(right_cells) == 0 and len(down_cells) == 0:
+      return
+
+    cells = np.concatenate((right_cells, down_cells))
+    neighbors = np.concatenate((right_cells + 1, down_cells + num_cols))
+
+    rng = np.random.default_rng(random.getrandbits(64))
+    order = rng.permutation(len(cells))
+
+    unionFind = UnionFind(num_rows * num_cols)
+    is_kept = np.zeros(len(cells), dtype=bool)
+    is_kept[order] = unionFind.unionMany(cells[order], neighbors[order])
+
+    num_right_walls = len(right_cells)
+    grid.remove_walls_by_index(right_cells[is_kept[:num_right_walls]], Direction.RIGHT)
+    grid.remove_walls_by_index(down_cells[is_kept[num_right_walls:]], Direction.DOWN)
+    grid.is_perfect = True
+    if update_callback:
+      update_callback()
 
   @staticmethod
   def randomized_prim(grid: Grid, update_callback=None) -> None:
@@ -137,12 +194,16 @@ class MazeGenerator:
     '''
     Algorithm:
     1. Pick a cell to start the maze generation from; mark the cell as visited and add its walls (add valid walls only) a wall list
-    2. Randomly pick a wall.
+    2. Randomly pick a wall and take it out of the list.
     3. If the neighbor (some cell) is not visited 
       a. Remove the wall between that cell and neighbor
       b. Mark the neighbor as visited
       c. Add all the walls of the neighbor to the walls list
       d. Update the animation frame
+
+    NOTE: The order of the wall list doesn't matter, since we always pick at random. So instead of popping at the random 
+    index, which shifts every wall after it (O(n)), we swap the picked wall with the last one and pop that (O(1)). 
+    This keeps the whole algorithm linear in the number of walls, and it's still deterministic under random.seed.
     '''
     start_cell = grid.get_start_cell()
     start_cell.set_is_visited(True)
@@ -152,7 +213,8 @@ class MazeGenerator:
 
     while walls:
         wall_index = random.randint(0, len(walls) - 1)
-        cell, neighbor, direction = walls.pop(wall_index)
+        walls[wall_index], walls[-1] = walls[-1], walls[wall_index]
+        cell, neighbor, direction = walls.pop()
         if not neighbor.get_is_visited():
             grid.remove_wall(cell, neighbor)
             neighbor.set_is_visited(True)
@@ -160,4 +222,55 @@ class MazeGenerator:
             if update_callback:
                 update_callback()
 
-    grid.reset_visited_cells()  
\ No newline at end of file
+    grid.reset_visited_cells()  
+    grid.is_perfect = True
+
+  @staticmethod
+  def randomized_prim_frontier(grid: Grid, update_callback=None) -> None:
+    """Runs the frontier-cell version of randomized Prim's algorithm on a grid.
+
+    Args:
+        grid (Grid): Grid that the algorithm is being run on.
+        update_callback (Function, optional): Function that updates the grid display whilst the function is being run.
+    """
+    '''
+    Algorithm:
+    1. Mark the start cell as visited, and put its neighbors in the frontier: the set of unvisited cells that are next to a visited one.
+    2. Randomly pick a cell from the frontier and take it out.
+    3. Connect it to one of its visited neighbors, picked at random, by removing the wall between them. Mark it as visited.
+    4. Add its unvisited neighbors that aren't in the frontier yet to the frontier.
+    5. Update the animation frame, and repeat until the frontier is empty.
+
+    NOTE: Unlike randomized_prim, which keeps a list of walls where the same cell can show up several times, every cell
+    enters the frontier exactly once (tracked with one byte per cell id), so the frontier never holds more than one entry 
+    per cell. Cells are picked with the same swap-with-last O(1) removal.
+    '''
+    in_frontier = bytearray(grid.num_rows * grid.num_cols)
+    frontier: list[Cell] = []
+
+    def add_to_frontier(cell: Cell) -> None:
+      for neighbor in grid.get_all_neighbors(cell):
+        neighbor_index = grid.get_list_index(neighbor)
+        if not neighbor.get_is_visited() and not in_frontier[neighbor_index]:
+          in_frontier[neighbor_index] = 1
+          frontier.append(neighbor)
+
+    start_cell = grid.get_start_cell()
+    start_cell.set_is_visited(True)
+    add_to_frontier(start_cell)
+
+    while frontier:
+      cell_index = random.randint(0, len(frontier) - 1)
+      frontier[cell_index], frontier[-1] = frontier[-1], frontier[cell_index]
+      cell = frontier.pop()
+
+      visited_neighbors = [neighbor for neighbor in grid.get_all_neighbors(cell) if neighbor.get_is_visited()]
+      neighbor = visited_neighbors[random.randint(0, len(visited_neighbors) - 1)]
+      grid.remove_wall(cell, neighbor)
+      cell.set_is_visited(True)
+      add_to_frontier(cell)
+      if update_callback:
+        update_callback()
+
+    grid.reset_visited_cells()
+    grid.is_perfect = True
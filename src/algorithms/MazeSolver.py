@@ -1,8 +1,14 @@
 import heapq
 from collections import deque
 
+import numpy as np
+
+from algorithms.IndexedHeap import IndexedHeap
+from algorithms.SolverStats import SolverStats
+from algorithms.TreeIndex import TreeIndex
 from grid.Cell import Cell
 from grid.Grid import Grid
+from utils.Direction import Direction
 
 
 class MazeSolver:
@@ -47,21 +53,73 @@ class MazeSolver:
         grid (Grid): Grid that the node lies on
         update_callback (func | None): A function that renders cells
     """
-    path = []
-    while cell:
-      path.insert(0, cell)
-      grid.set_is_in_path(cell, True)
-      cell = cell.parent
+    MazeSolver.reconstruct_path_from_index(grid.get_list_index(cell), grid, update_callback)
+
+  @staticmethod
+  def reconstruct_path_from_index(index: int, grid: Grid, update_callback) -> None:
+    """Reconstructs the path that leads to the cell with the given list index, following the parent links in the grid's storage.
+    Args:
+        index (int): List index of the end node on a given path
+        grid (Grid): Grid that the node lies on
+        update_callback (func | None): A function that renders cells
+    """
+    parents = grid.storage.parents_view
+    while index >= 0:
+      grid.set_is_in_path_by_index(index, True)
+      index = parents[index]
       if (update_callback):
         update_callback()
 
   @staticmethod
-  def breadth_first_search(grid: Grid, update_callback=None) -> None: 
+  def reconstruct_bidirectional_path(meeting_index: int, backward_parents: memoryview, grid: Grid, update_callback) -> None:
+    """Reconstructs the path found by a bidirectional search that met at the cell with list index `meeting_index`.
+    Args:
+        meeting_index (int): List index of the cell where the forward and backward searches met
+        backward_parents (memoryview): Parent links of the backward search, pointing towards the goal
+        grid (Grid): Grid that the nodes lie on
+        update_callback (func | None): A function that renders cells
+
+    NOTE: The forward half already has its parent links in the grid, pointing back to the start. So we flip the backward half's links
+    to point back towards the start as well, which leaves a single goal -> start chain for reconstruct_path_from_index to walk.
+    """
+    parents = grid.storage.parents_view
+    current = meeting_index
+    while backward_parents[current] >= 0:
+      parents[backward_parents[current]] = current
+      current = backward_parents[current]
+    MazeSolver.reconstruct_path_from_index(current, grid, update_callback)
+
+  @staticmethod
+  def new_score_array(grid: Grid) -> memoryview:
+    """Creates a preallocated score array with one slot per cell id, where -1 means the cell hasn't been reached yet.
+
+    NOTE: This is returned as a memoryview over an int32 numpy array, since reading and writing single elements of a 
+    memoryview is much faster than going through numpy, and it takes a fraction of the memory of a dict keyed by cells.
+    """
+    return memoryview(np.full(grid.storage.size, -1, dtype=np.int32))
+
+  @staticmethod
+  def new_open_set(grid: Grid, start: int, priority: int) -> IndexedHeap:
+    """Creates the heap of greedy_best_first, dijkstra and a_star, holding just the start cell with the given priority.
+
+    Raises:
+        ValueError: If the grid has more cells than fit in an IndexedHeap
+
+    NOTE: A cheaper path to a queued cell lowers its entry in place (decrease-key) instead of pushing a second one, so
+    every cell is popped at most once and the heap never holds more entries than there are cells.
+    """
+    open_set = IndexedHeap(grid.storage.size)
+    open_set.push(start, priority)
+    return open_set
+
+  @staticmethod
+  def breadth_first_search(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None: 
     """Performs a breadth first search on the grid.
 
     Args:
         grid (Grid): Grid being searched
         update_callback (_type_, optional): _description_. Defaults to None.
+        stats (SolverStats | None, optional): Counters to fill in while searching. Defaults to None.
 
     NOTE: With bfs, a cell is considered visited when it is added to the queue. The term visited depends on 
     the search algorithm.
@@ -83,48 +141,73 @@ class MazeSolver:
     
     NOTE: We're assuming there does exist a path from start to goal
     '''
-    start = grid.get_start_cell()
-    grid.set_is_visited(start, True)
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    parents[start] = -1
+    grid.set_is_visited_by_index(start, True)
 
     queue = deque([start])
+    if stats is not None:
+      stats.pushes += 1
     while queue:
+      if stats is not None:
+        stats.record_pop(len(queue))
       current = queue.popleft()
-      if grid.is_goal_cell(current):
+      if current == goal:
         # realistically break out of the loop and in the final ends of the function run one last frame to render goal nodes
-        MazeSolver.reconstruct_path(current, grid, update_callback)
+        MazeSolver.reconstruct_path_from_index(current, grid, update_callback)
         return
-      for neighbor in grid.get_path_neighbors(current):
-        if not neighbor.get_is_visited():
-          grid.set_is_visited(neighbor, True)
-          neighbor.parent = current
+      if stats is not None:
+        stats.record_expansion(offsets[current + 1] - offsets[current])
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        if not grid.get_is_visited_by_index(neighbor):
+          grid.set_is_visited_by_index(neighbor, True)
+          parents[neighbor] = current
           queue.append(neighbor)
+          if stats is not None:
+            stats.pushes += 1
 
       # After all neighbors have been processed, render all cells in the pipeline.
       if update_callback:
         update_callback()
            
   @staticmethod
-  def depth_first_search(grid: Grid, update_callback=None) -> None:
+  def depth_first_search(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
     """Performs a depth first search on the grid.
 
     Args:
       grid (Grid): Grid being searched
       update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while searching. Defaults to None.
 
     """
-    start = grid.get_start_cell()
-    grid.set_is_visited(start, True)
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    parents[start] = -1
+    grid.set_is_visited_by_index(start, True)
     stack = [start]
+    if stats is not None:
+      stats.pushes += 1
     while stack:
+      if stats is not None:
+        stats.record_pop(len(stack))
       current = stack.pop()  # pop from the end (lifo)
-      if grid.is_goal_cell(current):
-        MazeSolver.reconstruct_path(current, grid, update_callback)
+      if current == goal:
+        MazeSolver.reconstruct_path_from_index(current, grid, update_callback)
         return
-      for neighbor in grid.get_path_neighbors(current):
-        if not neighbor.get_is_visited():
-          grid.set_is_visited(neighbor, True)
-          neighbor.parent = current
+      if stats is not None:
+        stats.record_expansion(offsets[current + 1] - offsets[current])
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        if not grid.get_is_visited_by_index(neighbor):
+          grid.set_is_visited_by_index(neighbor, True)
+          parents[neighbor] = current
           stack.append(neighbor)
+          if stats is not None:
+            stats.pushes += 1
 
           # NOTE: As a result you're highlighting one neighbor at a time. Though
           # this doesn't affect functionality, it's more for aesthetics. 
@@ -132,128 +215,614 @@ class MazeSolver:
             update_callback()
   
   @staticmethod
-  def greedy_best_first(grid:Grid, update_callback=None):
+  def greedy_best_first(grid:Grid, update_callback=None, stats: SolverStats | None = None):
     """
     Performs a greedy best first search on the grid.
     
     Args:
       grid (Grid): Grid being searched
       update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while searching. Defaults to None.
     """
-    start = grid.get_start_cell()
-    goal = grid.get_goal_cell()
-    grid.set_is_visited(start, True)
-    queue = []
-    insertion_index = 0
-    heapq.heappush(queue, (MazeSolver.manhattan_distance(start, goal), insertion_index, start))  # Add unique identifier
+    start_cell = grid.get_start_cell()
+    goal_cell = grid.get_goal_cell()
+    start = grid.get_list_index(start_cell)
+    goal = grid.get_list_index(goal_cell)
+    goal_x, goal_y = goal_cell.x, goal_cell.y
+    num_cols = grid.num_cols
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    parents[start] = -1
+    grid.set_is_visited_by_index(start, True)
+    queue = MazeSolver.new_open_set(grid, start, MazeSolver.manhattan_distance(start_cell, goal_cell))  # ties go to the cell that was pushed first
+    if stats is not None:
+      stats.pushes += 1
     while queue:
-      distance, index, current_node = heapq.heappop(queue)
-      if grid.is_goal_cell(current_node):
-        MazeSolver.reconstruct_path(current_node, grid, update_callback)
+      if stats is not None:
+        stats.record_pop(len(queue))
+      current_node, _ = queue.pop()
+      if current_node == goal:
+        MazeSolver.reconstruct_path_from_index(current_node, grid, update_callback)
         return
-      for neighbor in grid.get_path_neighbors(current_node):
-        if not neighbor.get_is_visited():
-          grid.set_is_visited(neighbor, True)
-          neighbor.parent = current_node
+      if stats is not None:
+        stats.record_expansion(offsets[current_node + 1] - offsets[current_node])
+      for neighbor in neighbors[offsets[current_node] : offsets[current_node + 1]]:
+        if not grid.get_is_visited_by_index(neighbor):
+          grid.set_is_visited_by_index(neighbor, True)
+          parents[neighbor] = current_node
           
-          # add to queue with its heuristic value
-          heuristic = MazeSolver.manhattan_distance(neighbor, goal)
-          insertion_index += 1
-          heapq.heappush(queue, (heuristic, insertion_index, neighbor)) 
+          # add to queue with its heuristic value (manhattan distance, computed straight from the cell id)
+          neighbor_y, neighbor_x = divmod(neighbor, num_cols)
+          heuristic = abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)
+          queue.push(neighbor, heuristic)
+          if stats is not None:
+            stats.pushes += 1
           if update_callback:
             update_callback()
   
   @staticmethod
-  def dijkstra(grid: Grid, update_callback=None):
+  def dijkstra(grid: Grid, update_callback=None, stats: SolverStats | None = None):
     """Performs uniform
 
     Args:
         grid (Grid): _description_
         update_callback (_type_, optional): _description_. Defaults to None.
+        stats (SolverStats | None, optional): Counters to fill in while searching. Defaults to None.
     NOTE: Algorithm is the same as A*, except we're not going to use heuristics. Dijkstra ends up exploring the entire graph most of 
     the time being it has no idea where the goal is, and so it constantly expands. Since we're basically in a uniform weight graph, it's going to
     expand in all directions instead of towards some region.
 
-    NOTE: Remember that get_list_index returns a unique identifier for each cell in the grid. So instead of storing the cells in your cost maps, or external data structures, 
-    you can store the indices, which allows you to save a bit on memory and potentially performance.
+    NOTE: get_list_index returns a unique identifier for each cell in the grid, so the heap, cost array and parent links all work on 
+    those ids instead of Cell objects. Cells are only touched again when the final path is written back for rendering.
+
+    NOTE: The heap is an IndexedHeap (see new_open_set), so a cheaper path to a queued cell lowers its entry in place instead of 
+    pushing a second one, and no stale entries are ever popped.
     """
-    start = grid.get_start_cell()
-    insertion_index = 0
-    costs = {start: 0}
-    open_set = []
-    heapq.heappush(open_set, (costs[start], insertion_index, start)) 
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    weights = grid.storage.weights_view
+    parents[start] = -1
+    costs = MazeSolver.new_score_array(grid)
+    costs[start] = 0
+    open_set = MazeSolver.new_open_set(grid, start, costs[start])
+    if stats is not None:
+      stats.pushes += 1
 
     while open_set:
-      g_score, current_index, current = heapq.heappop(open_set)
-      grid.set_is_visited(current, True)
+      if stats is not None:
+        stats.record_pop(len(open_set))
+      current, _ = open_set.pop()
+      grid.set_is_visited_by_index(current, True)
 
-      if grid.is_goal_cell(current):
-        MazeSolver.reconstruct_path(current, grid, update_callback)
+      if current == goal:
+        MazeSolver.reconstruct_path_from_index(current, grid, update_callback)
         return
 
-      for neighbor in grid.get_path_neighbors(current):
-        tentative_g_score = costs[current] + neighbor.weight
+      if stats is not None:
+        stats.record_expansion(offsets[current + 1] - offsets[current])
+
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        tentative_g_score = costs[current] + weights[neighbor]
         
 
         # Case: If the neighbor hasn't been seen before, or the current path from start to neighbor is cheapest than the previous one found
         # In this case, update scores, and add neighbor to visited list if it's not there already.
-        if neighbor not in costs or tentative_g_score < costs[neighbor]:
-          neighbor.parent = current
+        if costs[neighbor] < 0 or tentative_g_score < costs[neighbor]:
+          parents[neighbor] = current
           costs[neighbor] = tentative_g_score
-          insertion_index += 1
-          heapq.heappush(open_set, (costs[neighbor], insertion_index, neighbor))
+          # Either queues the neighbor, or moves its queued entry up to the new cost
+          if open_set.push(neighbor, tentative_g_score) and stats is not None:
+            stats.pushes += 1
 
 
       if update_callback:
         update_callback()
 
   @staticmethod
-  def a_star(grid:Grid, update_callback=None):
+  def dial(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
+    """Performs Dijkstra's algorithm with a bucket queue (Dial's algorithm), which fits the small integer cell weights of
+    a maze better than a binary heap.
+
+    Args:
+        grid (Grid): Grid being searched
+        update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+        stats (SolverStats | None, optional): Counters to fill in while searching; the frontier is every bucket. Defaults to None.
+
+    Raises:
+        ValueError: If a cell has a negative weight
+    """
+    '''
+    Algorithm:
+      1. Keep one bucket (a plain list) of cells per cost. Every tentative cost is at most max_weight more than the cost
+        being expanded, so only max_weight + 1 buckets are ever in use, and they're reused in a ring: cost c goes
+        into bucket c % (max_weight + 1).
+      2. Expand the cells of the bucket of the current cost, then move on to the next cost. Pushing and popping is
+        O(1) list work, instead of O(log n) heapq work with tuple comparisons.
+      3. A cell can be in several buckets when a cheaper path to it is found later. When it's popped with a cost that
+        isn't its current one, it's a stale entry and is skipped; otherwise its cost is final, just like in dijkstra.
+    '''
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    weights = grid.storage.weights_view
+    if grid.storage.weights.min(initial=0) < 0:
+      raise ValueError("dial needs cell weights of at least 0")
+    num_buckets = int(grid.storage.weights.max(initial=0)) + 1
+    buckets = [[] for _ in range(num_buckets)]
+
+    parents[start] = -1
+    costs = MazeSolver.new_score_array(grid)
+    costs[start] = 0
+    buckets[0].append(start)
+    num_queued = 1
+    if stats is not None:
+      stats.pushes += 1
+
+    cost = 0
+    while num_queued:
+      bucket = buckets[cost % num_buckets]
+      while bucket:
+        if stats is not None:
+          stats.record_pop(num_queued)
+        current = bucket.pop()
+        num_queued -= 1
+        if costs[current] != cost:
+          if stats is not None:
+            stats.stale_skips += 1
+          continue
+        grid.set_is_visited_by_index(current, True)
+
+        if current == goal:
+          MazeSolver.reconstruct_path_from_index(current, grid, update_callback)
+          return
+
+        if stats is not None:
+          stats.record_expansion(offsets[current + 1] - offsets[current])
+        for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+          tentative_cost = cost + weights[neighbor]
+          if costs[neighbor] < 0 or tentative_cost < costs[neighbor]:
+            parents[neighbor] = current
+            costs[neighbor] = tentative_cost
+            buckets[tentative_cost % num_buckets].append(neighbor)
+            num_queued += 1
+            if stats is not None:
+              stats.pushes += 1
+
+        if update_callback:
+          update_callback()
+      cost += 1
+
+  @staticmethod
+  def a_star(grid:Grid, update_callback=None, stats: SolverStats | None = None):
     """Performs A* search on the grid.
     Args:
       grid (Grid): Grid being searched
       update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while searching. Defaults to None.
     """
-    start = grid.get_start_cell()
-    goal = grid.get_goal_cell()
-    g_scores = {start: 0}
-    f_scores = {start: MazeSolver.manhattan_distance(start, goal)}
+    start_cell = grid.get_start_cell()
+    goal_cell = grid.get_goal_cell()
+    start = grid.get_list_index(start_cell)
+    goal = grid.get_list_index(goal_cell)
+    goal_x, goal_y = goal_cell.x, goal_cell.y
+    num_cols = grid.num_cols
+    offsets, neighbors = grid.get_adjacency()
+    parents = grid.storage.parents_view
+    weights = grid.storage.weights_view
+    parents[start] = -1
+    g_scores = MazeSolver.new_score_array(grid)
+    g_scores[start] = 0
     
-    # priority queue: (f_score, insertion_index, cell)
+    # priority queue of cell ids by f_score, with decrease-key (see new_open_set)
     # Two cells can have the same lowest f_score, and this is especially likely in an unweighted graph like a maze, so 
-    # the common way to actually solve this is to prioritize the node with the lowest insertion index. So expand the node that was added first.
-    open_set = []
-    current_insertion_index = 0
-    heapq.heappush(open_set, (f_scores[start], current_insertion_index, start)) 
+    # the common way to actually solve this is to prioritize the node that was pushed first, which IndexedHeap does.
+    open_set = MazeSolver.new_open_set(grid, start, MazeSolver.manhattan_distance(start_cell, goal_cell))
+    if stats is not None:
+      stats.pushes += 1
     
     while open_set:
-      # Pop node with smallest f_score from open_set, mark it as visited and remove it from open set (both the heap and map)
-      f_score, _, current_node = heapq.heappop(open_set)
-      grid.set_is_visited(current_node, True)
+      # Pop node with smallest f_score from open_set and mark it as visited
+      if stats is not None:
+        stats.record_pop(len(open_set))
+      current_node, _ = open_set.pop()
+      grid.set_is_visited_by_index(current_node, True)
       
-      if grid.is_goal_cell(current_node):
-        MazeSolver.reconstruct_path(current_node, grid, update_callback)
+      if current_node == goal:
+        MazeSolver.reconstruct_path_from_index(current_node, grid, update_callback)
         return
     
-      for neighbor in grid.get_path_neighbors(current_node):
-        tentative_g_score = g_scores[current_node] + neighbor.weight
+      if stats is not None:
+        stats.record_expansion(offsets[current_node + 1] - offsets[current_node])
+      for neighbor in neighbors[offsets[current_node] : offsets[current_node + 1]]:
+        tentative_g_score = g_scores[current_node] + weights[neighbor]
         
 
         # Case: If the neighbor hasn't been seen before, or the current path from start to neighbor is cheapest than the previous one found
         # In this case, update scores, and add neighbor to visited list if it's not there already.
         # So if you're already visited AND you don't have a better path, we don't care.
-        if neighbor not in g_scores or tentative_g_score < g_scores[neighbor]:
-          neighbor.parent = current_node
+        if g_scores[neighbor] < 0 or tentative_g_score < g_scores[neighbor]:
+          parents[neighbor] = current_node
           g_scores[neighbor] = tentative_g_score
-          f_scores[neighbor] = tentative_g_score + MazeSolver.manhattan_distance(neighbor, goal)
-          current_insertion_index += 1
-          heapq.heappush(open_set, (f_scores[neighbor], current_insertion_index, neighbor))
+          neighbor_y, neighbor_x = divmod(neighbor, num_cols)
+          f_score = tentative_g_score + abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)
+          if open_set.push(neighbor, f_score) and stats is not None:
+            stats.pushes += 1
             
       # After processing data, render things; note that the main thing that's changed is that 
       # the current node is now visited. You could place this callback condition earlier in the while loop
       if update_callback:
         update_callback()
 
-  
-  # JPS (Jump Point Search) (challenge)
-  
\ No newline at end of file
+  @staticmethod
+  def bidirectional_breadth_first_search(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
+    """Performs a bidirectional breadth first search on the grid, searching forward from the start and backward from the goal
+    until both searches meet in the middle.
+
+    Args:
+        grid (Grid): Grid being searched
+        update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+        stats (SolverStats | None, optional): Counters to fill in while searching; the frontier is both layers being 
+          expanded, and a whole layer counts as popped at once. Defaults to None.
+    """
+    '''
+    Algorithm:
+      1. Run two BFS's, one from the start and one from the goal, each with its own distances and parent links. Cells
+        reached by either search are marked as visited, so the renderer shows both frontiers.
+      2. Always expand one whole layer of the side whose frontier is smaller; that keeps the two searches balanced.
+      3. While expanding a layer, whenever we reach a cell the other search has already reached, it's a meeting point,
+        and the path through it has length dist_forward + dist_backward. Keep the shortest one.
+      4. Once a layer produced a meeting point, stop. No path can be shorter than the best meeting point of the first
+        layer that produced one, since before that layer no cell was within reach of both searches.
+      5. Join both halves of the path at the meeting point.
+    '''
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    offsets, neighbors = grid.get_adjacency()
+    forward_parents = grid.storage.parents_view
+    backward_parents = MazeSolver.new_score_array(grid)  # -1 means no parent, same as the grid's parents
+    forward_dist = MazeSolver.new_score_array(grid)
+    backward_dist = MazeSolver.new_score_array(grid)
+    forward_parents[start] = -1
+    forward_dist[start] = 0
+    backward_dist[goal] = 0
+    grid.set_is_visited_by_index(start, True)
+    grid.set_is_visited_by_index(goal, True)
+
+    meeting_index = start if start == goal else -1
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    if stats is not None:
+      stats.pushes += 2
+    while meeting_index < 0 and forward_frontier and backward_frontier:
+      if len(forward_frontier) <= len(backward_frontier):
+        frontier, dist, parents, other_dist = forward_frontier, forward_dist, forward_parents, backward_dist
+      else:
+        frontier, dist, parents, other_dist = backward_frontier, backward_dist, backward_parents, forward_dist
+      if stats is not None:
+        stats.record_pop(len(forward_frontier) + len(backward_frontier))
+        stats.pops += len(frontier) - 1
+
+      best_length = -1
+      next_frontier = []
+      for current in frontier:
+        if stats is not None:
+          stats.record_expansion(offsets[current + 1] - offsets[current])
+        for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+          if dist[neighbor] >= 0:
+            continue
+          dist[neighbor] = dist[current] + 1
+          parents[neighbor] = current
+          grid.set_is_visited_by_index(neighbor, True)
+          next_frontier.append(neighbor)
+          if stats is not None:
+            stats.pushes += 1
+          if other_dist[neighbor] >= 0 and (best_length < 0 or dist[neighbor] + other_dist[neighbor] < best_length):
+            best_length = dist[neighbor] + other_dist[neighbor]
+            meeting_index = neighbor
+        if update_callback:
+          update_callback()
+
+      if frontier is forward_frontier:
+        forward_frontier = next_frontier
+      else:
+        backward_frontier = next_frontier
+
+    if meeting_index >= 0:
+      MazeSolver.reconstruct_bidirectional_path(meeting_index, backward_parents, grid, update_callback)
+
+  @staticmethod
+  def bidirectional_a_star(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
+    """Performs bidirectional A* search on the grid, searching forward from the start (towards the goal) and backward from the goal
+    (towards the start) until both searches meet in the middle.
+
+    Args:
+      grid (Grid): Grid being searched
+      update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while searching; the frontier is both heaps. Defaults to None.
+    """
+    '''
+    Algorithm:
+      1. Run two A* searches, each with its own g_scores, heap and parent links. The forward one uses the manhattan distance
+        to the goal as its heuristic, and the backward one the manhattan distance to the start. Expanded cells are marked as
+        visited, so the renderer shows both frontiers.
+      2. Always expand from the side whose heap is smaller; that keeps the two searches balanced.
+      3. Whenever a search improves the g_score of a cell the other search has also reached, the path through it costs 
+        g_forward + g_backward. Keep the cheapest one found so far as the best path.
+      4. Stop once the top f_score of either heap is no smaller than the cost of the best path. Since manhattan distance never 
+        overestimates, every path that we haven't found yet goes through a cell on that heap whose f_score is a lower bound on 
+        the path's cost, so none of them can beat the best path.
+
+    NOTE: Moving into a cell costs that cell's weight. So going backward from cell x to cell y (a step y -> x for the forward 
+    search) costs the weight of x, and g_backward of a cell doesn't include its own weight.
+    '''
+    start_cell = grid.get_start_cell()
+    goal_cell = grid.get_goal_cell()
+    start = grid.get_list_index(start_cell)
+    goal = grid.get_list_index(goal_cell)
+    num_cols = grid.num_cols
+    offsets, neighbors = grid.get_adjacency()
+    weights = grid.storage.weights_view
+    forward_parents = grid.storage.parents_view
+    backward_parents = MazeSolver.new_score_array(grid)
+    forward_g_scores = MazeSolver.new_score_array(grid)
+    backward_g_scores = MazeSolver.new_score_array(grid)
+    forward_parents[start] = -1
+    forward_g_scores[start] = 0
+    backward_g_scores[goal] = 0
+
+    # priority queues: (f_score, insertion_index, cell id, g_score); g_score lets us skip stale entries
+    distance = MazeSolver.manhattan_distance(start_cell, goal_cell)
+    forward_open_set = [(distance, 0, start, 0)]
+    backward_open_set = [(distance, 1, goal, 0)]
+    insertion_index = 1
+    if stats is not None:
+      stats.pushes += 2
+
+    best_cost = 0 if start == goal else -1
+    meeting_index = start if start == goal else -1
+    while forward_open_set and backward_open_set:
+      if best_cost >= 0 and (forward_open_set[0][0] >= best_cost or backward_open_set[0][0] >= best_cost):
+        break
+
+      is_forward = len(forward_open_set) <= len(backward_open_set)
+      if is_forward:
+        open_set, g_scores, parents, other_g_scores = forward_open_set, forward_g_scores, forward_parents, backward_g_scores
+        target_x, target_y = goal_cell.x, goal_cell.y
+      else:
+        open_set, g_scores, parents, other_g_scores = backward_open_set, backward_g_scores, backward_parents, forward_g_scores
+        target_x, target_y = start_cell.x, start_cell.y
+
+      if stats is not None:
+        stats.record_pop(len(forward_open_set) + len(backward_open_set))
+      _, _, current, g_score = heapq.heappop(open_set)
+      if g_score != g_scores[current]:
+        if stats is not None:
+          stats.stale_skips += 1
+        continue
+      grid.set_is_visited_by_index(current, True)
+      if stats is not None:
+        stats.record_expansion(offsets[current + 1] - offsets[current])
+
+      step_cost = 0 if is_forward else weights[current]
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        tentative_g_score = g_score + (weights[neighbor] if is_forward else step_cost)
+        if g_scores[neighbor] >= 0 and tentative_g_score >= g_scores[neighbor]:
+          continue
+        parents[neighbor] = current
+        g_scores[neighbor] = tentative_g_score
+        neighbor_y, neighbor_x = divmod(neighbor, num_cols)
+        f_score = tentative_g_score + abs(neighbor_x - target_x) + abs(neighbor_y - target_y)
+        insertion_index += 1
+        heapq.heappush(open_set, (f_score, insertion_index, neighbor, tentative_g_score))
+        if stats is not None:
+          stats.pushes += 1
+
+        if other_g_scores[neighbor] >= 0 and (best_cost < 0 or tentative_g_score + other_g_scores[neighbor] < best_cost):
+          best_cost = tentative_g_score + other_g_scores[neighbor]
+          meeting_index = neighbor
+
+      if update_callback:
+        update_callback()
+
+    if meeting_index >= 0:
+      MazeSolver.reconstruct_bidirectional_path(meeting_index, backward_parents, grid, update_callback)
+
+  @staticmethod
+  def jump_point_search(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> int:
+    """Performs Jump Point Search (JPS) on the grid. This is A* over "jump points" only, skipping every run of cells that
+    an equally short path could go around, which is what makes A* slow on open grids.
+
+    Args:
+      grid (Grid): Grid being searched
+      update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while searching; expansions are jump points, and the
+        neighbor lookups of one are the jumps made from it. Defaults to None.
+
+    Returns:
+      int: The number of jump points that were expanded, which like for the other solvers doesn't count the goal
+
+    NOTE: Every cell a jump scans over is marked as visited, not just the jump points, so the visited cells are the
+    ones JPS actually looked at, comparable with the other solvers. The jump points alone are what's counted as
+    expansions.
+
+    NOTE: JPS relies on every move costing the same, so it ignores cell weights. On a uniform grid it finds paths of the 
+    same length as a_star.
+    """
+    '''
+    This is the 4-connected version of JPS, adapted to walls between cells rather than blocked cells. Among all shortest 
+    paths, we only look for the "canonical" ones that make their vertical moves as early as possible:
+      1. Vertical moves play the role that diagonal moves have in 8-connected JPS. While jumping up or down, every cell
+        may turn left or right, so at each cell we scan horizontally in both directions; if either scan finds a jump 
+        point, the current cell is a jump point too.
+      2. Horizontal moves go straight, and stop at a cell n (reached from p) that has a "forced" vertical neighbor: the 
+        wall between n and the cell above it is down, but the path p -> above(p) -> above(n), which would have taken 
+        the vertical step earlier, is blocked by a wall. Same for the cell below.
+      3. The goal is always a jump point.
+    Successors of a jump point are then: the start jumps in all four directions; a cell reached vertically keeps jumping
+    vertically and also jumps left and right; a cell reached horizontally keeps jumping horizontally and jumps vertically 
+    towards its forced neighbors. Everything else is plain A* with manhattan distance, where the cost of a jump is its length.
+    Finally, the cells between consecutive jump points are filled in, which gives the full path.
+    '''
+    start_cell = grid.get_start_cell()
+    goal_cell = grid.get_goal_cell()
+    start = grid.get_list_index(start_cell)
+    goal = grid.get_list_index(goal_cell)
+    num_cols = grid.num_cols
+    flags = grid.storage.flags_view
+    set_is_visited_by_index = grid.set_is_visited_by_index
+
+    # Per direction: the change in list index when moving that way; Cell.WALL_MASKS has the mask of the wall blocking the move
+    up, down, left, right = Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT
+    steps = {up: -num_cols, down: num_cols, left: -1, right: 1}
+    wall_masks = Cell.WALL_MASKS
+
+    def is_forced(previous: int, current: int, vertical: Direction, horizontal: Direction) -> bool:
+      # Whether the vertical neighbor of `current` can't be reached just as fast through `previous` (see step 2 above)
+      return not flags[current] & wall_masks[vertical] and bool(
+        flags[previous] & wall_masks[vertical] or flags[previous + steps[vertical]] & wall_masks[horizontal]
+      )
+
+    def jump_horizontal(current: int, horizontal: Direction) -> int:
+      step = steps[horizontal]
+      while not flags[current] & wall_masks[horizontal]:
+        previous, current = current, current + step
+        set_is_visited_by_index(current, True)
+        if current == goal or is_forced(previous, current, up, horizontal) or is_forced(previous, current, down, horizontal):
+          return current
+      return -1
+
+    def jump_vertical(current: int, vertical: Direction) -> int:
+      step = steps[vertical]
+      while not flags[current] & wall_masks[vertical]:
+        current += step
+        set_is_visited_by_index(current, True)
+        if current == goal or jump_horizontal(current, left) >= 0 or jump_horizontal(current, right) >= 0:
+          return current
+      return -1
+
+    jump_parents = MazeSolver.new_score_array(grid)
+    g_scores = MazeSolver.new_score_array(grid)
+    g_scores[start] = 0
+
+    # priority queue: (f_score, insertion_index, cell id, g_score, direction we arrived from); no direction means the start
+    open_set = [(MazeSolver.manhattan_distance(start_cell, goal_cell), 0, start, 0, None)]
+    insertion_index = 0
+    num_expanded = 0
+    if stats is not None:
+      stats.pushes += 1
+    while open_set:
+      if stats is not None:
+        stats.record_pop(len(open_set))
+      _, _, current, g_score, direction = heapq.heappop(open_set)
+      if g_score != g_scores[current]:
+        if stats is not None:
+          stats.stale_skips += 1
+        continue
+      grid.set_is_visited_by_index(current, True)
+
+      if current == goal:
+        break
+      num_expanded += 1
+
+      if direction is None:
+        successors = [jump_vertical(current, up), jump_vertical(current, down), jump_horizontal(current, left), jump_horizontal(current, right)]
+      elif direction is up or direction is down:
+        successors = [jump_vertical(current, direction), jump_horizontal(current, left), jump_horizontal(current, right)]
+      else:
+        previous = current - steps[direction]
+        successors = [jump_horizontal(current, direction)]
+        successors.extend(jump_vertical(current, vertical) for vertical in (up, down) if is_forced(previous, current, vertical, direction))
+      if stats is not None:
+        stats.record_expansion(len(successors))
+
+      current_y, current_x = divmod(current, num_cols)
+      for successor in successors:
+        if successor < 0:
+          continue
+        successor_y, successor_x = divmod(successor, num_cols)
+        tentative_g_score = g_score + abs(successor_x - current_x) + abs(successor_y - current_y)
+        if g_scores[successor] >= 0 and tentative_g_score >= g_scores[successor]:
+          continue
+        g_scores[successor] = tentative_g_score
+        jump_parents[successor] = current
+        if successor_x == current_x:
+          successor_direction = up if successor_y < current_y else down
+        else:
+          successor_direction = left if successor_x < current_x else right
+        f_score = tentative_g_score + abs(successor_x - goal_cell.x) + abs(successor_y - goal_cell.y)
+        insertion_index += 1
+        heapq.heappush(open_set, (f_score, insertion_index, successor, tentative_g_score, successor_direction))
+        if stats is not None:
+          stats.pushes += 1
+
+      if update_callback:
+        update_callback()
+
+    if g_scores[goal] < 0:
+      return num_expanded
+
+    # Fill in the straight runs of cells between consecutive jump points, so the grid has a parent link for every cell on the path
+    parents = grid.storage.parents_view
+    parents[start] = -1
+    current = goal
+    while current != start:
+      jump_parent = jump_parents[current]
+      current_y, current_x = divmod(current, num_cols)
+      jump_parent_y, jump_parent_x = divmod(jump_parent, num_cols)
+      if jump_parent_x == current_x:
+        towards_parent = up if jump_parent_y < current_y else down
+      else:
+        towards_parent = left if jump_parent_x < current_x else right
+      while current != jump_parent:
+        parents[current] = current + steps[towards_parent]
+        current += steps[towards_parent]
+    MazeSolver.reconstruct_path_from_index(goal, grid, update_callback)
+    return num_expanded
+
+  @staticmethod
+  def tree_path(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
+    """Finds the path of a perfect maze with its TreeIndex, without searching: the only path from start to goal goes
+    up to their lowest common ancestor and back down. Building the index takes one pass over the maze, and every later
+    solve of the same maze only takes time proportional to the path.
+
+    Args:
+      grid (Grid): Grid being solved, which has to be perfect (see Grid.is_perfect)
+      update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in; every cell walked on the way to the LCA counts as an
+        expansion that looks up one neighbor (its parent). Defaults to None.
+
+    Raises:
+      ValueError: If the grid isn't a perfect maze
+    """
+    if not grid.is_perfect:
+      raise ValueError("tree_path only solves perfect mazes")
+    start = grid.get_list_index(grid.get_start_cell())
+    goal = grid.get_list_index(grid.get_goal_cell())
+    path = TreeIndex.get(grid).get_path(start, goal)
+
+    # Cells on the path are the only ones the solver looks at, so they're the visited ones
+    parents = grid.storage.parents_view
+    parents[start] = -1
+    previous = -1
+    for current in path:
+      parents[current] = previous
+      grid.set_is_visited_by_index(current, True)
+      previous = current
+      if stats is not None:
+        stats.record_expansion(1)
+    MazeSolver.reconstruct_path_from_index(goal, grid, update_callback)
+
+  @staticmethod
+  def solve(grid: Grid, update_callback=None, stats: SolverStats | None = None) -> None:
+    """Solves the maze with the fastest solver that fits it: tree_path for perfect mazes, a_star for the rest.
+
+    Args:
+      grid (Grid): Grid being solved
+      update_callback (_type_, optional): Callback to update visualization. Defaults to None.
+      stats (SolverStats | None, optional): Counters to fill in while solving. Defaults to None.
+    """
+    solver_fn = MazeSolver.tree_path if grid.is_perfect else MazeSolver.a_star
+    solver_fn(grid, update_callback, stats=stats)
@@ -0,0 +1,133 @@
+import numpy as np
+
+from algorithms.TreeIndex import TreeIndex
+from grid.Grid import Grid
+
+
+class PathService:
+  def __init__(self, grid: Grid):
+    """Answers batches of shortest path queries between any two cells of a finished maze.
+
+    Args:
+        grid (Grid): Maze being queried. It's frozen if it isn't already, and walls shouldn't change afterwards.
+
+    NOTE: Unlike MazeSolver, nothing here writes to the grid: no visited/in-path flags and no parent links. Every
+    query call keeps its search state in arrays of its own, over the grid's read-only CSR adjacency index, so any
+    number of calls can run at the same time (e.g. from a thread pool) on one grid. Path lengths are numbers of moves,
+    so cell weights are ignored.
+
+    NOTE: Perfect mazes (see Grid.is_perfect) are answered with the maze's TreeIndex instead of searching, which takes
+    O(log n) per path length and time proportional to the path for the path itself.
+    """
+    self.grid = grid
+    self.num_rows = grid.num_rows
+    self.num_cols = grid.num_cols
+    self.num_cells = grid.storage.size
+    self.offsets, self.neighbors = grid.get_adjacency()
+    self.tree_index = TreeIndex.get(grid) if grid.is_perfect else None
+
+  def get_cell_ids(self, positions: np.ndarray) -> np.ndarray:
+    """Returns the list index of every (x, y) position in an array of shape (n, 2)"""
+    xs, ys = positions[:, 0], positions[:, 1]
+    if ((xs < 0) | (xs >= self.num_cols) | (ys < 0) | (ys >= self.num_rows)).any():
+      raise ValueError("Query positions must be in range")
+    return ys * self.num_cols + xs
+
+  def query(self, pairs, return_paths: bool = False) -> tuple[np.ndarray, list[np.ndarray] | None]:
+    """Finds the shortest path of every (start, end) pair.
+
+    Args:
+        pairs (array-like): (start, end) pairs of (x, y) positions, of shape (n, 2, 2); the same format as a grid's
+          start_pos/end_pos
+        return_paths (bool, optional): Whether to also return the paths. Defaults to False.
+
+    Returns:
+        tuple[np.ndarray, list[np.ndarray] | None]: The int32 length (number of moves) of each pair's path, -1 when
+        end can't be reached from start. With return_paths, also the paths themselves, as arrays of shape (length + 1, 2)
+        holding the (x, y) positions from start to end (empty when there's no path); otherwise None.
+
+    NOTE: Walls block both ways, so the path from a to b is the path from b to a reversed. Pairs are grouped by
+    their start or by their end, whichever gives fewer groups, and every group is answered by a single BFS from the
+    shared cell, which stops once it has reached every cell of the group.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2, 2)
+    starts = self.get_cell_ids(pairs[:, 0])
+    ends = self.get_cell_ids(pairs[:, 1])
+    if self.tree_index is not None:
+      lengths = self.tree_index.get_distances(starts, ends)
+      if not return_paths:
+        return lengths, None
+      paths = [self._get_positions(np.array(self.tree_index.get_path(start, end))) for start, end in zip(starts.tolist(), ends.tolist())]
+      return lengths, paths
+
+    lengths = np.full(len(pairs), -1, dtype=np.int32)
+    paths = [None] * len(pairs) if return_paths else None
+
+    # Search from whichever side has fewer distinct cells
+    is_searching_from_ends = len(np.unique(ends)) < len(np.unique(starts))
+    sources, targets = (ends, starts) if is_searching_from_ends else (starts, ends)
+    order = np.argsort(sources, kind="stable")
+    group_bounds = np.flatnonzero(np.diff(sources[order])) + 1
+
+    # Scratch state shared by the searches of this call. A cell's distance and parent only count while its stamp is
+    # the number of the current search, so nothing has to be cleared between searches.
+    stamps = memoryview(np.zeros(self.num_cells, dtype=np.int32))
+    distances = memoryview(np.empty(self.num_cells, dtype=np.int32))
+    parents = memoryview(np.empty(self.num_cells, dtype=np.int32))
+
+    for search_id, group in enumerate(np.split(order, group_bounds), start=1):
+      if len(group) == 0:
+        continue
+      source = int(sources[group[0]])
+      self._search(source, set(targets[group].tolist()), search_id, stamps, distances, parents)
+      for pair_index in group.tolist():
+        target = int(targets[pair_index])
+        if stamps[target] != search_id:
+          if return_paths:
+            paths[pair_index] = np.empty((0, 2), dtype=np.int64)
+          continue
+        lengths[pair_index] = distances[target]
+        if return_paths:
+          path = self._get_path(target, parents, distances[target])
+          # The walk goes from target back to source, which is end -> start unless we searched from the ends
+          paths[pair_index] = self._get_positions(path if is_searching_from_ends else path[::-1])
+    return lengths, paths
+
+  def _search(self, source: int, targets: set[int], search_id: int, stamps: memoryview, distances: memoryview, parents: memoryview) -> None:
+    """BFS from source that stops once every cell in targets has been reached (or there's nothing left to reach)"""
+    offsets, neighbors = self.offsets, self.neighbors
+    stamps[source] = search_id
+    distances[source] = 0
+    parents[source] = -1
+    remaining = len(targets) - (source in targets)
+
+    # Cells are appended while the list is being iterated over, so this walks through them in BFS order without
+    # ever popping anything
+    queue = [source]
+    for current in queue:
+      if remaining == 0:
+        break
+      distance = distances[current] + 1
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        if stamps[neighbor] == search_id:
+          continue
+        stamps[neighbor] = search_id
+        distances[neighbor] = distance
+        parents[neighbor] = current
+        queue.append(neighbor)
+        if neighbor in targets:
+          remaining -= 1
+
+  @staticmethod
+  def _get_path(target: int, parents: memoryview, length: int) -> np.ndarray:
+    """Returns the cell ids from target back to the source of the search, following the parent links"""
+    path = np.empty(length + 1, dtype=np.int64)
+    current = target
+    for step in range(length + 1):
+      path[step] = current
+      current = parents[current]
+    return path
+
+  def _get_positions(self, cell_ids: np.ndarray) -> np.ndarray:
+    ys, xs = np.divmod(cell_ids, self.num_cols)
+    return np.column_stack((xs, ys))
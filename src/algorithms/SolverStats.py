@@ -0,0 +1,39 @@
+class SolverStats:
+  """Counters a MazeSolver method fills in while it searches, when one is passed to it as `stats`.
+
+  They tell why a solver is slow rather than just that it is: how many cells it expanded, how much work went into
+  its frontier (the queue, stack or heap of cells waiting to be expanded), how many heap entries it popped only to
+  throw away, and how many neighbors it looked at.
+
+  NOTE: Solvers only touch the counters behind `if stats is not None` checks, so leaving stats out costs a few
+  comparisons per expansion and nothing else.
+  """
+
+  # Names of the counters, in the order they're set in __init__ and as_tuple returns them
+  FIELDS = ("expansions", "pushes", "pops", "stale_skips", "max_frontier", "neighbor_lookups")
+  __slots__ = FIELDS
+
+  def __init__(self):
+    self.expansions = 0  # cells (or jump points) whose neighbors were looked at
+    self.pushes = 0  # entries added to the frontier
+    self.pops = 0  # entries taken off the frontier, stale ones included
+    self.stale_skips = 0  # popped heap entries thrown away since a cheaper one for the same cell came first
+    self.max_frontier = 0  # largest number of entries the frontier held at once
+    self.neighbor_lookups = 0  # neighbors looked at over all expansions
+
+  def record_pop(self, frontier_size: int) -> None:
+    """Counts an entry taken off the frontier, which held frontier_size entries right before"""
+    self.pops += 1
+    self.max_frontier = max(self.max_frontier, frontier_size)
+
+  def record_expansion(self, num_neighbors: int) -> None:
+    """Counts an expansion of a cell with num_neighbors neighbors"""
+    self.expansions += 1
+    self.neighbor_lookups += num_neighbors
+
+  def as_tuple(self) -> tuple[int, ...]:
+    return tuple(getattr(self, name) for name in SolverStats.FIELDS)
+
+  def __repr__(self) -> str:
+    counters = ", ".join(f"{name}={getattr(self, name)}" for name in SolverStats.FIELDS)
+    return f"SolverStats({counters})"
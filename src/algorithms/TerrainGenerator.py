@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+
+from grid.Grid import Grid
+
+
+class TerrainGenerator:
+  """Fills in the weight of every cell of a grid, i.e. the cost of moving into it, which is what dijkstra, a_star
+  and dial minimize. Weights are written straight into the grid's storage in one vectorized write.
+
+  NOTE: Like randomized_kruskal_batch, the weights are drawn from a numpy generator seeded off Python's `random`, so
+  the terrain is reproducible from random.seed (and the --seed flag).
+  """
+
+  @staticmethod
+  def uniform(grid: Grid, max_weight: int = 9) -> None:
+    """Gives every cell a weight of 1, which is what a grid starts out with"""
+    grid.storage.weights[:] = 1
+
+  @staticmethod
+  def random_weights(grid: Grid, max_weight: int = 9) -> None:
+    """Gives every cell an independent, uniformly random weight in [1, max_weight]
+
+    Args:
+        grid (Grid): Grid whose weights are being set
+        max_weight (int, optional): Largest weight a cell can get. Defaults to 9.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    grid.storage.weights[:] = rng.integers(1, max_weight + 1, size=grid.storage.size, dtype=np.int32)
+
+  @staticmethod
+  def noise_weights(grid: Grid, max_weight: int = 9, feature_size: int = 8) -> None:
+    """Gives the grid smoothly varying weights in [1, max_weight] (value noise), so there are cheap valleys and
+    expensive hills that are several cells across, rather than every cell being random on its own.
+
+    Args:
+        grid (Grid): Grid whose weights are being set
+        max_weight (int, optional): Largest weight a cell can get. Defaults to 9.
+        feature_size (int, optional): Rough size of the hills and valleys, in cells. Defaults to 8.
+
+    NOTE: Random values are drawn on a coarse lattice with one point every feature_size cells, and every cell
+    interpolates between the four lattice points around it (bilinear, with smoothstep easing so lattice lines
+    don't show).
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    lattice = rng.random((grid.num_rows // feature_size + 2, grid.num_cols // feature_size + 2))
+
+    def get_lattice_positions(length: int) -> tuple[np.ndarray, np.ndarray]:
+      positions = np.arange(length) / feature_size
+      lower = positions.astype(np.int64)
+      fraction = positions - lower
+      return lower, fraction * fraction * (3 - 2 * fraction)
+
+    rows, row_fractions = get_lattice_positions(grid.num_rows)
+    cols, col_fractions = get_lattice_positions(grid.num_cols)
+    row_fractions = row_fractions[:, np.newaxis]
+    top = lattice[rows][:, cols] * (1 - col_fractions) + lattice[rows][:, cols + 1] * col_fractions
+    bottom = lattice[rows + 1][:, cols] * (1 - col_fractions) + lattice[rows + 1][:, cols + 1] * col_fractions
+    noise = top * (1 - row_fractions) + bottom * row_fractions
+
+    weights = 1 + np.floor(noise * max_weight).astype(np.int32)
+    grid.storage.weights[:] = np.minimum(weights, max_weight).ravel()
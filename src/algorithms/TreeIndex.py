@@ -0,0 +1,134 @@
+import numpy as np
+
+from grid.Grid import Grid
+
+
+class TreeIndex:
+  def __init__(self, grid: Grid):
+    """Index of a perfect maze that answers path queries without searching.
+
+    Args:
+        grid (Grid): A perfect maze (see Grid.is_perfect), so every cell is reachable from every other one in exactly one way
+
+    Raises:
+        ValueError: If the maze isn't a spanning tree
+
+    NOTE: A perfect maze is a spanning tree of the grid. We root it at cell 0, and store every cell's depth along with
+    its 2^k-th ancestor for every k (binary lifting). The only path between two cells goes up from both of them to
+    their lowest common ancestor (LCA), which takes O(log n) table lookups to find, so a path length is
+    depth[a] + depth[b] - 2 * depth[lca] and a path is two walks up the parent links. Building the index is a single
+    BFS plus O(n log n) vectorized table work; use TreeIndex.get to build it once per maze.
+    """
+    offsets, neighbors = grid.get_adjacency()
+    num_cells = grid.storage.size
+    if len(neighbors) != 2 * (num_cells - 1):
+      raise ValueError("Maze isn't a spanning tree; it needs exactly one passage less than it has cells")
+
+    parents = np.full(num_cells, -1, dtype=np.int32)
+    depths = np.full(num_cells, -1, dtype=np.int32)
+    parents_view = memoryview(parents)
+    depths_view = memoryview(depths)
+    parents_view[0] = 0  # the root is its own parent, which keeps ancestor lookups from walking off the tree
+    depths_view[0] = 0
+
+    # Cells are appended while the list is being iterated over, so this walks through them in BFS order
+    order = [0]
+    for current in order:
+      depth = depths_view[current] + 1
+      for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+        if depths_view[neighbor] < 0:
+          depths_view[neighbor] = depth
+          parents_view[neighbor] = current
+          order.append(neighbor)
+    if len(order) != num_cells:
+      raise ValueError("Maze isn't a spanning tree; not every cell can be reached")
+
+    # ancestors[k][i] is the 2^k-th ancestor of cell i (or the root, if the tree isn't that deep above i)
+    num_levels = max(1, int(depths.max()).bit_length())
+    ancestors = np.empty((num_levels, num_cells), dtype=np.int32)
+    ancestors[0] = parents
+    for level in range(1, num_levels):
+      ancestors[level] = ancestors[level - 1][ancestors[level - 1]]
+
+    self.num_cols = grid.num_cols
+    self.depths = depths
+    self.ancestors = ancestors
+    # Single queries read one element at a time, which memoryviews do much faster than numpy indexing
+    self.depths_view = depths_view
+    self.ancestor_views = [memoryview(row) for row in ancestors]
+
+  @staticmethod
+  def get(grid: Grid) -> "TreeIndex":
+    """Returns the tree index of a perfect maze, building it the first time. Like the CSR adjacency index, it's
+    dropped as soon as a wall of the maze changes."""
+    if grid.tree_index is None:
+      grid.tree_index = TreeIndex(grid)
+    return grid.tree_index
+
+  def get_lca(self, a: int, b: int) -> int:
+    """Returns the lowest common ancestor of the cells with list indices a and b"""
+    depths = self.depths_view
+    ancestors = self.ancestor_views
+    if depths[a] < depths[b]:
+      a, b = b, a
+
+    # Lift a up to the depth of b, one set bit of the depth difference at a time
+    difference = depths[a] - depths[b]
+    level = 0
+    while difference:
+      if difference & 1:
+        a = ancestors[level][a]
+      difference >>= 1
+      level += 1
+    if a == b:
+      return a
+
+    # Lift both by the largest jumps that keep them apart; then they're children of the LCA
+    for level in range(len(ancestors) - 1, -1, -1):
+      if ancestors[level][a] != ancestors[level][b]:
+        a = ancestors[level][a]
+        b = ancestors[level][b]
+    return ancestors[0][a]
+
+  def get_distance(self, a: int, b: int) -> int:
+    """Returns the number of moves on the path between the cells with list indices a and b"""
+    depths = self.depths_view
+    return depths[a] + depths[b] - 2 * depths[self.get_lca(a, b)]
+
+  def get_path(self, a: int, b: int) -> list[int]:
+    """Returns the list indices of the cells on the path from a to b, both included, in O(path length)"""
+    lca = self.get_lca(a, b)
+    parents = self.ancestor_views[0]
+    path = [a]
+    while path[-1] != lca:
+      path.append(parents[path[-1]])
+    tail = [b]
+    while tail[-1] != lca:
+      tail.append(parents[tail[-1]])
+    path.extend(reversed(tail[:-1]))
+    return path
+
+  def get_lcas(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Vectorized get_lca: returns the LCA of every pair (a[i], b[i]), lifting all pairs at once"""
+    depths = self.depths
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    is_swapped = depths[a] < depths[b]
+    a, b = np.where(is_swapped, b, a), np.where(is_swapped, a, b)
+
+    difference = depths[a] - depths[b]
+    for level, ancestors in enumerate(self.ancestors):
+      a = np.where((difference >> level) & 1, ancestors[a], a)
+
+    for ancestors in self.ancestors[::-1]:
+      a_ancestors = ancestors[a]
+      b_ancestors = ancestors[b]
+      is_apart = a_ancestors != b_ancestors
+      a = np.where(is_apart, a_ancestors, a)
+      b = np.where(is_apart, b_ancestors, b)
+    return np.where(a == b, a, self.ancestors[0][a])
+
+  def get_distances(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Vectorized get_distance: returns the int32 number of moves between every pair (a[i], b[i])"""
+    depths = self.depths
+    return (depths[a] + depths[b] - 2 * depths[self.get_lcas(a, b)]).astype(np.int32)
@@ -1,62 +1,63 @@
+import numpy as np
+
+
 class UnionFind:
   def __init__(self, size):
-    # Create list of indices = [0, ..., size-1]
-    self.parent = list(range(size))  
+    # Create array of indices = [0, ..., size-1]; every node starts out as its own root
+    self.parent = np.arange(size, dtype=np.int32 if size < 2**31 else np.int64)
 
-    # Create a list of ranks, all initialized to 0
-    self.rank = [0] * size  # Rank used for union by rank
+    # Create an array of set sizes, all initialized to 1. Only the entries of roots are kept up to date.
+    self.size = np.ones(size, dtype=self.parent.dtype)
+
+    # Reading and writing single elements through memoryviews is much faster than indexing numpy arrays,
+    # and the loops in this class do a lot of that.
+    self.parent_view = memoryview(self.parent)
+    self.size_view = memoryview(self.size)
 
   def findRoot(self, node):
-    """Finds the root of the given node with path compression.
+    """Finds the root of the given node with path halving.
 
     Args:
         node (int): The node whose root is to be found. Node is just an index position.
 
     Returns:
         int: The root of the node. Again corresponds to an index position
+
+    NOTE: This is iterative, so deep trees can't hit Python's recursion limit. While walking up, every node we pass
+    is pointed to its grandparent, which halves the length of the path for the next search.
     """
-    if (node == self.parent[node]):
-      return node
-    
-    # Find the root of the parent node
-    res = self.findRoot(self.parent[node])
-
-    # At this point we find the root of the entire tree
-    # Update the current node's parent to be the root of the entire tree
-    self.parent[node] = res
-
-    return res
-  
-  def unionByRank(self, x, y) -> None:
-    """Unites two sets containing x and y using union by rank.
+    parent = self.parent_view
+    while parent[node] != node:
+      grandparent = parent[parent[node]]
+      parent[node] = grandparent
+      node = grandparent
+    return node
+
+  def unionBySize(self, x, y) -> bool:
+    """Unites two sets containing x and y using union by size.
     Args:
-        x (int): An element in the first set; 
-        y (int): An element in the second set; 
+        x (int): An element in the first set;
+        y (int): An element in the second set;
+
+    Returns:
+        bool: True if the sets were merged, False if x and y were already in the same set.
 
-    NOTE: x and y are both indices 
+    NOTE: x and y are both indices
     """
     root_x = self.findRoot(x)
     root_y = self.findRoot(y)
 
     # If their roots are the same, then they belong to the same group; no need to merge
     if (root_x == root_y):
-      return
-    
-    '''
-    - If x's root has a lower rank than y's root:
-      We'll need to make root_x a child of root_y
-    - Else if y has a lower rank, make y a child of x.
-
-    - Else, they're both equal, it doesn't matter how we merge, so we'll 
-      make root_X a child of root_y. However you'll have to increase the rank of root_y's tree.
-    '''
-    if self.rank[root_x] < self.rank[root_y]:
-      self.parent[root_x] = root_y
-    elif self.rank[root_x] > self.rank[root_y]:
-      self.parent[root_y] = root_x
-    else:
-      self.parent[root_x] = root_y
-      self.rank[root_y] += 1
+      return False
+
+    # Make the root of the smaller tree a child of the root of the larger one, which keeps the trees shallow
+    size = self.size_view
+    if size[root_x] < size[root_y]:
+      root_x, root_y = root_y, root_x
+    self.parent_view[root_y] = root_x
+    size[root_x] += size[root_y]
+    return True
 
   def connected(self, x, y):
     """Checks if two elements are in the same set.
@@ -68,5 +69,74 @@ class UnionFind:
     Returns:
         bool: True if x and y are in the same set, False otherwise.
     """
-    return self.findRoot(x) == self.findRoot(y)    
-    
+    return self.findRoot(x) == self.findRoot(y)
+
+  def findRoots(self, nodes: np.ndarray) -> np.ndarray:
+    """Finds the roots of many nodes at once, by pointer jumping over the whole array of nodes in lockstep.
+
+    Args:
+        nodes (np.ndarray): Array of node indices
+
+    Returns:
+        np.ndarray: The root of each node
+    """
+    roots = self.parent[nodes]
+    while True:
+      grandparents = self.parent[roots]
+      if np.array_equal(grandparents, roots):
+        return roots
+      roots = grandparents
+
+  def connectedMany(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Checks, for every pair (xs[i], ys[i]), whether both elements are in the same set.
+
+    Args:
+        xs (np.ndarray): The first element of each pair
+        ys (np.ndarray): The second element of each pair
+
+    Returns:
+        np.ndarray: Boolean array, True where the pair is connected.
+    """
+    return self.findRoots(xs) == self.findRoots(ys)
+
+  def unionMany(self, xs: np.ndarray, ys: np.ndarray, chunk_size: int = 1 << 20) -> np.ndarray:
+    """Unites the sets of every pair (xs[i], ys[i]), in order.
+
+    Args:
+        xs (np.ndarray): The first element of each pair
+        ys (np.ndarray): The second element of each pair
+        chunk_size (int, optional): Number of pairs whose roots are looked up together. Defaults to 2^20.
+
+    Returns:
+        np.ndarray: Boolean array, True where the pair was in two different sets and got merged. Running this over a
+        shuffled list of edges returns exactly the edges that Kruskal's algorithm keeps.
+
+    NOTE: Unions depend on the ones before them, so they can't be vectorized. What can be is weeding out pairs: at the
+    start of each chunk the roots of all its pairs are found with findRoots, and pairs that are already connected are
+    skipped, since sets only ever grow. The rest go through the same find/union as above, inlined to save two method
+    calls per pair, and starting from the roots we just found.
+    """
+    xs = np.asarray(xs)
+    ys = np.asarray(ys)
+    parent = self.parent_view
+    size = self.size_view
+    is_merged = np.zeros(len(xs), dtype=bool)
+    for chunk_start in range(0, len(xs), chunk_size):
+      roots_x = self.findRoots(xs[chunk_start : chunk_start + chunk_size])
+      roots_y = self.findRoots(ys[chunk_start : chunk_start + chunk_size])
+      candidates = np.flatnonzero(roots_x != roots_y)
+      for pair_index, x, y in zip((candidates + chunk_start).tolist(), roots_x[candidates].tolist(), roots_y[candidates].tolist()):
+        while parent[x] != x:
+          parent[x] = parent[parent[x]]
+          x = parent[x]
+        while parent[y] != y:
+          parent[y] = parent[parent[y]]
+          y = parent[y]
+        if x == y:
+          continue
+        if size[x] < size[y]:
+          x, y = y, x
+        parent[y] = x
+        size[x] += size[y]
+        is_merged[pair_index] = True
+    return is_merged
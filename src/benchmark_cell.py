@@ -0,0 +1,94 @@
+'''
+Memory/time benchmark of the slotted Cell against the previous dict-backed Cell.
+
+Run from the src directory:
+  uv run benchmark_cell.py
+'''
+import time
+import tracemalloc
+
+from grid.Cell import Cell
+from utils.Direction import Direction
+
+
+class LegacyCell:
+  """The Cell class as it was before slots and wall masks; kept only so the benchmark has a baseline."""
+
+  def __init__(self, x: int, y: int):
+    self.x = x
+    self.y = y
+    self.weight = 1
+    self.parent = None
+    self.flags = 0b001111
+
+  def set_bit(self, bit_index):
+    self.flags |= 1 << bit_index
+
+  def clear_bit(self, bit_index):
+    self.flags &= ~(1 << bit_index)
+
+  def get_bit(self, bit_index):
+    return self.flags & (1 << bit_index)
+
+  def get_wall(self, direction: Direction) -> bool:
+    if direction == Direction.UP:
+      return bool(self.get_bit(3))
+    elif direction == Direction.LEFT:
+      return bool(self.get_bit(2))
+    elif direction == Direction.RIGHT:
+      return bool(self.get_bit(1))
+    else:
+      return bool(self.get_bit(0))
+
+  def set_wall(self, direction: Direction, is_up: bool) -> None:
+    if direction == Direction.UP:
+      if is_up:
+        self.set_bit(3)
+      else:
+        self.clear_bit(3)
+    elif direction == Direction.LEFT:
+      if is_up:
+        self.set_bit(2)
+      else:
+        self.clear_bit(2)
+    elif direction == Direction.RIGHT:
+      if is_up:
+        self.set_bit(1)
+      else:
+        self.clear_bit(1)
+    else:
+      if is_up:
+        self.set_bit(0)
+      else:
+        self.clear_bit(0)
+
+
+def benchmark(cell_class, num_cells: int) -> tuple[float, float, float]:
+  """Builds `num_cells` cells and checks all four walls of each one, the same access pattern a solver expansion has.
+
+  Returns:
+      tuple[float, float, float]: (construction time in seconds, memory in MB, wall check time in seconds)
+  """
+  tracemalloc.start()
+  start_time = time.perf_counter()
+  cells = [cell_class(i, 0) for i in range(num_cells)]
+  build_time = time.perf_counter() - start_time
+  memory, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  directions = list(Direction)
+  start_time = time.perf_counter()
+  for cell in cells:
+    for direction in directions:
+      cell.get_wall(direction)
+  wall_time = time.perf_counter() - start_time
+  return (build_time, memory / (1024 * 1024), wall_time)
+
+
+if __name__ == "__main__":
+  print(f"{'Cells':>10} {'Class':>10} {'Build (s)':>10} {'Memory (MB)':>12} {'get_wall x4 (s)':>16}")
+  for num_cells in [1_000, 10_000, 1_000_000]:
+    for cell_class in [LegacyCell, Cell]:
+      build_time, memory, wall_time = benchmark(cell_class, num_cells)
+      name = cell_class.__name__
+      print(f"{num_cells:>10} {name:>10} {build_time:>10.4f} {memory:>12.2f} {wall_time:>16.4f}")
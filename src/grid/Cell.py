@@ -2,6 +2,34 @@ from utils.Direction import Direction
 
 
 class Cell:
+  # Slots keep each cell down to its five fields instead of carrying a per-instance __dict__
+  __slots__ = ("x", "y", "weight", "parent", "flags")
+
+  """
+  Here are the bit definitions (bit 0 is the least significant bit):
+  0. Bottom wall
+  1. Right wall
+  2. Left wall
+  3. Top wall
+  4. is_in_path
+  5. is_visited
+
+  NOTE: The is_visited and is_in_path flags are set to false by default. Then 
+  the walls are all set to true to indicate they're all up.
+  """
+  INITIAL_FLAGS = 0b001111
+  WALLS_MASK = 0b001111
+  IN_PATH_MASK = 1 << 4
+  VISITED_MASK = 1 << 5
+
+  # Precomputed direction -> wall bit mask lookup, so checking or changing a wall is a single mask operation
+  WALL_MASKS = {
+    Direction.UP: 1 << 3,
+    Direction.LEFT: 1 << 2,
+    Direction.RIGHT: 1 << 1,
+    Direction.DOWN: 1 << 0,
+  }
+
   def __init__(self, x: int, y: int):
     """Initializes a cell
 
@@ -13,20 +41,7 @@ class Cell:
     self.y = y
     self.weight = 1  # Default weight
     self.parent = None
-
-    """
-    Here are the bit definitions:
-    1. is_visited
-    2. is_in_path
-    3. Top wall
-    4. Left wall
-    5. Right wall
-    6. Bottom wall
-
-    NOTE: The is_visited and is_in_path flags are set to false by default. Then 
-    the walls are all set to true to indicate they're all up.
-    """
-    self.flags = 0b001111
+    self.flags = Cell.INITIAL_FLAGS
 
   def set_bit(self, bit_index):
     self.flags |= 1 << bit_index
@@ -44,9 +59,9 @@ class Cell:
       value (bool): If true, then cell is visited.
     """
     if value:
-      self.set_bit(5)
+      self.flags |= Cell.VISITED_MASK
     else:
-      self.clear_bit(5)
+      self.flags &= ~Cell.VISITED_MASK
 
   def get_is_visited(self) -> bool:
     """Returns whether the cell has been visited.
@@ -54,7 +69,7 @@ class Cell:
     Returns:
         bool: If true, cell is visited
     """
-    return bool(self.get_bit(5))
+    return bool(self.flags & Cell.VISITED_MASK)
 
   def set_is_in_path(self, value: bool) -> None:
     """Sets whether a cell is on the goal path or not
@@ -62,12 +77,12 @@ class Cell:
         value (bool): If true, cell is on the goal path
     """
     if value:
-      self.set_bit(4)
+      self.flags |= Cell.IN_PATH_MASK
     else:
-      self.clear_bit(4)
+      self.flags &= ~Cell.IN_PATH_MASK
 
   def get_is_in_path(self) -> bool:
-    return bool(self.get_bit(4))
+    return bool(self.flags & Cell.IN_PATH_MASK)
 
   def get_wall(self, direction: Direction) -> bool:
     """Gets the status of the wall in a given direction
@@ -78,14 +93,7 @@ class Cell:
     Returns:
         bool: If true, the wall is up.
     """
-    if direction == Direction.UP:
-      return bool(self.get_bit(3))
-    elif direction == Direction.LEFT:
-      return bool(self.get_bit(2))
-    elif direction == Direction.RIGHT:
-      return bool(self.get_bit(1))
-    else:
-      return bool(self.get_bit(0))
+    return bool(self.flags & Cell.WALL_MASKS[direction])
 
   def set_wall(self, direction: Direction, is_up: bool) -> None:
     """Sets the status of a wall in a given direction
@@ -95,26 +103,10 @@ class Cell:
         is_up (bool): A boolean indicating whether a wall is built or not. For example if is_up = True, for the top wall, that makes the agent can't traverse into the cell from the top.
 
     """
-    if direction == Direction.UP:
-      if is_up:
-        self.set_bit(3)
-      else:
-        self.clear_bit(3)
-    elif direction == Direction.LEFT:
-      if is_up:
-        self.set_bit(2)
-      else:
-        self.clear_bit(2)
-    elif direction == Direction.RIGHT:
-      if is_up:
-        self.set_bit(1)
-      else:
-        self.clear_bit(1)
+    if is_up:
+      self.flags |= Cell.WALL_MASKS[direction]
     else:
-      if is_up:
-        self.set_bit(0)
-      else:
-        self.clear_bit(0)
+      self.flags &= ~Cell.WALL_MASKS[direction]
 
   def reset(self) -> None:
     """Resets the cell to its initial state, useful for re-initializing a cell for another maze solver"""
@@ -124,7 +116,7 @@ class Cell:
 
   def __repr__(self) -> None:
     return (
-      f"Cell(x={self.x}, y={self.y}, weight={self.weight}, is_visited={self.is_visited}, "
+      f"Cell(x={self.x}, y={self.y}, weight={self.weight}, is_visited={self.get_is_visited()}, "
       f"walls={{UP: {self.get_wall(Direction.UP)}, DOWN: {self.get_wall(Direction.DOWN)}, "
       f"LEFT: {self.get_wall(Direction.LEFT)}, RIGHT: {self.get_wall(Direction.RIGHT)}}})"
     )
@@ -0,0 +1,75 @@
+from grid.Cell import Cell
+from grid.GridStorage import GridStorage
+
+
+class CellView(Cell):
+  """A lightweight handle onto a single position of a GridStorage.
+
+  It exposes the same API as Cell, but instead of owning its state, every read and write of the flags, weight
+  and parent goes straight to the storage arrays. Views are created on demand by Grid.get_cell, and two views of
+  the same position compare (and hash) as equal, so they can still be used as dict keys or set members.
+
+  The is_visited/is_in_path bits are epoch-stamped by the storage (see GridStorage.new_epoch), so they're read and
+  written through the storage rather than straight off the flags.
+  """
+
+  __slots__ = ("storage", "index")
+
+  def __init__(self, storage: GridStorage, x: int, y: int):
+    """Creates a view of the cell at (x, y)
+
+    Args:
+        storage (GridStorage): Storage that holds the cell's state
+        x (int): col (horizontal) index of the cell
+        y (int): row (vertical) index of the cell
+    """
+    self.storage = storage
+    self.x = x
+    self.y = y
+    self.index = storage.get_index(x, y)
+
+  @property
+  def flags(self) -> int:
+    return self.storage.flags_view[self.index]
+
+  @flags.setter
+  def flags(self, value: int) -> None:
+    self.storage.flags_view[self.index] = value & 0xFF
+
+  @property
+  def weight(self) -> int:
+    return self.storage.weights_view[self.index]
+
+  @weight.setter
+  def weight(self, value: int) -> None:
+    self.storage.weights_view[self.index] = value
+
+  @property
+  def parent(self) -> "CellView | None":
+    parent_index = self.storage.parents_view[self.index]
+    if parent_index < 0:
+      return None
+    x, y = self.storage.get_position(parent_index)
+    return CellView(self.storage, x, y)
+
+  @parent.setter
+  def parent(self, cell: Cell | None) -> None:
+    self.storage.parents_view[self.index] = -1 if cell is None else self.storage.get_index(cell.x, cell.y)
+
+  def set_is_visited(self, value: bool) -> None:
+    self.storage.set_search_flag(self.index, Cell.VISITED_MASK, value)
+
+  def get_is_visited(self) -> bool:
+    return self.storage.get_search_flag(self.index, Cell.VISITED_MASK)
+
+  def set_is_in_path(self, value: bool) -> None:
+    self.storage.set_search_flag(self.index, Cell.IN_PATH_MASK, value)
+
+  def get_is_in_path(self) -> bool:
+    return self.storage.get_search_flag(self.index, Cell.IN_PATH_MASK)
+
+  def __eq__(self, other) -> bool:
+    return isinstance(other, CellView) and other.storage is self.storage and other.index == self.index
+
+  def __hash__(self) -> int:
+    return self.index
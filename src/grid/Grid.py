@@ -1,11 +1,30 @@
+import struct
+
 import numpy as np
 
 from grid.Cell import Cell
+from grid.CellView import CellView
+from grid.GridStorage import GridStorage
 from grid.Renderer import Renderer
 from utils.Direction import Direction
 
 
 class Grid:
+  # Binary maze files (see save/load) start with this header: magic, format version, header size, rows, cols,
+  # start (x, y), end (x, y) and maze flags (FILE_PERFECT_FLAG). All little-endian. Version 1 files have the same
+  # header without the maze flags, and can still be loaded.
+  FILE_MAGIC = b"MAZE"
+  FILE_VERSION = 2
+  FILE_HEADER = struct.Struct("<4sHHIIIIIII")
+  FILE_HEADER_V1 = struct.Struct("<4sHHIIIIII")
+  FILE_PERFECT_FLAG = 1 << 0
+
+  # Cells are packed/unpacked this many at a time, so saving and loading huge mazes only needs a bounded buffer
+  FILE_CHUNK_CELLS = 1 << 24
+
+  # get_distance_field steps BFS layers with fewer cells than this one cell at a time, and bigger ones as arrays
+  DISTANCE_FIELD_SCALAR_FRONTIER = 64
+
   def __init__(
     self,
     renderer: Renderer | None,
@@ -38,16 +57,26 @@ class Grid:
     if not self.is_valid_position(self.end_pos[0], self.end_pos[1]):
       raise ValueError("End position must be in range")
 
-    # Initialize the matrix of cells
-    self.matrix = np.empty((num_rows, num_cols), dtype=object)
-    for y in range(num_rows):
-      for x in range(num_cols):
-        self.matrix[y, x] = Cell(x, y)
+    # All cell state (walls, visited/in-path flags, weights and parents) lives in flat typed arrays.
+    # Cells are only materialized as lightweight views when someone asks for them through get_cell.
+    self.storage = GridStorage(num_rows, num_cols)
 
-        # As a result, all cells are registered as dirty, 
-        # and so all cells will be rendered on first try
-        if self.renderer:
-          self.renderer.mark_dirty(self.matrix[y,x])
+    # Compressed-sparse-row adjacency index of the finished maze; built by freeze() and dropped whenever a wall changes
+    self.adjacency_offsets: np.ndarray | None = None
+    self.adjacency_neighbors: np.ndarray | None = None
+    self.adjacency: tuple[memoryview, memoryview] | None = None
+
+    # Whether the maze is perfect: a spanning tree, with exactly one path between any two cells. The maze generators
+    # set it once they're done, since they carve spanning trees out of a fresh grid, and any wall changing afterwards
+    # clears it. Perfect mazes can be solved with a TreeIndex, which is built by TreeIndex.get and dropped along with
+    # the adjacency index.
+    self.is_perfect = False
+    self.tree_index = None
+
+    # As a result, all cells are registered as dirty,
+    # and so all cells will be rendered on first try
+    if self.renderer:
+      self.renderer.mark_all_dirty(self.get_cell(x, y) for y in range(num_rows) for x in range(num_cols))
 
 
   # NOTE: I feel like if you're establishing that we should mess with 
@@ -67,8 +96,26 @@ class Grid:
     if self.renderer:
       self.renderer.mark_dirty(cell)
   
+  # Same API over list indices, for algorithms that work on integer cell ids instead of Cell objects.
+  # A Cell is only created when there's a renderer that needs one.
+  def set_is_in_path_by_index(self, index: int, is_in_path: bool) -> None:
+    self.storage.set_search_flag(index, Cell.IN_PATH_MASK, is_in_path)
+    if self.renderer:
+      self.renderer.mark_dirty(self.get_cell_by_index(index))
+
+  def set_is_visited_by_index(self, index: int, is_visited: bool) -> None:
+    self.storage.set_search_flag(index, Cell.VISITED_MASK, is_visited)
+    if self.renderer:
+      self.renderer.mark_dirty(self.get_cell_by_index(index))
+
+  def get_is_visited_by_index(self, index: int) -> bool:
+    return self.storage.get_search_flag(index, Cell.VISITED_MASK)
+
   def set_wall(self, cell: Cell, direction: Direction, is_up: bool) -> None:
     cell.set_wall(direction, is_up)
+    self.is_perfect = False
+    if self.adjacency is not None:
+      self.adjacency_offsets = self.adjacency_neighbors = self.adjacency = self.tree_index = None
     if self.renderer:
       self.renderer.mark_dirty(cell)
 
@@ -87,7 +134,19 @@ class Grid:
     if not self.is_valid_position(x, y):
       return None
 
-    return self.matrix[y][x]  # y is row index, x is column index
+    return CellView(self.storage, x, y)
+
+  def get_cell_by_index(self, index: int) -> Cell:
+    """Gets a cell using its list index (see get_list_index).
+
+    Args:
+        index (int): The list index of the cell, in range [0, num_rows*num_cols-1]
+
+    Returns:
+        Cell: The cell at the given index.
+    """
+    x, y = self.storage.get_position(index)
+    return CellView(self.storage, x, y)
 
   def get_start_cell(self) -> Cell:
     """Returns the starting cell
@@ -200,6 +259,11 @@ class Grid:
       means that the cell in that direction cna be traversed to.
       2. Add this neighbor cell to our list
     """
+    if self.adjacency is not None:
+      offsets, neighbors = self.adjacency
+      cell_index = self.get_list_index(cell)
+      return [self.get_cell_by_index(n) for n in neighbors[offsets[cell_index] : offsets[cell_index + 1]]]
+
     path_neighbors = []
     for dir in Direction:
       if not cell.get_wall(dir):
@@ -207,6 +271,118 @@ class Grid:
 
     return path_neighbors
 
+  def freeze(self) -> None:
+    """Freezes the current maze into a compressed-sparse-row (CSR) adjacency index.
+
+    The path neighbors of the cell with list index i are adjacency_neighbors[adjacency_offsets[i]:adjacency_offsets[i+1]],
+    in the same order that get_path_neighbors returns them (the order of Direction). This should be called once generation
+    is done, so every solver run afterwards can expand cells over integer ids instead of checking walls one by one.
+
+    NOTE: Changing a wall through the grid API (set_wall/remove_wall) drops the index, and the next get_adjacency call
+    rebuilds it. Walls never change while a solver runs, so nothing has to be invalidated during a search.
+    """
+    num_cells = self.storage.size
+    flags = self.storage.flags
+    cell_ids = np.arange(num_cells, dtype=np.int32)
+    xs = cell_ids % self.num_cols
+    ys = cell_ids // self.num_cols
+
+    # One column per direction: whether the wall in that direction is down, and the id of the cell behind it
+    is_open = np.empty((num_cells, len(Direction)), dtype=bool)
+    neighbor_ids = np.empty((num_cells, len(Direction)), dtype=np.int32)
+    for column, direction in enumerate(Direction):
+      change_x, change_y = direction.value
+      new_xs = xs + change_x
+      new_ys = ys + change_y
+      is_open[:, column] = (
+        ((flags & Cell.WALL_MASKS[direction]) == 0)
+        & (new_xs >= 0) & (new_xs < self.num_cols)
+        & (new_ys >= 0) & (new_ys < self.num_rows)
+      )
+      neighbor_ids[:, column] = cell_ids + change_y * self.num_cols + change_x
+
+    offsets = np.zeros(num_cells + 1, dtype=np.int64)
+    np.cumsum(np.count_nonzero(is_open, axis=1), out=offsets[1:])
+    self.adjacency_offsets = offsets
+    self.adjacency_neighbors = neighbor_ids[is_open]  # boolean indexing keeps row-major (cell, then direction) order
+
+    # Solvers read the index one element at a time, which memoryviews do much faster than numpy indexing
+    self.adjacency = (memoryview(self.adjacency_offsets), memoryview(self.adjacency_neighbors))
+    self.tree_index = None
+
+  def get_adjacency(self) -> tuple[memoryview, memoryview]:
+    """Returns the (offsets, neighbors) CSR adjacency index of the maze, freezing the maze first if needed."""
+    if self.adjacency is None:
+      self.freeze()
+    return self.adjacency
+
+  def get_distance_field(self, source_pos: tuple[int, int] | None = None) -> np.ndarray:
+    """Finds the distance (number of moves) from one cell to every other cell of the maze.
+
+    Args:
+        source_pos (tuple[int, int] | None, optional): (x, y) position the distances are measured from. Defaults to start_pos.
+
+    Returns:
+        np.ndarray: int32 array of shape (num_rows, num_cols) with the distance of each cell, or -1 for cells that
+        can't be reached
+
+    NOTE: This is a BFS that advances one layer (all cells at the same distance) per step. Wide layers advance at
+    once: the frontier is an array of cell ids, and the step reads the wall bits of all of them and moves through the
+    open walls in each direction with a few array operations, so the work is vectorized over the frontier instead of
+    popping cells one at a time. Those array operations cost the same fixed overhead however small the frontier is,
+    though, and a maze with long corridors (like the ones recursive_backtracker makes) has thousands of layers that
+    are only a cell or two wide. So layers smaller than DISTANCE_FIELD_SCALAR_FRONTIER are stepped with a plain loop
+    over their cells instead. Nothing in the grid is written to, and cell weights are ignored.
+    """
+    source_pos = self.start_pos if source_pos is None else source_pos
+    if not self.is_valid_position(source_pos[0], source_pos[1]):
+      raise ValueError("Source position must be in range")
+
+    num_cells = self.storage.size
+    cell_ids = np.arange(num_cells, dtype=np.int64)
+
+    # Wall bits of every cell, with the walls on the border of the grid forced up so no move leaves the grid
+    walls = self.storage.flags & Cell.WALLS_MASK
+    walls[cell_ids % self.num_cols == 0] |= Cell.WALL_MASKS[Direction.LEFT]
+    walls[cell_ids % self.num_cols == self.num_cols - 1] |= Cell.WALL_MASKS[Direction.RIGHT]
+    walls[: self.num_cols] |= Cell.WALL_MASKS[Direction.UP]
+    walls[num_cells - self.num_cols :] |= Cell.WALL_MASKS[Direction.DOWN]
+    steps = [(Cell.WALL_MASKS[direction], direction.value[1] * self.num_cols + direction.value[0]) for direction in Direction]
+
+    # The moves out of a cell only depend on its wall bits, so they're listed once for each of the 16 combinations
+    open_steps = [[step for mask, step in steps if not walls_value & mask] for walls_value in range(Cell.WALLS_MASK + 1)]
+
+    distances = np.full(num_cells, -1, dtype=np.int32)
+    # The scalar steps read and write single elements, which memoryviews do much faster than numpy indexing
+    walls_view = memoryview(walls)
+    distances_view = memoryview(distances)
+    # Two frontier cells can reach the same cell in the same array step; claims[cell] says which of them gets to add it
+    claims = np.empty(num_cells, dtype=np.int64)
+    source = self.storage.get_index(source_pos[0], source_pos[1])
+    distances[source] = 0
+    frontier = [source]
+    distance = 0
+    while len(frontier):
+      distance += 1
+      if len(frontier) < Grid.DISTANCE_FIELD_SCALAR_FRONTIER:
+        next_frontier = []
+        for current in (frontier.tolist() if isinstance(frontier, np.ndarray) else frontier):
+          for step in open_steps[walls_view[current]]:
+            neighbor = current + step
+            if distances_view[neighbor] < 0:
+              distances_view[neighbor] = distance
+              next_frontier.append(neighbor)
+        frontier = next_frontier
+      else:
+        frontier = np.asarray(frontier, dtype=np.int64)
+        frontier_walls = walls[frontier]
+        reached = np.concatenate([frontier[(frontier_walls & mask) == 0] + step for mask, step in steps])
+        reached = reached[distances[reached] < 0]
+        claims[reached] = np.arange(len(reached))
+        frontier = reached[claims[reached] == np.arange(len(reached))]
+        distances[frontier] = distance
+    return distances.reshape(self.num_rows, self.num_cols)
+
   def remove_wall(self, cell: Cell, neighbor: Cell) -> None:
     """Removes a shared wall between two cells.
     Args:
@@ -233,19 +409,41 @@ class Grid:
     self.set_wall(cell, direction_to_neighbor, False)
     self.set_wall(neighbor, direction_from_neighbor, False)
 
+  def remove_walls_by_index(self, cell_indices: np.ndarray, direction: Direction) -> None:
+    """Removes, in one vectorized write, the wall in `direction` of every given cell along with the matching wall of the neighbor behind it.
+
+    Args:
+        cell_indices (np.ndarray): List indices of the cells whose walls are being removed
+        direction (Direction): Direction of the wall to remove, for every cell
+
+    NOTE: Each cell must appear at most once in `cell_indices`, and must have a neighbor in `direction`. Use one call per direction.
+    """
+    change_x, change_y = direction.value
+    neighbor_indices = cell_indices + change_y * self.num_cols + change_x
+    flags = self.storage.flags
+    flags[cell_indices] &= ~Cell.WALL_MASKS[direction] & 0xFF
+    flags[neighbor_indices] &= ~Cell.WALL_MASKS[direction.opposite] & 0xFF
+    self.adjacency_offsets = self.adjacency_neighbors = self.adjacency = self.tree_index = None
+    self.is_perfect = False
+
+    if self.renderer:
+      indices = np.concatenate((cell_indices, neighbor_indices)).tolist()
+      self.renderer.mark_all_dirty(self.get_cell_by_index(index) for index in indices)
+
   def reset_visited_cells(self):
-    """Sets the visited status of all nodes to false. This is here to help with maze generation algorithms since
-    many of them use a visited list, and it's convenient for them to use the is_visited property
+    """Sets the visited (and in-path) status of all nodes to false. This is here to help with maze generation algorithms since
+    many of them use a visited list, and it's convenient for them to use the is_visited property. It also lets us run 
+    several solvers back-to-back on the same maze.
     
     NOTE: I know it looks bad that I don't use the grid api's set_is_visited here, but 
     the reason is because I know that I'm not going to need to draw the is_visited state. This is because 
     we only call this function because we want our maze solvers to behave correctly. If we don't, then how 
     is it going to solve a maze when it thinks it already visited everything.
+
+    NOTE: This is O(1). Visited/in-path bits are stamped with the storage's current epoch, and only count while the stamp
+    matches, so starting a new epoch clears them all without touching a single cell.
     """
-    for x in range(self.num_cols):
-      for y in range(self.num_rows):
-        cell = self.get_cell(x, y)
-        cell.set_is_visited(False)
+    self.storage.new_epoch()
 
   def get_list_index(self, cell: Cell) -> int:
     """Gets the list index for a given set of coordinates
@@ -301,19 +499,114 @@ class Grid:
     return walls
 
   def get_num_visited_cells(self) -> int:
-    count = 0
-    for y in range(self.num_rows):
-      for x in range(self.num_cols):
-        cell = self.get_cell(x, y)
-        if cell.get_is_visited():
-          count += 1
-    return count
-  
+    return self.storage.count_search_flag(Cell.VISITED_MASK)
+
   def get_num_path_cells(self) -> int:
-    count = 0
-    for y in range(self.num_rows):
-      for x in range(self.num_cols):
-        cell = self.get_cell(x, y)
-        if cell.get_is_in_path():
-          count += 1
-    return count
\ No newline at end of file
+    return self.storage.count_search_flag(Cell.IN_PATH_MASK)
+
+  def save(self, path: str) -> None:
+    """Saves the walls of the maze and its start/end positions to a compact binary file.
+
+    Args:
+        path (str): Path of the file to write
+
+    NOTE: After the header (see FILE_HEADER), the file holds the 4 wall bits of every cell, two cells per byte: cell
+    2i in the low nibble of byte i and cell 2i+1 in the high one. Visited/in-path state, weights and parents are
+    not saved.
+    """
+    num_cells = self.storage.size
+    header = Grid.FILE_HEADER.pack(
+      Grid.FILE_MAGIC,
+      Grid.FILE_VERSION,
+      Grid.FILE_HEADER.size,
+      self.num_rows,
+      self.num_cols,
+      *self.start_pos,
+      *self.end_pos,
+      Grid.FILE_PERFECT_FLAG if self.is_perfect else 0,
+    )
+    with open(path, "wb") as file:
+      file.write(header)
+      # Chunks hold an even number of cells, so no byte is split across two chunks
+      for chunk_start in range(0, num_cells, Grid.FILE_CHUNK_CELLS):
+        walls = self.storage.flags[chunk_start : chunk_start + Grid.FILE_CHUNK_CELLS] & Cell.WALLS_MASK
+        if len(walls) % 2:
+          walls = np.append(walls, np.uint8(0))
+        file.write((walls[0::2] | (walls[1::2] << 4)).tobytes())
+
+  @staticmethod
+  def read_header(path: str) -> dict:
+    """Reads the header of a maze file written by save.
+
+    Returns:
+        dict: num_rows, num_cols, start_pos, end_pos, is_perfect and header_size of the maze in the file. is_perfect
+        is None for version 1 files, which don't record it.
+    """
+    with open(path, "rb") as file:
+      data = file.read(Grid.FILE_HEADER.size)
+    if len(data) < Grid.FILE_HEADER_V1.size:
+      raise ValueError(f"{path} is not a maze file")
+    magic, version = struct.unpack_from("<4sH", data)
+    if magic != Grid.FILE_MAGIC:
+      raise ValueError(f"{path} is not a maze file")
+    if version == 1:
+      _, _, header_size, num_rows, num_cols, start_x, start_y, end_x, end_y = Grid.FILE_HEADER_V1.unpack_from(data)
+      is_perfect = None
+    elif version == Grid.FILE_VERSION and len(data) == Grid.FILE_HEADER.size:
+      _, _, header_size, num_rows, num_cols, start_x, start_y, end_x, end_y, maze_flags = Grid.FILE_HEADER.unpack(data)
+      is_perfect = bool(maze_flags & Grid.FILE_PERFECT_FLAG)
+    else:
+      raise ValueError(f"Unsupported maze file version {version}")
+    return {
+      "num_rows": num_rows,
+      "num_cols": num_cols,
+      "start_pos": (start_x, start_y),
+      "end_pos": (end_x, end_y),
+      "is_perfect": is_perfect,
+      "header_size": header_size,
+    }
+
+  @staticmethod
+  def load(path: str, renderer: Renderer | None = None) -> "Grid":
+    """Loads a maze saved with save.
+
+    Args:
+        path (str): Path of the maze file
+        renderer (Renderer | None, optional): Renderer of the new grid. Defaults to None.
+
+    Returns:
+        Grid: A grid with the saved walls and start/end positions, and nothing visited
+
+    NOTE: The wall plane is memory-mapped rather than read into memory, and unpacked into the grid's flags a chunk at a
+    time, so the only memory a load needs on top of the grid itself is one chunk. The walls are unpacked up front
+    rather than decoded from the mapping on demand: the flags plane also holds the visited/in-path bits the solvers
+    write, the adjacency index (see freeze) reads every cell's walls anyway, and Grid allocates its parent/weight
+    planes at the full size already, so a lazy wall plane wouldn't make a load any cheaper in memory or time. Nor
+    can the flags plane be mapped as it is, since the file packs two cells per byte.
+
+    NOTE: Whether the maze is perfect comes from the header. Version 1 files don't record it, so for those it's worked
+    out from the walls: a connected maze is a spanning tree exactly when it has one passage less than it has cells.
+    Saved mazes come out of the generators, which connect every cell (TreeIndex checks that anyway).
+    """
+    header = Grid.read_header(path)
+    grid = Grid(renderer, header["num_rows"], header["num_cols"], header["start_pos"], header["end_pos"])
+    num_cells = grid.storage.size
+    packed_walls = np.memmap(path, dtype=np.uint8, mode="r", offset=header["header_size"], shape=((num_cells + 1) // 2,))
+
+    flags = grid.storage.flags
+    for chunk_start in range(0, num_cells, Grid.FILE_CHUNK_CELLS):
+      chunk_end = min(chunk_start + Grid.FILE_CHUNK_CELLS, num_cells)
+      packed = packed_walls[chunk_start // 2 : (chunk_end + 1) // 2]
+      flags[chunk_start:chunk_end:2] = packed[: (chunk_end - chunk_start + 1) // 2] & Cell.WALLS_MASK
+      flags[chunk_start + 1 : chunk_end : 2] = packed[: (chunk_end - chunk_start) // 2] >> 4
+    del packed_walls
+
+    if header["is_perfect"] is not None:
+      grid.is_perfect = header["is_perfect"]
+    else:
+      cell_flags = flags.reshape(grid.num_rows, grid.num_cols)
+      num_passages = np.count_nonzero((cell_flags[:, :-1] & Cell.WALL_MASKS[Direction.RIGHT]) == 0) + np.count_nonzero(
+        (cell_flags[:-1, :] & Cell.WALL_MASKS[Direction.DOWN]) == 0
+      )
+      grid.is_perfect = num_passages == num_cells - 1
+    return grid
@@ -0,0 +1,92 @@
+import numpy as np
+
+from grid.Cell import Cell
+
+
+class GridStorage:
+  def __init__(self, num_rows: int, num_cols: int):
+    """Creates the flat arrays that hold the state of every cell in a grid.
+
+    Args:
+        num_rows (int): Number of rows in the grid
+        num_cols (int): Number of columns in the grid
+
+    NOTE: A cell with coordinates (x, y) lives at index y * num_cols + x in every array, which is the
+    same index that Grid.get_list_index returns. Flags use the bit layout documented in Cell, and parents are
+    stored as cell indices, with -1 meaning no parent.
+    """
+    self.num_rows = num_rows
+    self.num_cols = num_cols
+    self.size = num_rows * num_cols
+
+    self.flags = np.full(self.size, Cell.INITIAL_FLAGS, dtype=np.uint8)
+    self.parents = np.full(self.size, -1, dtype=np.int32)
+    self.weights = np.ones(self.size, dtype=np.int32)
+
+    # The is_visited/is_in_path bits of a cell only count while its stamp equals the current epoch, so clearing
+    # them for the whole grid is a matter of starting a new epoch (see new_epoch). Stamps start out at 0, which is
+    # never a valid epoch.
+    self.stamps = np.zeros(self.size, dtype=np.uint16)
+    self.epoch = 1
+    self.refresh_views()
+
+  def refresh_views(self) -> None:
+    """Rebuilds the memoryviews over the arrays.
+
+    NOTE: Indexing a numpy array with a single int creates a numpy scalar, which is slow and awkward to do bit
+    math on. A memoryview over the same buffer reads and writes plain Python ints, so cell views go through these
+    instead. Call this whenever one of the arrays is replaced.
+    """
+    self.flags_view = memoryview(self.flags)
+    self.parents_view = memoryview(self.parents)
+    self.weights_view = memoryview(self.weights)
+    self.stamps_view = memoryview(self.stamps)
+
+  def get_search_flag(self, index: int, mask: int) -> bool:
+    """Returns whether the is_visited or is_in_path bit (given by `mask`) of a cell is set in the current epoch."""
+    return self.stamps_view[index] == self.epoch and bool(self.flags_view[index] & mask)
+
+  def set_search_flag(self, index: int, mask: int, value: bool) -> None:
+    """Sets or clears the is_visited or is_in_path bit (given by `mask`) of a cell for the current epoch.
+
+    NOTE: A cell touched for the first time in this epoch still carries the bits of whatever epoch it was last
+    stamped in, so those are cleared before it's stamped with the current one.
+    """
+    flags = self.flags_view
+    if self.stamps_view[index] != self.epoch:
+      flags[index] &= Cell.WALLS_MASK
+      self.stamps_view[index] = self.epoch
+    if value:
+      flags[index] |= mask
+    else:
+      flags[index] &= ~mask & 0xFF
+
+  def get_current_flags(self, indices: np.ndarray) -> np.ndarray:
+    """Returns the flags of many cells at once, with the is_visited/is_in_path bits of cells that weren't stamped in the
+    current epoch cleared, i.e. the flags as get_search_flag sees them."""
+    flags = self.flags[indices]
+    flags[self.stamps[indices] != self.epoch] &= Cell.WALLS_MASK
+    return flags
+
+  def count_search_flag(self, mask: int) -> int:
+    """Counts the cells whose is_visited or is_in_path bit (given by `mask`) is set in the current epoch."""
+    return int(np.count_nonzero((self.stamps == self.epoch) & ((self.flags & mask) != 0)))
+
+  def new_epoch(self) -> None:
+    """Clears the is_visited and is_in_path bits of every cell in O(1), by moving on to the next epoch.
+
+    NOTE: Once the epoch counter runs out of stamp values, we pay for one full sweep that actually clears
+    the bits and stamps, and start counting again from 1.
+    """
+    self.epoch += 1
+    if self.epoch > np.iinfo(self.stamps.dtype).max:
+      self.flags &= Cell.WALLS_MASK
+      self.stamps.fill(0)
+      self.epoch = 1
+
+  def get_index(self, x: int, y: int) -> int:
+    return y * self.num_cols + x
+
+  def get_position(self, index: int) -> tuple[int, int]:
+    y, x = divmod(index, self.num_cols)
+    return (x, y)
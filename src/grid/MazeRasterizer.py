@@ -0,0 +1,229 @@
+import struct
+import zlib
+
+import numpy as np
+
+from grid.Cell import Cell
+from grid.Grid import Grid
+from utils.Direction import Direction
+
+
+class MazeRasterizer:
+  # PNG files start with this signature, followed by chunks of (length, type, data, crc)
+  PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+  # Colors of a distance heatmap, from the closest cells to the farthest ones; distances in between are interpolated
+  HEATMAP_COLORS = np.array([(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)], dtype=np.float64)
+
+  def __init__(self, cell_size: int, cell_wall_width: int, highlight_cells: bool = True):
+    """Builds images of a whole maze with numpy, without pygame or a display. The images look the same as what the
+    Renderer draws on screen.
+
+    Args:
+        cell_size (int): Length=width of a cell in pixels
+        cell_wall_width (int): Width of a cell wall in pixels
+        highlight_cells (bool, optional): Whether visited/in-path cells are highlighted. Defaults to True.
+    """
+    self.cell_size = cell_size
+    self.cell_wall_width = cell_wall_width
+    self.highlight_cells = highlight_cells
+
+    # Same colors as the Renderer
+    self.highlight_is_visited_color = (30, 144, 255)
+    self.highlight_is_in_path_color = (178, 34, 34)
+    self.is_visited_src_alpha = 100
+    self.is_in_path_src_alpha = 200
+    self.background_color = (0, 0, 0)
+    self.wall_up_color = (183, 211, 122)
+
+    self.wall_masks = self.build_wall_masks()
+    self.tiles = self.build_tiles()
+
+  def build_wall_masks(self) -> np.ndarray:
+    """Builds the wall pixels of a cell for each of the 16 combinations of walls, indexed by the wall nibble of the
+    cell's flags.
+
+    Returns:
+        np.ndarray: bool array of shape (16, cell_size, cell_size), True where a wall is drawn
+
+    NOTE: A wall is a line of width cell_wall_width centered on the edge between two cells, the way pygame draws it.
+    Each cell gets its own part of the line: the first (w - (w - 1) // 2) pixels along its top/left edge, and the last
+    (w - 1) // 2 along its bottom/right edge.
+    """
+    size = self.cell_size
+    near_width = self.cell_wall_width - (self.cell_wall_width - 1) // 2
+    far_width = (self.cell_wall_width - 1) // 2
+    wall_areas = {
+      Direction.UP: (slice(0, near_width), slice(None)),
+      Direction.DOWN: (slice(size - far_width, size), slice(None)),
+      Direction.LEFT: (slice(None), slice(0, near_width)),
+      Direction.RIGHT: (slice(None), slice(size - far_width, size)),
+    }
+
+    wall_masks = np.zeros((16, size, size), dtype=bool)
+    for walls in range(16):
+      for direction, (rows, cols) in wall_areas.items():
+        if walls & Cell.WALL_MASKS[direction]:
+          wall_masks[walls][rows, cols] = True
+    return wall_masks
+
+  def build_tiles(self) -> np.ndarray:
+    """Builds the 48 tiles a cell can look like, in the same order as the Renderer's atlas: tile number
+    (state * 16 + walls), where walls is the wall nibble of the cell's flags and state is 0 for no highlight,
+    1 for visited and 2 for in path.
+
+    Returns:
+        np.ndarray: uint8 array of shape (48, cell_size, cell_size, 3)
+    """
+    size = self.cell_size
+    background = np.array(self.background_color, dtype=np.int32)
+    fill_colors = [background]
+    for color, alpha in [
+      (self.highlight_is_visited_color, self.is_visited_src_alpha),
+      (self.highlight_is_in_path_color, self.is_in_path_src_alpha),
+    ]:
+      # Blend the highlight over the background, the way pygame blits a surface with an alpha
+      fill_colors.append(background + (((np.array(color, dtype=np.int32) - background) * alpha) >> 8))
+
+    tiles = np.empty((48, size, size, 3), dtype=np.uint8)
+    for state, fill_color in enumerate(fill_colors):
+      for walls in range(16):
+        tile = tiles[state * 16 + walls]
+        tile[:] = fill_color
+        tile[self.wall_masks[walls]] = self.wall_up_color
+    return tiles
+
+  def get_tile_numbers(self, grid: Grid, row_start: int, row_end: int) -> np.ndarray:
+    """Returns the tile number of every cell in rows [row_start, row_end), as an array of shape (rows, num_cols)"""
+    indices = np.arange(row_start * grid.num_cols, row_end * grid.num_cols)
+    flags = grid.storage.get_current_flags(indices)
+    tile_numbers = flags & Cell.WALLS_MASK
+    if self.highlight_cells:
+      is_in_path = (flags & Cell.IN_PATH_MASK) != 0
+      is_visited = (flags & Cell.VISITED_MASK) != 0
+      tile_numbers += np.where(is_in_path, 32, np.where(is_visited, 16, 0)).astype(tile_numbers.dtype)
+    return tile_numbers.reshape(row_end - row_start, grid.num_cols)
+
+  def rasterize_rows(self, grid: Grid, row_start: int, row_end: int) -> np.ndarray:
+    """Builds the image of rows [row_start, row_end) of the maze.
+
+    Returns:
+        np.ndarray: uint8 RGB array of shape ((row_end - row_start) * cell_size, num_cols * cell_size, 3)
+    """
+    num_rows = row_end - row_start
+    size = self.cell_size
+    # (rows, cols, size, size, 3) -> (rows, size, cols, size, 3) puts the pixel rows of each cell row next to each
+    # other, so it can be flattened into an image
+    cells = self.tiles[self.get_tile_numbers(grid, row_start, row_end)]
+    return cells.transpose(0, 2, 1, 3, 4).reshape(num_rows * size, grid.num_cols * size, 3)
+
+  def get_heatmap_colors(self, distances: np.ndarray, max_distance: int) -> np.ndarray:
+    """Maps distances to heatmap colors, scaled so max_distance gets the last color of HEATMAP_COLORS.
+
+    Returns:
+        np.ndarray: uint8 RGB array with one more axis than distances; cells that can't be reached (-1) get the
+        background color
+    """
+    positions = np.clip(distances, 0, None) * ((len(MazeRasterizer.HEATMAP_COLORS) - 1) / max(max_distance, 1))
+    lower = np.minimum(positions.astype(np.int64), len(MazeRasterizer.HEATMAP_COLORS) - 2)
+    fraction = (positions - lower)[..., np.newaxis]
+    colors = MazeRasterizer.HEATMAP_COLORS[lower] * (1 - fraction) + MazeRasterizer.HEATMAP_COLORS[lower + 1] * fraction
+    colors = np.rint(colors).astype(np.uint8)
+    colors[distances < 0] = self.background_color
+    return colors
+
+  def rasterize_heatmap_rows(self, grid: Grid, distances: np.ndarray, row_start: int, row_end: int, max_distance: int | None = None) -> np.ndarray:
+    """Builds the heatmap image of rows [row_start, row_end) of the maze: every cell is filled with the color of its
+    distance (see Grid.get_distance_field), with the walls drawn on top.
+
+    Args:
+        grid (Grid): Maze being drawn
+        distances (np.ndarray): Distance of every cell, of shape (num_rows, num_cols)
+        row_start (int): First row of the image
+        row_end (int): Row after the last row of the image
+        max_distance (int | None, optional): Distance that gets the last heatmap color. Defaults to the largest one
+          in distances; pass it in when drawing a maze band by band, so it only has to be found once.
+
+    Returns:
+        np.ndarray: uint8 RGB array of shape ((row_end - row_start) * cell_size, num_cols * cell_size, 3)
+    """
+    num_rows = row_end - row_start
+    size = self.cell_size
+    max_distance = int(distances.max(initial=0)) if max_distance is None else max_distance
+    colors = self.get_heatmap_colors(distances[row_start:row_end], max_distance)
+    walls = (grid.storage.flags[row_start * grid.num_cols : row_end * grid.num_cols] & Cell.WALLS_MASK).reshape(num_rows, grid.num_cols)
+
+    cells = np.broadcast_to(colors.reshape(num_rows, grid.num_cols, 1, 1, 3), (num_rows, grid.num_cols, size, size, 3)).copy()
+    cells[self.wall_masks[walls]] = self.wall_up_color
+    return cells.transpose(0, 2, 1, 3, 4).reshape(num_rows * size, grid.num_cols * size, 3)
+
+  def rasterize(self, grid: Grid) -> np.ndarray:
+    """Builds the image of the whole maze; see save_png for mazes too big to hold as one image"""
+    return self.rasterize_rows(grid, 0, grid.num_rows)
+
+  def rasterize_heatmap(self, grid: Grid, distances: np.ndarray | None = None) -> np.ndarray:
+    """Builds the heatmap image of the whole maze, of the distances from its start unless they're given; see
+    save_heatmap_png for mazes too big to hold as one image"""
+    distances = grid.get_distance_field() if distances is None else distances
+    return self.rasterize_heatmap_rows(grid, distances, 0, grid.num_rows)
+
+  def save_png(self, grid: Grid, path: str, max_band_bytes: int = 1 << 24) -> None:
+    """Writes the image of the maze to a PNG file.
+
+    Args:
+        grid (Grid): Maze being saved
+        path (str): Path of the PNG file
+        max_band_bytes (int, optional): Rough cap on the memory used for pixels. Defaults to 16MB.
+
+    NOTE: The image is never held in memory as a whole. It's built a band of cell rows at a time, and each band
+    is pushed through one zlib stream and written out as IDAT chunks before the next is built, so exporting a
+    4000x4000 maze takes no more memory than a few bands.
+    """
+    self._write_png(grid, path, max_band_bytes, lambda row_start, row_end: self.rasterize_rows(grid, row_start, row_end))
+
+  def save_heatmap_png(self, grid: Grid, path: str, distances: np.ndarray | None = None, max_band_bytes: int = 1 << 24) -> None:
+    """Writes the heatmap image of the maze (see rasterize_heatmap_rows) to a PNG file, a band at a time like save_png.
+
+    Args:
+        grid (Grid): Maze being saved
+        path (str): Path of the PNG file
+        distances (np.ndarray | None, optional): Distance of every cell. Defaults to the distances from the maze's start.
+        max_band_bytes (int, optional): Rough cap on the memory used for pixels. Defaults to 16MB.
+    """
+    distances = grid.get_distance_field() if distances is None else distances
+    max_distance = int(distances.max(initial=0))
+    self._write_png(
+      grid, path, max_band_bytes,
+      lambda row_start, row_end: self.rasterize_heatmap_rows(grid, distances, row_start, row_end, max_distance),
+    )
+
+  def _write_png(self, grid: Grid, path: str, max_band_bytes: int, rasterize_band) -> None:
+    """Writes a PNG image of the maze, built by rasterize_band(row_start, row_end) a band of cell rows at a time"""
+    width = grid.num_cols * self.cell_size
+    height = grid.num_rows * self.cell_size
+    row_bytes = 3 * width * self.cell_size
+    band_rows = max(1, min(grid.num_rows, max_band_bytes // row_bytes))
+
+    with open(path, "wb") as file:
+      file.write(MazeRasterizer.PNG_SIGNATURE)
+      # 8 bits per channel, color type 2 (RGB), default compression/filter, no interlacing
+      self._write_png_chunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+      compressor = zlib.compressobj(6)
+      for row_start in range(0, grid.num_rows, band_rows):
+        band = rasterize_band(row_start, min(row_start + band_rows, grid.num_rows))
+        # Every scanline starts with its filter type; 0 means unfiltered
+        scanlines = np.zeros((band.shape[0], 1 + 3 * width), dtype=np.uint8)
+        scanlines[:, 1:] = band.reshape(band.shape[0], 3 * width)
+        self._write_png_chunk(file, b"IDAT", compressor.compress(scanlines.tobytes()))
+      self._write_png_chunk(file, b"IDAT", compressor.flush())
+      self._write_png_chunk(file, b"IEND", b"")
+
+  @staticmethod
+  def _write_png_chunk(file, chunk_type: bytes, data: bytes) -> None:
+    """Writes a single PNG chunk; empty IDAT chunks are skipped since they carry nothing"""
+    if chunk_type == b"IDAT" and not data:
+      return
+    file.write(struct.pack(">I", len(data)))
+    file.write(chunk_type)
+    file.write(data)
+    file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
@@ -1,27 +1,52 @@
-from collections import deque
+import math
+from itertools import repeat
 
+import numpy as np
 import pygame
 
 from grid.Cell import Cell
+from grid.CellView import CellView
 from utils.Direction import Direction
 
 
 class Renderer:
-  def __init__(self, surface: pygame.Surface, clock: pygame.time.Clock, cell_size: int, cell_wall_width: int, highlight_cells: bool):
+  def __init__(
+    self,
+    surface: pygame.Surface,
+    clock: pygame.time.Clock,
+    cell_size: int,
+    cell_wall_width: int,
+    highlight_cells: bool,
+    steps_per_frame: int = 1,
+    fps: int = 120,
+  ):
+    """Creates a renderer that draws cells onto a surface.
+
+    Args:
+        surface (pygame.Surface): Surface the cells are drawn on
+        clock (pygame.time.Clock): Clock used to cap the frame rate of animations
+        cell_size (int): Length=width of a cell in pixels
+        cell_wall_width (int): Width of a cell wall in pixels
+        highlight_cells (bool): Whether visited/in-path cells are highlighted
+        steps_per_frame (int, optional): Number of algorithm steps (update_display calls) that are batched into one
+          frame. Defaults to 1.
+        fps (int, optional): Frame rate cap while animating. Defaults to 120.
+    """
     self.surface = surface
     self.clock = clock
     self.cell_size = cell_size
     self.cell_wall_width = cell_wall_width
     self.highlight_cells = highlight_cells
 
-    # This is defined, and maybe w'ere updating the reference?
-    self.transparent_surface = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
-    
-    self.changed_cells = deque()
+    # Cells waiting to be drawn. A dict is used as an ordered set: membership checks are O(1), and cells are
+    # drawn in the order they were first marked dirty. Values are unused.
+    self.changed_cells: dict[Cell, None] = {}
+
+    # Animation speed is steps_per_frame * fps steps per second; steps are counted until there's enough for a frame
+    self.steps_per_frame = max(1, steps_per_frame)
+    self.fps = fps
+    self.pending_steps = 0
 
-    # Cache of thin semi-transparent surfaces, so it's a map in form {direction: thin_surface}
-    self.thin_surface_cache = {}
-    
     # For drawing an individual cell
     self.highlight_is_visited_color = (30,144,255)
     self.highlight_is_in_path_color = (178,34,34)
@@ -29,147 +54,156 @@ class Renderer:
     self.is_in_path_src_alpha = 200
     self.background_color = (0, 0, 0)
     self.wall_up_color = (183, 211, 122)
-    self.cell_size = cell_size
-    self.cell_wall_width = cell_wall_width
+
+    # Every cell looks like one of 48 tiles (see build_tile_atlas), which are drawn once up front.
+    # tile_atlas_key records the (cell_size, cell_wall_width) they were drawn for.
+    self.tile_atlas: pygame.Surface | None = None
+    self.tile_rects: list[pygame.Rect] = []
+    self.tile_atlas_key: tuple[int, int] | None = None
 
   def mark_dirty(self, cell: Cell) -> None:
-    # If the given cell is not already in there, then add it to be drawn
+    # Add the cell to be drawn. If it's already in there, it keeps its place in line
     # NOTE: This avoids having the same cell being drawn multiple times
-    if cell not in self.changed_cells:
-      self.changed_cells.append(cell)
-
-  def render_dirty_cells(self) -> None:
-    while self.changed_cells:
-      cell = self.changed_cells.popleft()
-      self.draw_cell(cell)
-
-  def update_display(self):
-    self.render_dirty_cells()
-    pygame.display.update()
-    self.clock.tick(120)
-  
-  def handle_highlight_cell(self, cell: Cell):
-    """Handles highlighting a square cell
+    self.changed_cells.setdefault(cell)
+
+  def mark_all_dirty(self, cells) -> None:
+    """Marks every cell of an iterable as dirty in one go; used to draw a whole grid the first time"""
+    self.changed_cells.update(dict.fromkeys(cells))
+
+  def render_dirty_cells(self) -> list[pygame.Rect]:
+    """Draws every dirty cell onto the surface, and returns the areas that were drawn on"""
+    # Swap in an empty set first, so cells that get marked while drawing are kept for the next frame
+    changed_cells = self.changed_cells
+    self.changed_cells = {}
+    if self.tile_atlas_key != (self.cell_size, self.cell_wall_width):
+      self.build_tile_atlas()
+
+    # Every cell is a single blit out of the atlas, so they're all handed to pygame in one blits call,
+    # which also gives back the rect each blit covered
+    cells = list(changed_cells)
+    atlas = self.tile_atlas
+    tile_rects = self.tile_rects
+    size = self.cell_size
+    positions = [(cell.x * size, cell.y * size) for cell in cells]
+    areas = map(tile_rects.__getitem__, self.get_tile_numbers(cells))
+    return self.surface.blits(zip(repeat(atlas), positions, areas))
+
+  def set_target_duration(self, duration: float, num_steps: int) -> None:
+    """Picks steps_per_frame so that an animation of roughly `num_steps` steps takes about `duration` seconds
 
     Args:
-        cell (Cell): Cell being highlighted
+        duration (float): Target length of the animation in seconds
+        num_steps (int): Expected number of update_display calls, e.g. the number of cells in the grid
     """
-    # --- Logic for highlighting an entire cell ---
-    # NOTE: Only highlight when highlighting is turned on and the cell is either visited or in path.
-    if self.highlight_cells and (cell.get_is_in_path() or cell.get_is_visited()):
-      if cell.get_is_in_path():
-        self.transparent_surface.fill(self.highlight_is_in_path_color)
-        self.transparent_surface.set_alpha(self.is_in_path_src_alpha)
-      else:
-        self.transparent_surface.fill(self.highlight_is_visited_color)
-        self.transparent_surface.set_alpha(self.is_visited_src_alpha)
-    self.surface.blit(self.transparent_surface, (cell.x * self.cell_size, cell.y * self.cell_size))
-
-  def handle_draw_lines(self, cell: Cell):
-    """Handles drawing lines or the absences of lines for a cell.s
+    num_frames = max(1, round(duration * self.fps))
+    self.steps_per_frame = max(1, math.ceil(num_steps / num_frames))
 
-    Args:
-        cell (Cell): _description_
+  def update_display(self) -> None:
+    """Called by the algorithms after every step. Steps are batched, and every steps_per_frame-th one draws a frame
+
+    NOTE: Only the last call of a batch draws and waits on the clock, so the speed of an animation is no longer
+    capped at one step per frame. Call flush once the algorithm is done to draw the steps of a last, partial batch.
     """
-    x_pixels = cell.x * self.cell_size
-    y_pixels = cell.y * self.cell_size
-    walls_to_draw = {
-      Direction.UP: ((x_pixels, y_pixels), (x_pixels + self.cell_size, y_pixels)),
-      Direction.DOWN: (
-        (x_pixels, y_pixels + self.cell_size),
-        (x_pixels + self.cell_size, y_pixels + self.cell_size),
-      ),
-      Direction.LEFT: ((x_pixels, y_pixels), (x_pixels, y_pixels + self.cell_size)),
-      Direction.RIGHT: (
-        (x_pixels + self.cell_size, y_pixels),
-        (x_pixels + self.cell_size, y_pixels + self.cell_size),
-      ),
-    }
-    for direction in walls_to_draw:
-      start_pos, end_pos = walls_to_draw[direction]
-      pygame.draw.line(
-        self.surface, 
-        self.wall_up_color if cell.get_wall(direction) else self.background_color,
-        start_pos,
-        end_pos,
-        self.cell_wall_width
-      )
-
-  def handle_draw_semitransparent_lines(self, cell: Cell):
-    """Handles drawing the semi-transparent lines for highlighted cells
+    self.pending_steps += 1
+    if self.pending_steps < self.steps_per_frame:
+      return
+    self.flush()
+    self.clock.tick(self.fps)
 
-    Args:
-        cell (Cell): Cell whose walls we're creating transparent walls for
+  def flush(self) -> None:
+    """Draws every dirty cell, and pushes only the parts of the screen they cover to the display"""
+    self.pending_steps = 0
+    dirty_rects = self.render_dirty_cells()
+    if dirty_rects:
+      pygame.display.update(dirty_rects)
+
+  def build_tile_atlas(self) -> None:
+    """Pre-renders every way a cell can look into one atlas surface.
 
+    A cell's looks only depend on which of its 4 walls are up (16 combinations) and on whether it's highlighted as
+    unvisited, visited or in path (3 states). Tile number (state * 16 + walls) is stored at tile_rects[number], where
+    walls is the wall nibble of the cell's flags and state is 0 for no highlight, 1 for visited and 2 for in path.
+
+    NOTE: Walls are centered on the edge between two cells, so each tile draws its own half of a wall and the tile
+    next to it draws the other half. Both cells always agree on whether a shared wall is up, so the halves match.
     """
-    # We can only highlight when: self.highlight_cells and (cell.get_is_in_path() or cell.get_is_visited())
-    # NOTE: Guard clause here, so if we don't meet that above condition, then stop early since we can't highlight cells.
-    if not self.highlight_cells or (not cell.get_is_in_path() and not cell.get_is_visited()):
-      return
-    
-    
-    # For each direction, draw a thin semi-transparent wall when necessary
-    x_pixel = cell.x * self.cell_size
-    y_pixel = cell.y * self.cell_size
-    wall_pos = {
-      Direction.UP: (x_pixel, y_pixel),
-      Direction.DOWN: (x_pixel, y_pixel + self.cell_size),
-      Direction.LEFT: (x_pixel, y_pixel),
-      Direction.RIGHT: (x_pixel + self.cell_size, y_pixel)
+    size = self.cell_size
+    self.tile_atlas = pygame.Surface((16 * size, 3 * size), 0, self.surface)
+    self.tile_rects = []
+    self.tile_atlas_key = (self.cell_size, self.cell_wall_width)
+
+    highlights = [
+      None,
+      (self.highlight_is_visited_color, self.is_visited_src_alpha),
+      (self.highlight_is_in_path_color, self.is_in_path_src_alpha),
+    ]
+    highlight_surface = pygame.Surface((size, size))
+    for state, highlight in enumerate(highlights):
+      for walls in range(16):
+        tile_rect = pygame.Rect(walls * size, state * size, size, size)
+        self.tile_rects.append(tile_rect)
+        tile = self.tile_atlas.subsurface(tile_rect)
+        tile.fill(self.background_color)
+        if highlight is not None:
+          color, alpha = highlight
+          highlight_surface.fill(color)
+          highlight_surface.set_alpha(alpha)
+          tile.blit(highlight_surface, (0, 0))
+        self.draw_tile_walls(tile, walls)
+
+  def draw_tile_walls(self, tile: pygame.Surface, walls: int) -> None:
+    """Draws the walls that are up in the wall nibble `walls` onto a single tile
+
+    Args:
+        tile (pygame.Surface): Tile being drawn on; anything outside of it is clipped
+        walls (int): Wall bits, in the layout documented in Cell
+    """
+    size = self.cell_size
+    wall_lines = {
+      Direction.UP: ((0, 0), (size, 0)),
+      Direction.DOWN: ((0, size), (size, size)),
+      Direction.LEFT: ((0, 0), (0, size)),
+      Direction.RIGHT: ((size, 0), (size, size)),
     }
-    for direction in Direction:
-
-      # If the cell wall in a given direction is built, then skip it because we only draw 
-      # a semitransparent wall when a wall is down 
-      if cell.get_wall(direction):
-        continue
-
-      '''
-      # At this point we're looking at a fallen wall. There are two scenarios:
-      # - Check if we already have a reference to this wall in our cache, based on its direction
-      # 1. Creating a horizontal wall, which is used to fill in the top and down wall
-      # 2. Creating a vertical wall, which is used to fill in the left and right wall
-      '''
-      thin_surface = None
-      if direction in self.thin_surface_cache:
-        thin_surface = self.thin_surface_cache[direction]
-      else:
-        '''
-        # - Else it's not in the cache, so create a new wall reference
-        # 1. To create a horizontal wall, it just needs to be a surface that stretches as long as a 
-        #   cell wall. But it has infinitesimal height.
-        # 2. To create a vertical wall, it needs to be a surface with infinitesimal width, but a height that stretches as long as 
-        #   an original cell wall.
-        # 3. Update to thin_surface to reference the thin transparent surface we have in the cache
-        '''
-        if direction == Direction.UP or direction == Direction.DOWN:
-          self.thin_surface_cache[direction] = pygame.Surface((self.cell_size, self.cell_wall_width), pygame.SRCALPHA)
-        else:
-          self.thin_surface_cache[direction] = pygame.Surface((self.cell_wall_width, self.cell_size), pygame.SRCALPHA)  
-        thin_surface = self.thin_surface_cache[direction]
-      
-      '''
-      # Now we have the semi-transparent surface, we need to draw it in the correct position
-      # As well as this, we need to draw it the correct color based on whether it's in path or not
-      # NOTE: Remember that at this point we know that it's either in the goal path or it's visited
-      '''
-      start_pos = wall_pos[direction]
-      if cell.get_is_in_path():
-        thin_surface.fill(self.highlight_is_in_path_color)
-        thin_surface.set_alpha(self.is_in_path_src_alpha)
-      else:
-        thin_surface.fill(self.highlight_is_visited_color)      
-        thin_surface.set_alpha(self.is_visited_src_alpha)
-      self.surface.blit(thin_surface, start_pos)
-
-    
+    for direction, (start_pos, end_pos) in wall_lines.items():
+      if walls & Cell.WALL_MASKS[direction]:
+        pygame.draw.line(tile, self.wall_up_color, start_pos, end_pos, self.cell_wall_width)
+
+  def get_tile_number(self, cell: Cell) -> int:
+    """Returns the number of the atlas tile a cell is drawn with (see build_tile_atlas)"""
+    walls = cell.flags & Cell.WALLS_MASK
+    if not self.highlight_cells:
+      return walls
+    if cell.get_is_in_path():
+      return 32 + walls
+    if cell.get_is_visited():
+      return 16 + walls
+    return walls
+
+  def get_tile_numbers(self, cells: list[Cell]) -> list[int]:
+    """Returns get_tile_number of every cell in the list.
+
+    NOTE: When the cells are all views of the same grid storage (which they are when they come from a Grid), the flags
+    are read out of the storage with one vectorized lookup instead of a few method calls per cell.
+    """
+    if not cells or not isinstance(cells[0], CellView):
+      return [self.get_tile_number(cell) for cell in cells]
+    storage = cells[0].storage
+    if not all(getattr(cell, "storage", None) is storage for cell in cells):
+      return [self.get_tile_number(cell) for cell in cells]
+
+    flags = storage.get_current_flags(np.fromiter((cell.index for cell in cells), dtype=np.int64, count=len(cells)))
+    tile_numbers = flags & Cell.WALLS_MASK
+    if self.highlight_cells:
+      is_in_path = (flags & Cell.IN_PATH_MASK) != 0
+      is_visited = (flags & Cell.VISITED_MASK) != 0
+      tile_numbers += np.where(is_in_path, 32, np.where(is_visited, 16, 0)).astype(tile_numbers.dtype)
+    return tile_numbers.tolist()
+
   def draw_cell(self, cell: Cell) -> None:
-    """Draws a cell and its walls
+    """Draws a cell and its walls, by copying its tile out of the atlas
     Args:
-        surface (pygame.Surface): Surface we're drawing on
-        cell_size (int): Length=width of the cell
+        cell (Cell): Cell being drawn
     """
-    self.handle_highlight_cell(cell)
-    self.handle_draw_lines(cell)
-    self.handle_draw_semitransparent_lines(cell)
-    
\ No newline at end of file
+    tile_rect = self.tile_rects[self.get_tile_number(cell)]
+    self.surface.blit(self.tile_atlas, (cell.x * self.cell_size, cell.y * self.cell_size), tile_rect)
@@ -1,16 +1,13 @@
 from utils.Profiler import Profiler
 
-profiler = Profiler()
+# mass_profile runs its jobs in worker processes, which import this file again, so only run things from the main one
+if __name__ == "__main__":
+  profiler = Profiler()
 
+  # Generate data by running this first; every seed is a different maze of each size
+  # profiler.mass_profile(seeds=range(5))
 
-# Generate data by running these first
-# profiler.mass_profile()
-# profiler.mass_profile()
-# profiler.mass_profile()
-# profiler.mass_profile()
-# profiler.mass_profile()
+  # Then generate plots by running these
+  profiler.generate_visualizations()
 
-# Then generate plots by running these
-profiler.generate_visualizations()
-
-print("Done?")
\ No newline at end of file
+  print("Done?")
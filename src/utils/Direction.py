@@ -7,6 +7,10 @@ class Direction(Enum):
   LEFT = (-1, 0)
   RIGHT = (1, 0)
 
+  # Members are singletons, so hashing by identity is equivalent to Enum's default (which hashes the member name
+  # in Python code) but stays in C. Directions are used as dict keys in hot paths such as Cell.WALL_MASKS.
+  __hash__ = object.__hash__
+
   @property
   def opposite(self):
     opposites = {
@@ -0,0 +1,83 @@
+import hashlib
+import os
+
+from grid.Grid import Grid
+
+
+class MazeCache:
+  # Part of every cache key. Bump it whenever a generator's output for a given seed changes (or anything else that
+  # makes a cached maze differ from a freshly generated one), so mazes cached before the change are never served.
+  CACHE_VERSION = 1
+
+  def __init__(self, cache_dir: str = "maze_cache", max_bytes: int = 1 << 30):
+    """On-disk cache of generated mazes, so the same maze never has to be generated twice.
+
+    Args:
+        cache_dir (str, optional): Directory the mazes are stored in. Defaults to "maze_cache".
+        max_bytes (int, optional): Size cap of the cache; once it's exceeded, the least recently used mazes are
+          deleted. Defaults to 1GB.
+
+    NOTE: Mazes are stored in Grid's binary format, in a file named after the hash of everything that determines
+    the generated maze (see make_key). The modification time of a file is bumped whenever it's used, which is what
+    the least recently used eviction goes by.
+    """
+    self.cache_dir = cache_dir
+    self.max_bytes = max_bytes
+
+  @staticmethod
+  def make_key(
+    generator_name: str,
+    num_rows: int,
+    num_cols: int,
+    seed: int,
+    imperfection_rate: float,
+    start_pos: tuple[int, int],
+    end_pos: tuple[int, int],
+  ) -> str:
+    """Returns the cache key of a maze; mazes with the same key are identical as long as the RNG was seeded with
+    `seed` right before generating them. The key also covers CACHE_VERSION and the version of Grid's binary format,
+    so changing either one misses every maze cached before."""
+    key = f"{MazeCache.CACHE_VERSION}|{Grid.FILE_VERSION}|{generator_name}|{num_rows}x{num_cols}|{seed}|{float(imperfection_rate)}|{tuple(start_pos)}|{tuple(end_pos)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+  def get_path(self, key: str) -> str:
+    return os.path.join(self.cache_dir, f"{key}.maze")
+
+  def get(self, key: str) -> str | None:
+    """Returns the path of the cached maze with the given key (to be opened with Grid.load), or None on a miss"""
+    path = self.get_path(key)
+    try:
+      os.utime(path)
+    except FileNotFoundError:
+      return None
+    return path
+
+  def put(self, key: str, grid: Grid) -> None:
+    """Adds a maze to the cache, then evicts mazes until the cache fits under its size cap"""
+    os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Write to a temporary file and move it into place, so a reader never sees a half-written maze
+    path = self.get_path(key)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    grid.save(temp_path)
+    os.replace(temp_path, path)
+    self.evict()
+
+  def evict(self) -> None:
+    """Deletes the least recently used mazes until the total size of the cache is at most max_bytes"""
+    entries = []
+    with os.scandir(self.cache_dir) as scan:
+      for entry in scan:
+        if entry.name.endswith(".maze"):
+          stat = entry.stat()
+          entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+      if total_bytes <= self.max_bytes:
+        break
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+      total_bytes -= size
@@ -1,29 +1,96 @@
-import csv
+import gc
+import multiprocessing
 import os
 import time
 import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
+
+from algorithms.SolverStats import SolverStats
+from utils.ResultsStore import ResultsStore
 
 
 class Profiler:
+    # (name, numpy dtype) of the columns of every log; the entries built by the measure_*/time_* methods follow them
+    generator_log_columns = [
+        ("Rows", "i4"),
+        ("Cols", "i4"),
+        ("Generator", "U64"),
+        ("Execution Time (s)", "f8"),
+        ("Memory Usage (KB)", "f8"),
+        ("Peak Memory Usage (KB)", "f8"),
+        ("Timestamp", "U19"),
+    ]
+    solver_log_columns = [
+        ("Rows", "i4"), 
+        ("Cols", "i4"),
+        ("Solver", "U64"),
+        ("Ratio (num_in_path / num_visited_cells)", "f8"), 
+        ("num_in_path", "i8"), 
+        ("num_visited_cells", "i8"), 
+        ("num_expanded", "i8"),
+        # Counters of the solver's SolverStats, which show where the work of a search went
+        ("num_pushes", "i8"),
+        ("num_pops", "i8"),
+        ("num_stale_skips", "i8"),
+        ("max_frontier_size", "i8"),
+        ("num_neighbor_lookups", "i8"),
+        ("Execution Time (s)", "f8"), 
+        ("Memory Usage (KB)", "f8"), 
+        ("Peak Memory Usage (KB)", "f8"), 
+        ("Timestamp", "U19"),
+    ]
+    # Logs of the accurate timing mode (see time_runs): timing statistics over many runs, and memory from a run of its own
+    timing_stats_columns = [
+        ("Runs", "i4"),
+        ("Min Execution Time (s)", "f8"),
+        ("Median Execution Time (s)", "f8"),
+        ("P95 Execution Time (s)", "f8"),
+        ("Memory Usage (KB)", "f8"),
+        ("Peak Memory Usage (KB)", "f8"),
+    ]
+    generator_benchmark_log_columns = [("Rows", "i4"), ("Cols", "i4"), ("Generator", "U64"), *timing_stats_columns, ("Timestamp", "U19")]
+    solver_benchmark_log_columns = [("Rows", "i4"), ("Cols", "i4"), ("Solver", "U64"), *timing_stats_columns, ("Timestamp", "U19")]
+
     def __init__(self):
         self.std_log_file_header = ["Timestamp", "Function", "Execution Time (s)", "Memory (KB)", "Peak Memory (KB)"]
         self.benchmark_log_file_header = ["Timestamp", "Function", "Runs", "Avg Execution Time (s)", "Avg Memory (KB)", "Avg Peak Memory (KB)"]
         self.solver_log_file = "solver.csv"
         self.generator_log_file = "generator.csv"
+        self.solver_benchmark_log_file = "solver_benchmark.csv"
+        self.generator_benchmark_log_file = "generator_benchmark.csv"
+
+        # Results are logged into buffered stores of NumPy chunk files (see ResultsStore); export_csvs writes them out
+        # to the CSV files above
+        self.results_dir = os.path.join("results")
+        self.generator_results = ResultsStore(os.path.join(self.results_dir, "generator"), Profiler.generator_log_columns)
+        self.solver_results = ResultsStore(os.path.join(self.results_dir, "solver"), Profiler.solver_log_columns)
+        self.generator_benchmark_results = ResultsStore(
+            os.path.join(self.results_dir, "generator_benchmark"), Profiler.generator_benchmark_log_columns
+        )
+        self.solver_benchmark_results = ResultsStore(
+            os.path.join(self.results_dir, "solver_benchmark"), Profiler.solver_benchmark_log_columns
+        )
         self.plots_dir = os.path.join("plots")
     
-    def _log_entry(self, log_file, entry, header):
-        """Creates an entry in the log file; adds a header if one doesn't already exist"""
-        file_exists = os.path.isfile(log_file)
-        with open(log_file, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            if not file_exists or os.stat(log_file).st_size == 0:
-                writer.writerow(header)
-            writer.writerow(entry)
+    def flush(self):
+        """Writes every buffered result out to its store"""
+        for results in [self.generator_results, self.solver_results, self.generator_benchmark_results, self.solver_benchmark_results]:
+            results.flush()
+
+    def export_csvs(self):
+        """Writes every store that has results out to its CSV log file"""
+        for results, log_file in [
+            (self.generator_results, self.generator_log_file),
+            (self.solver_results, self.solver_log_file),
+            (self.generator_benchmark_results, self.generator_benchmark_log_file),
+            (self.solver_benchmark_results, self.solver_benchmark_log_file),
+        ]:
+            if results.buffer or os.path.isdir(results.directory):
+                results.export_csv(log_file)
             
     @staticmethod
     def clear_log_file(log_file):
@@ -35,19 +102,25 @@ class Profiler:
             pass #opening file in write mode clears the content
             
     def profile_helper(self, func, *args, **kwargs):
+        """Runs func, returning (execution time, memory (KB), peak memory (KB), whatever func returned)"""
         tracemalloc.start()
         start_time = time.time()
-        func(*args, **kwargs)
+        result = func(*args, **kwargs)
         end_time = time.time()
         current, peak = tracemalloc.get_traced_memory()
         tracemalloc.stop()
         execution_time = end_time - start_time
-        return (execution_time, current / 1024, peak / 1024)
+        return (execution_time, current / 1024, peak / 1024, result)
  
     def profile_maze_generation(self, generator_fn, grid, *args, **kwargs):
+        entry = self.measure_maze_generation(generator_fn, grid, *args, **kwargs)
+        self.generator_results.append(entry)
+
+    def measure_maze_generation(self, generator_fn, grid, *args, **kwargs) -> list:
+        """Runs a maze generator, and returns its generator log entry instead of logging it"""
         # Have a helper function that finds the execution times and memory usage and returns that stuff here
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        execution_time, end_memory_usage, peak_memory_usage = self.profile_helper(generator_fn, grid, *args, **kwargs)
+        execution_time, end_memory_usage, peak_memory_usage, _ = self.profile_helper(generator_fn, grid, *args, **kwargs)
         info = [
             grid.num_rows, 
             grid.num_cols, 
@@ -57,12 +130,18 @@ class Profiler:
             peak_memory_usage, 
             timestamp
         ]
-        header = ["Rows", "Cols", "Generator", "Execution Time (s)", "Memory Usage (KB)", "Peak Memory Usage (KB)", "Timestamp"]
-        self._log_entry(self.generator_log_file, info, header)
+        return info
 
     def profile_maze_solver(self, solver_fn, grid, *args, **kwargs):
+        entry = self.measure_maze_solver(solver_fn, grid, *args, **kwargs)
+        self.solver_results.append(entry)
+
+    def measure_maze_solver(self, solver_fn, grid, *args, **kwargs) -> list:
+        """Runs a maze solver, and returns its solver log entry instead of logging it. The solver is passed a
+        SolverStats to fill in (see MazeSolver), whose counters go into the entry."""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        execution_time, end_memory_usage, peak_memory_usage = self.profile_helper(solver_fn, grid, *args, **kwargs)
+        stats = SolverStats()
+        execution_time, end_memory_usage, peak_memory_usage, _ = self.profile_helper(solver_fn, grid, *args, stats=stats, **kwargs)
         num_visited = grid.get_num_visited_cells()
         num_in_path = grid.get_num_path_cells()
         entry = [
@@ -73,34 +152,143 @@ class Profiler:
             num_in_path / num_visited,
             num_in_path,
             num_visited,
+            stats.expansions,
+            stats.pushes,
+            stats.pops,
+            stats.stale_skips,
+            stats.max_frontier,
+            stats.neighbor_lookups,
             execution_time,
             end_memory_usage,
             peak_memory_usage,
             timestamp
         ]
-        header = [
-            "Rows", 
-            "Cols",
-            "Solver",
-            "Ratio (num_in_path / num_visited_cells)", 
-            "num_in_path", 
-            "num_visited_cells", 
-            "Execution Time (s)", 
-            "Memory Usage (KB)", 
-            "Peak Memory Usage (KB)", 
-            "Timestamp"
-        ]
-        self._log_entry(self.solver_log_file, entry, header)
+        return entry
+
+    def time_runs(self, func, make_args, warmups: int = 1, repetitions: int = 5) -> list[int]:
+        """Times runs of a function with a high resolution monotonic clock, without tracemalloc getting in the way.
+
+        Args:
+            func: Function being timed
+            make_args: Called before every run, untimed, and returns the positional arguments of the run. This is
+              where every run gets a fresh maze, so they all do the same work.
+            warmups (int, optional): Untimed runs done first, so caches and the allocator are warmed up. Defaults to 1.
+            repetitions (int, optional): Number of timed runs. Defaults to 5.
+
+        Returns:
+            list[int]: Execution time of every timed run, in nanoseconds
+
+        NOTE: The garbage collector is turned off while timing (like timeit does), so a collection triggered by the
+        garbage of one run doesn't get billed to another.
+        """
+        for _ in range(warmups):
+            func(*make_args())
+
+        samples = []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(repetitions):
+                args = make_args()
+                start_time = time.perf_counter_ns()
+                func(*args)
+                samples.append(time.perf_counter_ns() - start_time)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return samples
+
+    @staticmethod
+    def get_timing_stats(samples_ns: list[int]) -> tuple[float, float, float]:
+        """Returns the (min, median, 95th percentile) of execution times in nanoseconds, in seconds"""
+        samples = np.array(samples_ns, dtype=np.float64) / 1e9
+        return (float(samples.min()), float(np.median(samples)), float(np.percentile(samples, 95)))
 
-    def mass_profile(self):
+    def measure_memory(self, func, *args) -> tuple[float, float]:
+        """Runs func once under tracemalloc, in a run of its own that isn't timed.
+
+        Returns:
+            tuple[float, float]: (memory still allocated at the end (KB), peak memory (KB))
+        """
+        tracemalloc.start()
+        func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (current / 1024, peak / 1024)
+
+    def benchmark_maze_generation(self, generator_fn, num_rows: int, num_cols: int, seed: int = 0, warmups: int = 1, repetitions: int = 5):
+        entry = self.time_maze_generation(generator_fn, num_rows, num_cols, seed, warmups, repetitions)
+        self.generator_benchmark_results.append(entry)
+
+    def time_maze_generation(self, generator_fn, num_rows: int, num_cols: int, seed: int = 0, warmups: int = 1, repetitions: int = 5) -> list:
+        """Accurate timing mode of measure_maze_generation: every run generates the same maze (the RNG is reseeded with
+        `seed`) on a fresh grid. Returns the generator benchmark log entry."""
         import random
 
+        from grid.Grid import Grid
+
+        def make_args():
+            random.seed(seed)
+            return (Grid(renderer=None, num_rows=num_rows, num_cols=num_cols),)
+
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        samples = self.time_runs(generator_fn, make_args, warmups, repetitions)
+        memory_usage, peak_memory_usage = self.measure_memory(generator_fn, *make_args())
+        return [num_rows, num_cols, generator_fn.__name__, repetitions, *Profiler.get_timing_stats(samples), memory_usage, peak_memory_usage, timestamp]
+
+    def benchmark_maze_solver(self, solver_fn, grid, warmups: int = 1, repetitions: int = 5):
+        entry = self.time_maze_solver(solver_fn, grid, warmups, repetitions)
+        self.solver_benchmark_results.append(entry)
+
+    def time_maze_solver(self, solver_fn, grid, warmups: int = 1, repetitions: int = 5) -> list:
+        """Accurate timing mode of measure_maze_solver: solves the same maze again and again, resetting it in between.
+        Returns the solver benchmark log entry."""
+        def make_args():
+            grid.reset_visited_cells()
+            return (grid,)
+
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        samples = self.time_runs(solver_fn, make_args, warmups, repetitions)
+        memory_usage, peak_memory_usage = self.measure_memory(solver_fn, *make_args())
+        return [grid.num_rows, grid.num_cols, solver_fn.__name__, repetitions, *Profiler.get_timing_stats(samples), memory_usage, peak_memory_usage, timestamp]
+
+    def mass_profile(
+        self,
+        seeds=(0,),
+        repetitions: int = 1,
+        max_workers: int | None = None,
+        maze_cache=None,
+        grid_sizes=None,
+        timing_runs: int | None = None,
+        warmups: int = 1,
+    ):
+        """Generates a maze of every size and profiles every solver on it.
+
+        Args:
+            seeds (tuple[int], optional): A maze of every size is generated with each of these seeds. Defaults to (0,).
+            repetitions (int, optional): Number of times each solver is run on each maze. Defaults to 1.
+            max_workers (int | None, optional): Number of worker processes; 1 runs everything in this process.
+              Defaults to the number of CPUs.
+            maze_cache (MazeCache | None, optional): Cache of generated mazes. Defaults to a MazeCache in ./maze_cache.
+            grid_sizes (list[int] | None, optional): Side lengths of the mazes. Defaults to 10 through 300.
+            timing_runs (int | None, optional): When set, every job uses the accurate timing mode (see time_runs) with
+              this many timed runs after `warmups` untimed ones, and logs to the benchmark CSVs. Defaults to None.
+            warmups (int, optional): Untimed runs before the timed ones in the accurate timing mode. Defaults to 1.
+
+        NOTE: Every (size, seed) maze and every (size, solver, seed, repetition) run is an independent job, so they're
+        spread over a process pool: first the mazes are generated into the maze cache, then the solver runs load them
+        from it. Workers hand their log entries back, and they're logged all at once at the end. Mazes that
+        were already cached aren't generated (or logged) again, so repeated sweeps spend their time on the solvers.
+        """
         from algorithms.MazeGenerator import MazeGenerator
         from algorithms.MazeSolver import MazeSolver
-        from grid.Grid import Grid
-        random.seed()
+        from utils.MazeCache import MazeCache
+
+        if maze_cache is None:
+            maze_cache = MazeCache()
 
-        grid_sizes = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 200, 300]
+        if grid_sizes is None:
+            grid_sizes = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 200, 300]
         # Use randomized kruskal as the default maze generator
         maze_generator_fn = MazeGenerator.randomized_kruskal
         solver_arr = [
@@ -109,21 +297,48 @@ class Profiler:
           MazeSolver.breadth_first_search,
           MazeSolver.dijkstra,
           MazeSolver.a_star,
+          MazeSolver.jump_point_search,
         ]
 
-        # For each grid size, generate a maze and then run each solver on that maze; make sure to reset the maze (i.e. nested for loop)
-        for size in grid_sizes:
-            for solver_fn in solver_arr:
-                grid = Grid(renderer=None, num_rows=size, num_cols=size)
-                
-                # Profile and log the information
-                self.profile_maze_generation(maze_generator_fn, grid)
-                self.profile_maze_solver(solver_fn, grid)
-      
+        # Functions are sent to the workers by name, and looked up again on the other side
+        generator_name = maze_generator_fn.__name__
+        generation_jobs = [(generator_name, size, seed, maze_cache, timing_runs, warmups) for size in grid_sizes for seed in seeds]
+        # Biggest mazes first, so the slowest jobs don't end up running last on an otherwise idle pool
+        solver_jobs = [
+            (generator_name, solver_fn.__name__, size, seed, maze_cache, timing_runs, warmups)
+            for size in reversed(grid_sizes)
+            for solver_fn in solver_arr
+            for seed in seeds
+            for _ in range(repetitions)
+        ]
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers == 1:
+            generator_entries = [_generate_maze_job(*job) for job in generation_jobs]
+            solver_entries = [_solve_maze_job(*job) for job in solver_jobs]
+        else:
+            # Spawned rather than forked workers: forking a process that has threads running (pygame and matplotlib
+            # both start some) can deadlock the children
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                generator_entries = list(executor.map(_generate_maze_job, *zip(*generation_jobs)))
+                solver_entries = list(executor.map(_solve_maze_job, *zip(*solver_jobs)))
+
+        # Put the solver runs back in the order of the sizes, like a sequential sweep would log them
+        solver_entries.sort(key=lambda entry: entry[0])
+        generator_entries = [entry for entry in generator_entries if entry is not None]
+        if timing_runs is None:
+            self.generator_results.extend(generator_entries)
+            self.solver_results.extend(solver_entries)
+        else:
+            self.generator_benchmark_results.extend(generator_entries)
+            self.solver_benchmark_results.extend(solver_entries)
+        self.flush()
+
     def generate_visualizations(self): 
       os.makedirs(self.plots_dir, exist_ok=True)
 
-      solver_df = pd.read_csv(self.solver_log_file)
+      solver_df = self.solver_results.query()
     
       # --- Maze Solver Execution Time ---
       plt.figure(figsize=(12, 6))
@@ -214,3 +429,100 @@ class Profiler:
       plt.tight_layout()
       plt.savefig(os.path.join(self.plots_dir, "maze_solver_efficiency_ratio.png"))
 
+      '''
+      # Graph: Expanded Nodes
+      Jump point search only expands jump points, so this is where it can be compared with the other solvers.
+      '''
+      if "num_expanded" in solver_df.columns:
+          plt.figure(figsize=(12, 6))
+          for solver_name in solver_df["Solver"].unique():
+              solver_data = solver_df[solver_df["Solver"] == solver_name]
+              grouped = solver_data.groupby("Rows").mean(numeric_only=True)
+              plt.plot(grouped.index, grouped["num_expanded"], marker='s', label=solver_name)
+          plt.title("Nodes Expanded by Each Solver")
+          plt.xlabel("Grid Size (N x N)")
+          plt.ylabel("Expanded Nodes")
+          plt.yscale("log")
+          plt.legend()
+          plt.grid(True)
+          plt.tight_layout()
+          plt.savefig(os.path.join(self.plots_dir, "maze_solver_expanded_nodes.png"))
+
+      '''
+      # Graph: Max Frontier Size
+      How much a solver had waiting to be expanded at once; a big frontier means big heaps, and slow pushes and pops.
+      '''
+      if "max_frontier_size" in solver_df.columns:
+          plt.figure(figsize=(12, 6))
+          for solver_name in solver_df["Solver"].unique():
+              solver_data = solver_df[solver_df["Solver"] == solver_name]
+              grouped = solver_data.groupby("Rows").mean(numeric_only=True)
+              plt.plot(grouped.index, grouped["max_frontier_size"], marker='d', label=solver_name)
+          plt.title("Max Frontier Size of Each Solver")
+          plt.xlabel("Grid Size (N x N)")
+          plt.ylabel("Max Frontier Size")
+          plt.yscale("log")
+          plt.legend()
+          plt.grid(True)
+          plt.tight_layout()
+          plt.savefig(os.path.join(self.plots_dir, "maze_solver_max_frontier.png"))
+
+
+def _get_maze_cache_key(generator_name: str, size: int, seed: int) -> str:
+    from utils.MazeCache import MazeCache
+
+    return MazeCache.make_key(generator_name, size, size, seed, 0, (0, 0), (size - 1, size - 1))
+
+
+def _generate_maze_job(generator_name: str, size: int, seed: int, maze_cache, timing_runs: int | None, warmups: int) -> list | None:
+    """Worker of Profiler.mass_profile: generates a maze into the maze cache, unless it's already there.
+
+    Returns:
+        list | None: The generator log entry (the generator benchmark log entry when timing_runs is set), or None when
+        the maze was already cached
+    """
+    import random
+
+    from algorithms.MazeGenerator import MazeGenerator
+    from grid.Grid import Grid
+
+    cache_key = _get_maze_cache_key(generator_name, size, seed)
+    if maze_cache.get(cache_key):
+        return None
+    generator_fn = getattr(MazeGenerator, generator_name)
+    entry = None
+    if timing_runs is not None:
+        entry = Profiler().time_maze_generation(generator_fn, size, size, seed, warmups, timing_runs)
+
+    random.seed(seed)
+    grid = Grid(renderer=None, num_rows=size, num_cols=size)
+    if timing_runs is None:
+        entry = Profiler().measure_maze_generation(generator_fn, grid)
+    else:
+        generator_fn(grid)
+    maze_cache.put(cache_key, grid)
+    return entry
+
+
+def _solve_maze_job(generator_name: str, solver_name: str, size: int, seed: int, maze_cache, timing_runs: int | None, warmups: int) -> list:
+    """Worker of Profiler.mass_profile: runs a solver on a maze from the maze cache, and returns its solver log entry
+    (its solver benchmark log entry when timing_runs is set)"""
+    import random
+
+    from algorithms.MazeGenerator import MazeGenerator
+    from algorithms.MazeSolver import MazeSolver
+    from grid.Grid import Grid
+
+    cached_path = maze_cache.get(_get_maze_cache_key(generator_name, size, seed))
+    if cached_path:
+        grid = Grid.load(cached_path)
+    else:
+        # Evicted since the generation jobs ran (the cache is too small for the sweep), so generate it again
+        random.seed(seed)
+        grid = Grid(renderer=None, num_rows=size, num_cols=size)
+        getattr(MazeGenerator, generator_name)(grid)
+    grid.freeze()
+    solver_fn = getattr(MazeSolver, solver_name)
+    if timing_runs is not None:
+        return Profiler().time_maze_solver(solver_fn, grid, warmups, timing_runs)
+    return Profiler().measure_maze_solver(solver_fn, grid)
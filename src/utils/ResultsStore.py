@@ -0,0 +1,103 @@
+import atexit
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class ResultsStore:
+  def __init__(self, directory: str, columns: list[tuple[str, str]], chunk_rows: int = 8192):
+    """Append-only table of profiler results, stored as a directory of NumPy chunk files.
+
+    Args:
+        directory (str): Directory the chunk files are written to
+        columns (list[tuple[str, str]]): (name, numpy dtype) of every column, in the order entries list them
+        chunk_rows (int, optional): Number of rows buffered in memory before they're written out as one chunk.
+          Defaults to 8192.
+
+    NOTE: Appending a row only adds it to an in-memory buffer. Once chunk_rows rows are buffered (or on flush, or when
+    the process exits), they're written out together as a single structured array (.npy file), so logging costs no I/O
+    per row, and reading the table back is a few np.load calls instead of parsing text.
+    """
+    self.directory = directory
+    self.dtype = np.dtype(columns)
+    self.chunk_rows = chunk_rows
+    self.buffer: list[tuple] = []
+    self.is_flushed_at_exit = False
+
+  def append(self, entry) -> None:
+    """Adds a row, given as a sequence of values in column order"""
+    self.buffer.append(tuple(entry))
+    if not self.is_flushed_at_exit:
+      # Rows still in the buffer when the program ends would be lost otherwise
+      atexit.register(self.flush)
+      self.is_flushed_at_exit = True
+    if len(self.buffer) >= self.chunk_rows:
+      self.flush()
+
+  def extend(self, entries) -> None:
+    for entry in entries:
+      self.append(entry)
+
+  def flush(self) -> None:
+    """Writes the buffered rows out as a new chunk file"""
+    if not self.buffer:
+      return
+    os.makedirs(self.directory, exist_ok=True)
+    chunk = np.array(self.buffer, dtype=self.dtype)
+    np.save(self._get_next_chunk_path(), chunk, allow_pickle=False)
+    self.buffer = []
+
+  def _get_chunk_paths(self) -> list[str]:
+    if not os.path.isdir(self.directory):
+      return []
+    names = sorted(name for name in os.listdir(self.directory) if name.endswith(".npy"))
+    return [os.path.join(self.directory, name) for name in names]
+
+  def _get_next_chunk_path(self) -> str:
+    # Chunk files are numbered, so sorting them by name gives back the order the rows were logged in
+    index = len(self._get_chunk_paths())
+    while os.path.exists(os.path.join(self.directory, f"{index:08d}.npy")):
+      index += 1
+    return os.path.join(self.directory, f"{index:08d}.npy")
+
+  def query(self, columns: list[str] | None = None, **equals) -> pd.DataFrame:
+    """Reads rows back from the store, including the ones that haven't been flushed yet.
+
+    Args:
+        columns (list[str] | None, optional): Columns to return. Defaults to all of them.
+        **equals: Only return rows where the column (named by the keyword) equals the value. Column names with
+          spaces can be passed with ** as well, e.g. query(**{"Solver": "a_star"}).
+
+    Returns:
+        pd.DataFrame: The matching rows, in the order they were logged
+    """
+    columns = list(self.dtype.names) if columns is None else columns
+    chunks = [np.load(path, mmap_mode="r", allow_pickle=False) for path in self._get_chunk_paths()]
+    if self.buffer:
+      chunks.append(np.array(self.buffer, dtype=self.dtype))
+
+    selected = []
+    for chunk in chunks:
+      mask = np.ones(len(chunk), dtype=bool)
+      for name, value in equals.items():
+        mask &= chunk[name] == value
+      selected.append({name: np.asarray(chunk[name][mask]) for name in columns})
+
+    if not selected:
+      return pd.DataFrame({name: np.empty(0, dtype=self.dtype[name]) for name in columns})
+    return pd.DataFrame({name: np.concatenate([part[name] for part in selected]) for name in columns})
+
+  def clear(self) -> None:
+    """Deletes every row, flushed or not"""
+    self.buffer = []
+    for path in self._get_chunk_paths():
+      os.remove(path)
+
+  def export_csv(self, path: str) -> None:
+    """Writes the whole table to a CSV file, with a header row"""
+    with open(path, mode="w", newline="") as file:
+      writer = csv.writer(file)
+      writer.writerow(self.dtype.names)
+      writer.writerows(self.query().itertuples(index=False))
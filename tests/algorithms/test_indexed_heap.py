@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from algorithms.IndexedHeap import IndexedHeap
+
+
+def test_pops_in_priority_order():
+  random.seed(3)
+  priorities = [random.randrange(50) for _ in range(300)]
+  heap = IndexedHeap(len(priorities))
+  for item, priority in enumerate(priorities):
+    assert heap.push(item, priority)
+  assert len(heap) == len(priorities)
+
+  popped = [heap.pop() for _ in range(len(priorities))]
+  assert [priority for _, priority in popped] == sorted(priorities)
+  assert sorted(item for item, _ in popped) == list(range(len(priorities)))
+  assert not heap
+  assert (heap.positions == -1).all()
+
+def test_ties_come_out_in_push_order():
+  heap = IndexedHeap(10)
+  for item in [4, 7, 1, 9]:
+    heap.push(item, 5)
+  heap.push(2, 3)
+  assert [heap.pop()[0] for _ in range(5)] == [2, 4, 7, 1, 9]
+
+def test_push_lowers_priority_in_place():
+  heap = IndexedHeap(5)
+  for item in range(5):
+    heap.push(item, 10 + item)
+
+  # A higher priority is ignored, a lower one moves the item up without adding an entry
+  assert not heap.push(3, 20)
+  assert not heap.push(3, 1)
+  assert len(heap) == 5
+  assert heap.peek_priority() == 1
+  assert heap.pop() == (3, 1)
+  assert not heap.contains(3)
+
+  heap.decrease_key(4, 2)
+  assert heap.pop() == (4, 2)
+  assert [heap.pop() for _ in range(3)] == [(0, 10), (1, 11), (2, 12)]
+
+def test_decrease_key_errors():
+  heap = IndexedHeap(3)
+  heap.push(0, 5)
+  with pytest.raises(KeyError):
+    heap.decrease_key(1, 2)
+  with pytest.raises(ValueError):
+    heap.decrease_key(0, 6)
+
+def test_push_numbers_past_32_bits_keep_priority_order():
+  # The push number has 64 bits, so a long search can't carry it into the priority bits
+  heap = IndexedHeap(3)
+  heap.num_pushes = 2**40
+  heap.push(0, 2)
+  heap.push(1, 1)
+  heap.push(2, 1)
+  assert [heap.pop() for _ in range(3)] == [(1, 1), (2, 1), (0, 2)]
+
+def test_rejects_too_many_items():
+  with pytest.raises(ValueError):
+    IndexedHeap((1 << 32) + 1)
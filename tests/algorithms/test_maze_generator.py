@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+
+from algorithms.MazeGenerator import MazeGenerator
+from grid.Grid import Grid
+
+
+def is_perfect_maze(grid):
+  # A perfect maze is a spanning tree: num_cells - 1 passages, and every cell reachable from the start
+  offsets, neighbors = grid.get_adjacency()
+  if len(neighbors) // 2 != grid.num_rows * grid.num_cols - 1:
+    return False
+  seen = {0}
+  stack = [0]
+  while stack:
+    current = stack.pop()
+    for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+      if neighbor not in seen:
+        seen.add(neighbor)
+        stack.append(neighbor)
+  return len(seen) == grid.num_rows * grid.num_cols
+
+
+def test_kruskal_batch_makes_perfect_maze():
+  random.seed(1)
+  grid = Grid(None, 12, 17)
+  MazeGenerator.randomized_kruskal_batch(grid)
+  assert is_perfect_maze(grid)
+
+def test_kruskal_batch_is_reproducible():
+  grids = []
+  for _ in range(2):
+    random.seed(3)
+    grid = Grid(None, 20, 20)
+    MazeGenerator.randomized_kruskal_batch(grid)
+    grids.append(grid)
+  assert np.array_equal(grids[0].storage.flags, grids[1].storage.flags)
+
+def test_prim_makes_perfect_maze():
+  for generator_fn in [MazeGenerator.randomized_prim, MazeGenerator.randomized_prim_frontier]:
+    random.seed(2)
+    grid = Grid(None, 15, 11)
+    generator_fn(grid)
+    assert is_perfect_maze(grid)
+    assert grid.get_num_visited_cells() == 0
+
+def test_prim_frontier_is_reproducible():
+  grids = []
+  for _ in range(2):
+    random.seed(4)
+    grid = Grid(None, 20, 20)
+    MazeGenerator.randomized_prim_frontier(grid)
+    grids.append(grid)
+  assert np.array_equal(grids[0].storage.flags, grids[1].storage.flags)
+
+def test_generators_mark_maze_perfect():
+  for generator_fn in [
+    MazeGenerator.recursive_backtracker,
+    MazeGenerator.randomized_kruskal,
+    MazeGenerator.randomized_kruskal_batch,
+    MazeGenerator.randomized_prim,
+    MazeGenerator.randomized_prim_frontier,
+  ]:
+    random.seed(5)
+    grid = Grid(None, 9, 9)
+    assert not grid.is_perfect
+    generator_fn(grid)
+    assert grid.is_perfect and is_perfect_maze(grid)
+
+    MazeGenerator.add_imperfections(grid, 0.0)
+    assert grid.is_perfect
+    MazeGenerator.add_imperfections(grid, 0.2)
+    assert not grid.is_perfect
@@ -0,0 +1,194 @@
+import random
+
+import pytest
+
+from algorithms.MazeGenerator import MazeGenerator
+from algorithms.MazeSolver import MazeSolver
+from algorithms.SolverStats import SolverStats
+from algorithms.TerrainGenerator import TerrainGenerator
+from grid.Grid import Grid
+
+
+def make_maze(size=15, imperfection_rate=0.0, seed=7):
+  random.seed(seed)
+  grid = Grid(None, size, size)
+  MazeGenerator.randomized_kruskal(grid)
+  MazeGenerator.add_imperfections(grid, imperfection_rate)
+  grid.freeze()
+  return grid
+
+def get_path(grid):
+  # Walk the parent links back from the goal, checking that every step goes through an open wall
+  offsets, neighbors = grid.get_adjacency()
+  path = [grid.get_list_index(grid.get_goal_cell())]
+  while grid.storage.parents[path[-1]] >= 0:
+    parent = int(grid.storage.parents[path[-1]])
+    assert path[-1] in neighbors[offsets[parent] : offsets[parent + 1]]
+    path.append(parent)
+  return path[::-1]
+
+
+@pytest.mark.parametrize("solver_fn", [
+  MazeSolver.breadth_first_search,
+  MazeSolver.depth_first_search,
+  MazeSolver.greedy_best_first,
+  MazeSolver.dijkstra,
+  MazeSolver.dial,
+  MazeSolver.a_star,
+  MazeSolver.bidirectional_breadth_first_search,
+  MazeSolver.bidirectional_a_star,
+  MazeSolver.jump_point_search,
+])
+def test_solver_finds_path(solver_fn):
+  grid = make_maze(imperfection_rate=0.3)
+  solver_fn(grid)
+
+  path = get_path(grid)
+  assert path[0] == grid.get_list_index(grid.get_start_cell())
+  assert grid.get_num_path_cells() == len(path)
+  assert all(grid.get_cell_by_index(index).get_is_in_path() for index in path)
+
+@pytest.mark.parametrize("solver_fn", [
+  MazeSolver.dijkstra,
+  MazeSolver.dial,
+  MazeSolver.a_star,
+  MazeSolver.bidirectional_breadth_first_search,
+  MazeSolver.bidirectional_a_star,
+  MazeSolver.jump_point_search,
+])
+def test_solver_path_is_shortest(solver_fn):
+  bfs_grid = make_maze(imperfection_rate=0.3)
+  MazeSolver.breadth_first_search(bfs_grid)
+
+  grid = make_maze(imperfection_rate=0.3)
+  solver_fn(grid)
+  assert grid.get_num_path_cells() == bfs_grid.get_num_path_cells()
+
+def test_solvers_back_to_back_after_reset():
+  fresh_grid = make_maze(imperfection_rate=0.3)
+  MazeSolver.a_star(fresh_grid)
+
+  grid = make_maze(imperfection_rate=0.3)
+  MazeSolver.breadth_first_search(grid)
+  grid.reset_visited_cells()
+  MazeSolver.a_star(grid)
+  assert grid.get_num_visited_cells() == fresh_grid.get_num_visited_cells()
+  assert grid.get_num_path_cells() == fresh_grid.get_num_path_cells()
+
+def test_bidirectional_search_visits_fewer_cells():
+  bfs_grid = make_maze(size=40)
+  MazeSolver.breadth_first_search(bfs_grid)
+
+  grid = make_maze(size=40)
+  MazeSolver.bidirectional_breadth_first_search(grid)
+  assert grid.get_num_path_cells() == bfs_grid.get_num_path_cells()
+  assert grid.get_num_visited_cells() < bfs_grid.get_num_visited_cells()
+
+@pytest.mark.parametrize("imperfection_rate", [0.0, 0.5, 1.0])
+def test_jump_point_search_matches_a_star(imperfection_rate):
+  a_star_grid = make_maze(size=30, imperfection_rate=imperfection_rate)
+  MazeSolver.a_star(a_star_grid)
+
+  grid = make_maze(size=30, imperfection_rate=imperfection_rate)
+  num_expanded = MazeSolver.jump_point_search(grid)
+  assert grid.get_num_path_cells() == a_star_grid.get_num_path_cells()
+  assert num_expanded < a_star_grid.get_num_visited_cells()
+
+@pytest.mark.parametrize("imperfection_rate", [0.0, 0.5, 1.0])
+def test_jump_point_search_marks_scanned_cells_visited(imperfection_rate):
+  grid = make_maze(size=30, imperfection_rate=imperfection_rate)
+  stats = SolverStats()
+  num_expanded = MazeSolver.jump_point_search(grid, stats=stats)
+
+  # The cells jumped over count as visited, while only the jump points count as expansions
+  assert grid.get_num_visited_cells() >= grid.get_num_path_cells()
+  assert stats.expansions == num_expanded < grid.get_num_visited_cells()
+  assert all(grid.get_cell_by_index(index).get_is_visited() for index in get_path(grid))
+
+@pytest.mark.parametrize("solver_fn", [
+  MazeSolver.breadth_first_search,
+  MazeSolver.depth_first_search,
+  MazeSolver.greedy_best_first,
+  MazeSolver.dijkstra,
+  MazeSolver.dial,
+  MazeSolver.a_star,
+  MazeSolver.bidirectional_breadth_first_search,
+  MazeSolver.bidirectional_a_star,
+  MazeSolver.jump_point_search,
+])
+def test_solver_stats(solver_fn):
+  plain_grid = make_maze(imperfection_rate=0.3)
+  solver_fn(plain_grid)
+
+  grid = make_maze(imperfection_rate=0.3)
+  stats = SolverStats()
+  solver_fn(grid, stats=stats)
+
+  # Counting doesn't change the search
+  assert grid.get_num_visited_cells() == plain_grid.get_num_visited_cells()
+  assert grid.get_num_path_cells() == plain_grid.get_num_path_cells()
+
+  assert 0 < stats.expansions <= stats.pops <= stats.pushes
+  assert stats.stale_skips <= stats.pops - stats.expansions
+  assert 0 < stats.max_frontier <= stats.pushes
+  assert stats.neighbor_lookups >= stats.expansions
+
+@pytest.mark.parametrize("solver_fn", [MazeSolver.dijkstra, MazeSolver.a_star, MazeSolver.greedy_best_first])
+def test_decrease_key_leaves_no_stale_entries(solver_fn):
+  grid = make_maze(size=25, imperfection_rate=0.5)
+  random.seed(11)
+  TerrainGenerator.random_weights(grid, max_weight=7)
+  stats = SolverStats()
+  solver_fn(grid, stats=stats)
+
+  # Cheaper paths lower a queued cell's priority instead of queueing it again, so every pop but the goal's is an
+  # expansion
+  assert stats.stale_skips == 0
+  assert stats.pushes <= grid.storage.size
+  assert stats.pops == stats.expansions + 1
+
+def test_tree_path_matches_breadth_first_search():
+  bfs_grid = make_maze(size=25)
+  MazeSolver.breadth_first_search(bfs_grid)
+
+  grid = make_maze(size=25)
+  MazeSolver.tree_path(grid)
+  assert get_path(grid) == get_path(bfs_grid)
+  assert grid.get_num_path_cells() == bfs_grid.get_num_path_cells()
+
+  # The index is built once, and reused when the maze is solved again
+  tree_index = grid.tree_index
+  grid.reset_visited_cells()
+  MazeSolver.tree_path(grid)
+  assert grid.tree_index is tree_index
+  assert get_path(grid) == get_path(bfs_grid)
+
+def test_solve_picks_solver_by_perfection():
+  grid = make_maze()
+  MazeSolver.solve(grid)
+  assert grid.tree_index is not None
+  assert grid.get_num_visited_cells() == grid.get_num_path_cells()
+
+  grid = make_maze(imperfection_rate=0.3)
+  with pytest.raises(ValueError):
+    MazeSolver.tree_path(grid)
+  MazeSolver.solve(grid)
+  assert grid.tree_index is None
+  assert get_path(grid)[0] == grid.get_list_index(grid.get_start_cell())
+
+def get_path_cost(grid):
+  return sum(int(grid.storage.weights[index]) for index in get_path(grid)[1:])
+
+@pytest.mark.parametrize("solver_fn", [MazeSolver.dial, MazeSolver.a_star, MazeSolver.bidirectional_a_star])
+def test_weighted_solver_matches_dijkstra(solver_fn):
+  def make_weighted_maze():
+    grid = make_maze(size=25, imperfection_rate=0.5)
+    random.seed(11)
+    TerrainGenerator.random_weights(grid, max_weight=7)
+    return grid
+
+  dijkstra_grid = make_weighted_maze()
+  MazeSolver.dijkstra(dijkstra_grid)
+  grid = make_weighted_maze()
+  solver_fn(grid)
+  assert get_path_cost(grid) == get_path_cost(dijkstra_grid)
@@ -0,0 +1,79 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from itertools import pairwise
+
+import numpy as np
+
+from algorithms.MazeGenerator import MazeGenerator
+from algorithms.MazeSolver import MazeSolver
+from algorithms.PathService import PathService
+from grid.Grid import Grid
+
+
+def make_maze(start_pos=(0, 0), end_pos=None, size=12, imperfection_rate=0.3, seed=3):
+  random.seed(seed)
+  grid = Grid(None, size, size, start_pos, end_pos)
+  MazeGenerator.randomized_kruskal(grid)
+  MazeGenerator.add_imperfections(grid, imperfection_rate)
+  grid.freeze()
+  return grid
+
+def make_pairs(size, num_pairs, seed=5):
+  rng = np.random.default_rng(seed)
+  return rng.integers(0, size, size=(num_pairs, 2, 2))
+
+
+def test_query_matches_breadth_first_search():
+  pairs = make_pairs(12, 40)
+  # A few pairs sharing a start, and a pair that starts where it ends
+  pairs[:5, 0] = (4, 7)
+  pairs[5, 1] = pairs[5, 0]
+  service = PathService(make_maze())
+  lengths, paths = service.query(pairs, return_paths=True)
+
+  for (start, end), length, path in zip(pairs.tolist(), lengths, paths):
+    grid = make_maze(tuple(start), tuple(end))
+    MazeSolver.breadth_first_search(grid)
+    assert length == grid.get_num_path_cells() - 1
+    assert path.tolist()[0] == start and path.tolist()[-1] == end
+    assert len(path) == length + 1
+    # Every step moves to an adjacent cell through an open wall
+    offsets, neighbors = grid.get_adjacency()
+    ids = [y * 12 + x for x, y in path.tolist()]
+    for current, following in pairwise(ids):
+      assert following in neighbors[offsets[current] : offsets[current + 1]]
+
+def test_query_grouped_by_end():
+  pairs = make_pairs(12, 10)
+  pairs[:, 1] = (11, 0)
+  service = PathService(make_maze())
+  lengths, paths = service.query(pairs, return_paths=True)
+
+  reversed_lengths, _ = service.query(pairs[:, ::-1])
+  assert lengths.tolist() == reversed_lengths.tolist()
+  assert all(path.tolist()[0] == start for path, start in zip(paths, pairs[:, 0].tolist()))
+
+def test_query_leaves_grid_untouched():
+  grid = make_maze()
+  flags = grid.storage.flags.copy()
+  parents = grid.storage.parents.copy()
+  PathService(grid).query(make_pairs(12, 20), return_paths=True)
+  assert (grid.storage.flags == flags).all()
+  assert (grid.storage.parents == parents).all()
+  assert grid.get_num_visited_cells() == 0
+
+def test_concurrent_queries():
+  service = PathService(make_maze(size=30))
+  batches = [make_pairs(30, 25, seed) for seed in range(8)]
+  expected = [service.query(batch)[0].tolist() for batch in batches]
+  with ThreadPoolExecutor(max_workers=4) as executor:
+    results = list(executor.map(lambda batch: service.query(batch)[0].tolist(), batches))
+  assert results == expected
+
+def test_unreachable_end():
+  # No walls have been removed, so every cell is cut off from the others
+  service = PathService(Grid(None, 3, 3))
+  lengths, paths = service.query([((0, 0), (2, 2)), ((1, 1), (1, 1))], return_paths=True)
+  assert lengths.tolist() == [-1, 0]
+  assert paths[0].shape == (0, 2)
+  assert paths[1].tolist() == [[1, 1]]
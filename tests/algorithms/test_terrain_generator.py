@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.TerrainGenerator import TerrainGenerator
+from grid.Grid import Grid
+
+
+@pytest.mark.parametrize("terrain_fn", [TerrainGenerator.random_weights, TerrainGenerator.noise_weights])
+def test_weights_in_range_and_reproducible(terrain_fn):
+  grids = []
+  for _ in range(2):
+    random.seed(6)
+    grid = Grid(None, 37, 23)
+    terrain_fn(grid, max_weight=5)
+    grids.append(grid)
+  weights = grids[0].storage.weights
+  assert weights.min() >= 1 and weights.max() <= 5
+  assert len(np.unique(weights)) > 1
+  assert np.array_equal(weights, grids[1].storage.weights)
+  # The cells see the same weights
+  assert grids[0].get_cell(4, 9).weight == weights[9 * 23 + 4]
+
+def test_noise_weights_are_smooth():
+  random.seed(2)
+  noise_grid = Grid(None, 64, 64)
+  TerrainGenerator.noise_weights(noise_grid, max_weight=9, feature_size=16)
+  random_grid = Grid(None, 64, 64)
+  TerrainGenerator.random_weights(random_grid, max_weight=9)
+
+  # Neighboring cells of noise terrain are much closer in weight than independent random ones
+  def get_mean_step(grid):
+    weights = grid.storage.weights.reshape(64, 64).astype(np.int64)
+    return np.abs(np.diff(weights, axis=1)).mean()
+  assert get_mean_step(noise_grid) < get_mean_step(random_grid) / 3
+
+def test_uniform_resets_weights():
+  random.seed(1)
+  grid = Grid(None, 5, 5)
+  TerrainGenerator.random_weights(grid)
+  TerrainGenerator.uniform(grid)
+  assert (grid.storage.weights == 1).all()
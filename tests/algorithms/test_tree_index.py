@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.MazeGenerator import MazeGenerator
+from algorithms.PathService import PathService
+from algorithms.TreeIndex import TreeIndex
+from grid.Grid import Grid
+
+
+def make_maze(num_rows=20, num_cols=17, seed=8):
+  random.seed(seed)
+  grid = Grid(None, num_rows, num_cols)
+  MazeGenerator.recursive_backtracker(grid)
+  grid.freeze()
+  return grid
+
+def get_bfs_service(grid):
+  # A path service that searches, even though the maze is perfect
+  service = PathService(grid)
+  service.tree_index = None
+  return service
+
+
+def test_tree_index_matches_bfs():
+  grid = make_maze()
+  tree_index = TreeIndex.get(grid)
+  rng = np.random.default_rng(1)
+  starts = rng.integers(0, grid.storage.size, 200)
+  ends = rng.integers(0, grid.storage.size, 200)
+  ends[:3] = starts[:3]
+  pairs = np.stack([np.column_stack((starts % 17, starts // 17)), np.column_stack((ends % 17, ends // 17))], axis=1)
+  expected_lengths, expected_paths = get_bfs_service(grid).query(pairs, return_paths=True)
+
+  assert tree_index.get_distances(starts, ends).tolist() == expected_lengths.tolist()
+  for start, end, length, path in zip(starts.tolist(), ends.tolist(), expected_lengths, expected_paths):
+    assert tree_index.get_distance(start, end) == length
+    # A perfect maze has a single path between any two cells, so the paths have to be the same
+    assert tree_index.get_path(start, end) == [y * 17 + x for x, y in path.tolist()]
+
+def test_path_service_uses_tree_index():
+  grid = make_maze()
+  service = PathService(grid)
+  assert service.tree_index is TreeIndex.get(grid)
+
+  pairs = [((0, 0), (16, 19)), ((5, 5), (5, 5)), ((16, 0), (0, 19))]
+  lengths, paths = service.query(pairs, return_paths=True)
+  expected_lengths, expected_paths = get_bfs_service(grid).query(pairs, return_paths=True)
+  assert lengths.tolist() == expected_lengths.tolist()
+  assert [path.tolist() for path in paths] == [path.tolist() for path in expected_paths]
+
+def test_wall_change_drops_tree_index():
+  grid = make_maze()
+  TreeIndex.get(grid)
+  grid.remove_wall(grid.get_cell(0, 0), grid.get_cell(1, 0))
+  assert grid.tree_index is None and not grid.is_perfect
+
+def test_rejects_mazes_with_loops():
+  grid = make_maze()
+  MazeGenerator.add_imperfections(grid, 0.1)
+  with pytest.raises(ValueError):
+    TreeIndex(grid)
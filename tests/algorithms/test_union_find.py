@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from algorithms.UnionFind import UnionFind
+
+
+def test_union_and_connected():
+  union_find = UnionFind(6)
+  assert union_find.unionBySize(0, 1)
+  assert union_find.unionBySize(2, 3)
+  assert not union_find.unionBySize(1, 0)
+  assert union_find.connected(0, 1)
+  assert not union_find.connected(1, 2)
+
+  assert union_find.unionBySize(1, 3)
+  assert union_find.connected(0, 2)
+  assert union_find.size[union_find.findRoot(0)] == 4
+
+def test_long_chain_has_no_recursion_limit():
+  # Linking every root under a fresh node builds the deepest possible tree
+  size = 100_000
+  union_find = UnionFind(size)
+  union_find.parent[:-1] = np.arange(1, size)
+  assert union_find.findRoot(0) == size - 1
+  assert union_find.connected(0, size // 2)
+
+def test_unionMany_matches_single_unions():
+  rng = np.random.default_rng(0)
+  xs = rng.integers(0, 500, 2000)
+  ys = rng.integers(0, 500, 2000)
+
+  expected = UnionFind(500)
+  expected_merged = [expected.unionBySize(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+  union_find = UnionFind(500)
+  assert union_find.unionMany(xs, ys, chunk_size=64).tolist() == expected_merged
+  assert union_find.connectedMany(xs, ys).all()
+  assert union_find.connectedMany(np.array([0]), np.array([0])).all()
+
+@pytest.mark.slow
+def test_union_many_on_ten_million_elements():
+  # Joining neighbors in random order ends in one set; deselected by default, run with `pytest -m slow`
+  size = 10_000_000
+  order = np.random.default_rng(0).permutation(size - 1)
+  union_find = UnionFind(size)
+  assert union_find.unionMany(order, order + 1).all()
+  roots = union_find.findRoots(np.arange(size))
+  assert (roots == roots[0]).all()
+  assert union_find.size[roots[0]] == size
+  assert union_find.connectedMany(np.array([0]), np.array([size - 1])).all()
@@ -51,4 +51,16 @@ def test_set_wall(cell):
     assert not cell.get_wall(Direction.LEFT)
 
     cell.set_wall(Direction.RIGHT, True)
-    assert cell.get_wall(Direction.RIGHT)
\ No newline at end of file
+    assert cell.get_wall(Direction.RIGHT)
+
+def test_cell_is_slotted(cell):
+    # Cells shouldn't carry a per-instance __dict__
+    assert not hasattr(cell, "__dict__")
+
+
+def test_wall_masks(cell):
+    # Each wall maps onto its own bit of the flags
+    cell.set_wall(Direction.LEFT, False)
+    assert cell.flags == Cell.INITIAL_FLAGS & ~Cell.WALL_MASKS[Direction.LEFT]
+    cell.set_wall(Direction.LEFT, True)
+    assert cell.flags == Cell.INITIAL_FLAGS
@@ -1,3 +1,9 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.MazeGenerator import MazeGenerator
 from grid.Grid import Grid
 from utils.Direction import Direction
 
@@ -169,4 +175,187 @@ def test_remove_wall_horizontal():
   assert cell.get_wall(Direction.RIGHT) is False
   
   # Check that the neighbor's top wall is false
-  assert neighbor.get_wall(Direction.LEFT) is False
\ No newline at end of file
+  assert neighbor.get_wall(Direction.LEFT) is False
+
+# ----------------------------
+# testing the array-backed storage
+# ----------------------------
+def test_cell_views_write_through():
+  grid = Grid(None, 5, 5)
+  cell = grid.get_cell(1, 2)
+  cell.set_wall(Direction.UP, False)
+  cell.set_is_visited(True)
+  cell.weight = 3
+
+  # A fresh view of the same position sees the same state
+  same_cell = grid.get_cell(1, 2)
+  assert same_cell == cell
+  assert same_cell.get_wall(Direction.UP) is False
+  assert same_cell.get_is_visited()
+  assert same_cell.weight == 3
+  assert grid.storage.flags[grid.get_list_index(cell)] == 0b100111
+
+def test_cell_view_parent_links():
+  grid = Grid(None, 5, 5)
+  cell = grid.get_cell(3, 3)
+  assert cell.parent is None
+
+  cell.parent = grid.get_cell(3, 2)
+  assert cell.parent == grid.get_cell(3, 2)
+  assert grid.storage.parents[grid.get_list_index(cell)] == 13
+
+  cell.parent = None
+  assert cell.parent is None
+
+def test_reset_visited_cells():
+  grid = Grid(None, 5, 5)
+  for cell in grid.get_all_neighbors(grid.get_cell(2, 2)):
+    grid.set_is_visited(cell, True)
+  grid.set_is_in_path(grid.get_cell(0, 0), True)
+  assert grid.get_num_visited_cells() == 4
+
+  grid.reset_visited_cells()
+  assert grid.get_num_visited_cells() == 0
+  assert grid.get_num_path_cells() == 0
+  assert not grid.get_cell(2, 1).get_is_visited()
+
+  # Cells touched in the new epoch don't bring back their old bits
+  grid.set_is_visited(grid.get_cell(0, 0), True)
+  assert not grid.get_cell(0, 0).get_is_in_path()
+  assert grid.get_num_visited_cells() == 1
+
+def test_reset_visited_cells_epoch_wraparound():
+  grid = Grid(None, 5, 5)
+  grid.set_is_visited(grid.get_cell(1, 1), True)
+  grid.storage.epoch = 2**16 - 1
+  grid.set_is_visited(grid.get_cell(2, 2), True)
+
+  grid.reset_visited_cells()
+  assert grid.storage.epoch == 1
+  assert grid.get_num_visited_cells() == 0
+  assert not grid.get_cell(1, 1).get_is_visited()
+
+# ----------------------------
+# testing the adjacency index
+# ----------------------------
+def test_freeze_matches_path_neighbors():
+  grid = Grid(None, 5, 5)
+  grid.remove_wall(grid.get_cell(2, 2), grid.get_cell(2, 1))
+  grid.remove_wall(grid.get_cell(2, 2), grid.get_cell(3, 2))
+  grid.remove_wall(grid.get_cell(4, 4), grid.get_cell(4, 3))
+  expected = [grid.get_path_neighbors(grid.get_cell_by_index(i)) for i in range(25)]
+
+  offsets, neighbors = grid.get_adjacency()
+  for i in range(25):
+    assert [grid.get_cell_by_index(n) for n in neighbors[offsets[i] : offsets[i + 1]]] == expected[i]
+  assert list(neighbors[offsets[12] : offsets[13]]) == [7, 13]
+
+def test_set_wall_drops_adjacency():
+  grid = Grid(None, 5, 5)
+  grid.freeze()
+  grid.remove_wall(grid.get_cell(0, 0), grid.get_cell(1, 0))
+  assert grid.adjacency is None
+
+  offsets, neighbors = grid.get_adjacency()
+  assert list(neighbors[offsets[0] : offsets[1]]) == [1]
+
+def get_bfs_distances(grid):
+  # Plain BFS over the adjacency index
+  offsets, neighbors = grid.get_adjacency()
+  expected = [-1] * grid.storage.size
+  expected[grid.get_list_index(grid.get_start_cell())] = 0
+  queue = [grid.get_list_index(grid.get_start_cell())]
+  for current in queue:
+    for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+      if expected[neighbor] < 0:
+        expected[neighbor] = expected[current] + 1
+        queue.append(neighbor)
+  return expected
+
+def test_distance_field_matches_bfs():
+  random.seed(4)
+  grid = Grid(None, 11, 14, (3, 5))
+  MazeGenerator.randomized_kruskal(grid)
+  MazeGenerator.add_imperfections(grid, 0.4)
+  distances = grid.get_distance_field()
+  assert distances.shape == (11, 14) and distances.dtype == np.int32
+  assert distances.ravel().tolist() == get_bfs_distances(grid)
+  assert grid.get_num_visited_cells() == 0
+
+@pytest.mark.parametrize("scalar_frontier", [1, 4, Grid.DISTANCE_FIELD_SCALAR_FRONTIER, 1 << 30])
+@pytest.mark.parametrize("imperfection_rate", [0.0, 1.0])
+def test_distance_field_on_backtracker_maze(monkeypatch, scalar_frontier, imperfection_rate):
+  # Long one-cell corridors step one cell at a time, wide layers as arrays, and both give the same distances
+  random.seed(9)
+  grid = Grid(None, 30, 30, (15, 15))
+  MazeGenerator.recursive_backtracker(grid)
+  MazeGenerator.add_imperfections(grid, imperfection_rate)
+  monkeypatch.setattr(Grid, "DISTANCE_FIELD_SCALAR_FRONTIER", scalar_frontier)
+  assert grid.get_distance_field().ravel().tolist() == get_bfs_distances(grid)
+
+def test_distance_field_unreachable_cells():
+  grid = Grid(None, 3, 4)
+  grid.remove_wall(grid.get_cell(1, 1), grid.get_cell(2, 1))
+  distances = grid.get_distance_field((1, 1))
+  assert distances[1, 1] == 0 and distances[1, 2] == 1
+  assert (distances == -1).sum() == 10
+
+# ----------------------------
+# testing save/load
+# ----------------------------
+def test_save_load_round_trip(tmp_path):
+  # An odd number of cells, and a chunk size that isn't a multiple of the row length
+  random.seed(1)
+  grid = Grid(None, 7, 9, (1, 2), (8, 5))
+  MazeGenerator.randomized_prim(grid)
+  MazeGenerator.add_imperfections(grid, 0.3)
+  grid.set_is_visited(grid.get_cell(0, 0), True)
+  path = tmp_path / "maze.bin"
+  grid.save(str(path))
+  assert path.stat().st_size == Grid.FILE_HEADER.size + 32
+
+  Grid.FILE_CHUNK_CELLS, chunk_cells = 10, Grid.FILE_CHUNK_CELLS
+  try:
+    loaded = Grid.load(str(path))
+  finally:
+    Grid.FILE_CHUNK_CELLS = chunk_cells
+  assert (loaded.num_rows, loaded.num_cols) == (7, 9)
+  assert loaded.start_pos == (1, 2) and loaded.end_pos == (8, 5)
+  assert (loaded.storage.flags == (grid.storage.flags & 0b1111)).all()
+  assert loaded.get_num_visited_cells() == 0
+  assert not loaded.is_perfect
+
+def test_load_detects_perfect_maze(tmp_path):
+  random.seed(2)
+  grid = Grid(None, 6, 8)
+  MazeGenerator.randomized_kruskal(grid)
+  assert grid.is_perfect
+  path = tmp_path / "maze.bin"
+  grid.save(str(path))
+  assert Grid.read_header(str(path))["is_perfect"]
+  assert Grid.load(str(path)).is_perfect
+
+@pytest.mark.parametrize("algorithm", [MazeGenerator.randomized_kruskal, None])
+def test_load_version_1_file(tmp_path, algorithm):
+  # Version 1 files have no maze flags, so whether the maze is perfect is worked out from the walls
+  random.seed(3)
+  grid = Grid(None, 6, 8, (2, 1))
+  if algorithm:
+    algorithm(grid)
+  path = tmp_path / "maze.bin"
+  grid.save(str(path))
+  walls = path.read_bytes()[Grid.FILE_HEADER.size :]
+  header = Grid.FILE_HEADER_V1.pack(Grid.FILE_MAGIC, 1, Grid.FILE_HEADER_V1.size, 6, 8, 2, 1, 7, 5)
+  path.write_bytes(header + walls)
+
+  assert Grid.read_header(str(path))["is_perfect"] is None
+  loaded = Grid.load(str(path))
+  assert loaded.start_pos == (2, 1) and loaded.end_pos == (7, 5)
+  assert (loaded.storage.flags == grid.storage.flags).all()
+  assert loaded.is_perfect == grid.is_perfect
+
+def test_load_rejects_other_files(tmp_path):
+  path = tmp_path / "not_a_maze.bin"
+  path.write_bytes(b"hello" * 10)
+  with pytest.raises(ValueError):
+    Grid.load(str(path))
@@ -0,0 +1,69 @@
+import os
+import random
+
+import numpy as np
+import pygame
+
+from algorithms.MazeGenerator import MazeGenerator
+from algorithms.MazeSolver import MazeSolver
+from grid.Grid import Grid
+from grid.MazeRasterizer import MazeRasterizer
+from grid.Renderer import Renderer
+
+
+def make_solved_maze(renderer: Renderer | None = None, size: int = 8) -> Grid:
+  random.seed(3)
+  grid = Grid(renderer, size, size)
+  MazeGenerator.randomized_prim(grid)
+  MazeGenerator.add_imperfections(grid, 0.3)
+  if renderer:
+    renderer.highlight_cells = True
+  MazeSolver.a_star(grid)
+  return grid
+
+
+def test_rasterize_matches_renderer():
+  for cell_size, cell_wall_width in [(10, 2), (7, 3), (5, 1)]:
+    renderer = Renderer(pygame.Surface((8 * cell_size, 8 * cell_size)), pygame.time.Clock(), cell_size, cell_wall_width, False)
+    grid = make_solved_maze(renderer)
+    renderer.render_dirty_cells()
+    screen = pygame.surfarray.array3d(renderer.surface).transpose(1, 0, 2)
+
+    image = MazeRasterizer(cell_size, cell_wall_width).rasterize(grid)
+    assert image.shape == screen.shape
+    assert np.array_equal(image, screen)
+
+
+def test_save_png_in_bands(tmp_path):
+  grid = make_solved_maze(size=13)
+  rasterizer = MazeRasterizer(6, 2)
+  path = os.path.join(tmp_path, "maze.png")
+
+  # A tiny band size forces one band per cell row
+  rasterizer.save_png(grid, path, max_band_bytes=1)
+  loaded = pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+  assert np.array_equal(loaded, rasterizer.rasterize(grid))
+
+
+def test_heatmap():
+  grid = make_solved_maze(size=9)
+  rasterizer = MazeRasterizer(6, 2)
+  distances = grid.get_distance_field()
+  image = rasterizer.rasterize_heatmap(grid)
+  plain_image = rasterizer.rasterize(grid)
+
+  # Walls are drawn the same way; the start gets the first heatmap color and the farthest cell the last one
+  is_wall = np.all(plain_image == rasterizer.wall_up_color, axis=-1)
+  assert np.all(image[is_wall] == rasterizer.wall_up_color)
+  colors = image[3::6, 3::6]
+  assert colors[0, 0].tolist() == MazeRasterizer.HEATMAP_COLORS[0].tolist()
+  farthest_y, farthest_x = np.unravel_index(np.argmax(distances), distances.shape)
+  assert colors[farthest_y, farthest_x].tolist() == MazeRasterizer.HEATMAP_COLORS[-1].tolist()
+
+def test_save_heatmap_png_in_bands(tmp_path):
+  grid = make_solved_maze(size=13)
+  rasterizer = MazeRasterizer(6, 2)
+  path = os.path.join(tmp_path, "heatmap.png")
+  rasterizer.save_heatmap_png(grid, path, max_band_bytes=1)
+  loaded = pygame.surfarray.array3d(pygame.image.load(path)).transpose(1, 0, 2)
+  assert np.array_equal(loaded, rasterizer.rasterize_heatmap(grid))
@@ -0,0 +1,98 @@
+import os
+
+# Flushing pushes to the display, so give pygame one that doesn't need a window. This has to be set before pygame is
+# imported.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from grid.Cell import Cell
+from grid.Grid import Grid
+from grid.Renderer import Renderer
+from utils.Direction import Direction
+
+
+def make_renderer(steps_per_frame: int = 1) -> Renderer:
+  pygame.display.init()
+  surface = pygame.display.set_mode((50, 50))
+  return Renderer(surface, pygame.time.Clock(), 10, 2, True, steps_per_frame, fps=1000)
+
+
+def test_grid_marks_every_cell_dirty_once():
+  renderer = make_renderer()
+  grid = Grid(renderer, 5, 5)
+  assert len(renderer.changed_cells) == 25
+  assert next(iter(renderer.changed_cells)) == grid.get_cell(0, 0)
+
+
+def test_mark_dirty_keeps_first_position():
+  renderer = make_renderer()
+  grid = Grid(renderer, 5, 5)
+  renderer.render_dirty_cells()
+  assert not renderer.changed_cells
+
+  grid.set_is_visited(grid.get_cell(1, 1), True)
+  grid.set_wall(grid.get_cell(2, 2), Direction.UP, False)
+  grid.set_is_in_path(grid.get_cell(1, 1), True)
+  assert list(renderer.changed_cells) == [grid.get_cell(1, 1), grid.get_cell(2, 2)]
+
+  renderer.render_dirty_cells()
+  assert not renderer.changed_cells
+
+
+def test_update_display_batches_steps():
+  renderer = make_renderer(steps_per_frame=3)
+  grid = Grid(renderer, 5, 5)
+  renderer.flush()
+
+  grid.set_is_visited(grid.get_cell(0, 0), True)
+  renderer.update_display()
+  grid.set_is_visited(grid.get_cell(1, 0), True)
+  renderer.update_display()
+  assert len(renderer.changed_cells) == 2
+
+  grid.set_is_visited(grid.get_cell(2, 0), True)
+  renderer.update_display()
+  assert not renderer.changed_cells
+  assert renderer.pending_steps == 0
+
+
+def test_set_target_duration():
+  renderer = make_renderer()
+  renderer.fps = 60
+  renderer.set_target_duration(5, 300 * 300)
+  assert renderer.steps_per_frame == 300
+  renderer.set_target_duration(5, 10)
+  assert renderer.steps_per_frame == 1
+
+
+def test_tile_atlas_has_a_tile_per_wall_combination_and_highlight():
+  renderer = make_renderer()
+  Grid(renderer, 5, 5)
+  renderer.render_dirty_cells()
+  assert len(renderer.tile_rects) == 48
+  assert renderer.tile_atlas_key == (10, 2)
+
+  # Changing the cell size redraws the atlas on the next render
+  renderer.cell_size = 8
+  renderer.render_dirty_cells()
+  assert renderer.tile_rects[0].size == (8, 8)
+
+
+def test_cells_are_drawn_from_their_tile():
+  renderer = make_renderer()
+  grid = Grid(renderer, 5, 5)
+  renderer.render_dirty_cells()
+  center = (15, 15)
+  assert renderer.surface.get_at(center) == renderer.background_color
+
+  grid.set_is_visited(grid.get_cell(1, 1), True)
+  grid.set_wall(grid.get_cell(1, 1), Direction.UP, False)
+  renderer.render_dirty_cells()
+  visited_tile = renderer.tile_rects[16 + (Cell.WALLS_MASK & ~Cell.WALL_MASKS[Direction.UP])]
+  assert renderer.surface.get_at(center) == renderer.tile_atlas.get_at(visited_tile.center)
+  assert renderer.surface.get_at(center) != renderer.background_color
+
+  # The top wall is down, so the top edge of the cell has the highlight color rather than the wall color
+  assert renderer.surface.get_at((15, 10)) == renderer.surface.get_at(center)
+  assert renderer.surface.get_at((10, 15)) == renderer.wall_up_color
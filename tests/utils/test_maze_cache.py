@@ -0,0 +1,52 @@
+import os
+
+from grid.Grid import Grid
+from utils.MazeCache import MazeCache
+
+
+def make_key(size: int, seed: int = 1) -> str:
+  return MazeCache.make_key("randomized_prim", size, size, seed, 0.0, (0, 0), (size - 1, size - 1))
+
+
+def test_make_key():
+  assert make_key(10) == make_key(10)
+  assert make_key(10) != make_key(11)
+  assert make_key(10) != make_key(10, seed=2)
+  # The same settings give the same key, whether the rate comes in as an int or a float
+  assert MazeCache.make_key("prim", 5, 5, 1, 0, (0, 0), (4, 4)) == MazeCache.make_key("prim", 5, 5, 1, 0.0, [0, 0], [4, 4])
+
+
+def test_make_key_changes_with_versions(monkeypatch):
+  key = make_key(10)
+  monkeypatch.setattr(MazeCache, "CACHE_VERSION", MazeCache.CACHE_VERSION + 1)
+  assert make_key(10) != key
+  monkeypatch.undo()
+  monkeypatch.setattr(Grid, "FILE_VERSION", Grid.FILE_VERSION + 1)
+  assert make_key(10) != key
+
+
+def test_put_and_get(tmp_path):
+  cache = MazeCache(str(tmp_path))
+  assert cache.get(make_key(5)) is None
+
+  grid = Grid(None, 5, 5)
+  grid.remove_wall(grid.get_cell(0, 0), grid.get_cell(1, 0))
+  cache.put(make_key(5), grid)
+  loaded = Grid.load(cache.get(make_key(5)))
+  assert (loaded.storage.flags == grid.storage.flags).all()
+
+
+def test_evicts_least_recently_used(tmp_path):
+  # Each 10x10 maze takes 32 + 50 bytes, so only two fit
+  cache = MazeCache(str(tmp_path), max_bytes=200)
+  for seed in range(3):
+    cache.put(make_key(10, seed), Grid(None, 10, 10))
+    # Make the access order unambiguous, whatever the file system's timestamp resolution
+    os.utime(cache.get_path(make_key(10, seed)), ns=(seed, seed))
+  assert cache.get(make_key(10, 0)) is None
+
+  # Using a maze makes it the most recently used, so the next put evicts the other one
+  assert cache.get(make_key(10, 1)) is not None
+  cache.put(make_key(10, 3), Grid(None, 10, 10))
+  assert cache.get(make_key(10, 1)) is not None
+  assert cache.get(make_key(10, 2)) is None
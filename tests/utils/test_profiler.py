@@ -0,0 +1,61 @@
+import csv
+
+import pytest
+
+from utils.MazeCache import MazeCache
+from utils.Profiler import Profiler
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_mass_profile(tmp_path, monkeypatch, max_workers):
+  monkeypatch.chdir(tmp_path)
+  profiler = Profiler()
+  maze_cache = MazeCache(str(tmp_path / "maze_cache"))
+  profiler.mass_profile(seeds=[0, 1], repetitions=2, max_workers=max_workers, maze_cache=maze_cache, grid_sizes=[5, 8])
+
+  # One maze per (size, seed), and every solver runs on each of them `repetitions` times, logged in order of size
+  assert len(profiler.generator_results.query()) == 4
+  solver_rows = profiler.solver_results.query()
+  assert len(solver_rows) == 2 * 2 * 2 * 6
+  assert list(solver_rows["Rows"]) == sorted(solver_rows["Rows"])
+  assert len(profiler.solver_results.query(Solver="a_star")) == 2 * 2 * 2
+  # Every row carries the counters the solver filled in
+  assert (solver_rows["num_expanded"] > 0).all()
+  assert (solver_rows["num_pops"] >= solver_rows["num_expanded"]).all()
+  assert (solver_rows["max_frontier_size"] > 0).all()
+
+  # The mazes are cached now, so a second sweep only runs the solvers
+  profiler.mass_profile(seeds=[0, 1], repetitions=2, max_workers=max_workers, maze_cache=maze_cache, grid_sizes=[5, 8])
+  assert len(profiler.generator_results.query()) == 4
+  assert len(profiler.solver_results.query()) == 2 * len(solver_rows)
+
+
+def test_time_runs_resets_between_runs():
+  profiler = Profiler()
+  calls = []
+  samples = profiler.time_runs(lambda value: calls.append(value), lambda: (len(calls),), warmups=2, repetitions=3)
+  assert calls == [0, 1, 2, 3, 4]
+  assert len(samples) == 3 and all(isinstance(sample, int) and sample >= 0 for sample in samples)
+
+  fastest, median, p95 = Profiler.get_timing_stats([3_000, 1_000, 2_000, 4_000, 5_000])
+  assert (fastest, median) == (1e-6, 3e-6)
+  assert 4e-6 < p95 <= 5e-6
+
+
+def test_mass_profile_accurate_timing(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  profiler = Profiler()
+  maze_cache = MazeCache(str(tmp_path / "maze_cache"))
+  profiler.mass_profile(max_workers=1, maze_cache=maze_cache, grid_sizes=[6], timing_runs=3)
+
+  assert len(profiler.generator_benchmark_results.query()) == 1
+  rows = profiler.solver_benchmark_results.query()
+  assert len(rows) == 6
+  assert (rows["Runs"] == 3).all()
+  assert (rows["Min Execution Time (s)"] <= rows["Median Execution Time (s)"]).all()
+  assert (rows["Median Execution Time (s)"] <= rows["P95 Execution Time (s)"]).all()
+
+  # The results can still be had as CSV files
+  profiler.export_csvs()
+  with open(profiler.solver_benchmark_log_file, newline="") as file:
+    assert len(list(csv.reader(file))) == 1 + 6
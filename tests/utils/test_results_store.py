@@ -0,0 +1,45 @@
+import os
+
+from utils.ResultsStore import ResultsStore
+
+COLUMNS = [("Rows", "i4"), ("Solver", "U16"), ("Execution Time (s)", "f8")]
+
+
+def test_rows_are_buffered_then_flushed_in_chunks(tmp_path):
+  store = ResultsStore(str(tmp_path / "solver"), COLUMNS, chunk_rows=3)
+  store.extend([(10, "a_star", 0.5), (10, "dijkstra", 0.75)])
+  assert not os.path.isdir(store.directory)
+
+  store.append((20, "a_star", 1.5))
+  assert os.listdir(store.directory) == ["00000000.npy"]
+  assert store.buffer == []
+
+  store.append((20, "dijkstra", 2.0))
+  store.flush()
+  assert sorted(os.listdir(store.directory)) == ["00000000.npy", "00000001.npy"]
+
+
+def test_query(tmp_path):
+  store = ResultsStore(str(tmp_path / "solver"), COLUMNS, chunk_rows=2)
+  store.extend([(10, "a_star", 0.5), (10, "dijkstra", 0.75), (20, "a_star", 1.5)])
+
+  # Unflushed rows are included, and rows come back in the order they were logged
+  rows = store.query()
+  assert list(rows.columns) == ["Rows", "Solver", "Execution Time (s)"]
+  assert list(rows["Rows"]) == [10, 10, 20]
+
+  a_star = store.query(columns=["Rows", "Execution Time (s)"], Solver="a_star")
+  assert list(a_star.columns) == ["Rows", "Execution Time (s)"]
+  assert list(a_star["Execution Time (s)"]) == [0.5, 1.5]
+  assert len(store.query(Rows=30)) == 0
+
+  # A new store over the same directory sees the flushed rows
+  store.flush()
+  assert len(ResultsStore(store.directory, COLUMNS).query()) == 3
+
+
+def test_clear(tmp_path):
+  store = ResultsStore(str(tmp_path / "solver"), COLUMNS, chunk_rows=2)
+  store.extend([(10, "a_star", 0.5), (10, "dijkstra", 0.75), (20, "a_star", 1.5)])
+  store.clear()
+  assert len(store.query()) == 0